@@ -5,35 +5,97 @@
 #include "caffe2/operators/text_file_reader_utils.h"
 #include "caffe2/utils/string_utils.h"
 
+#include <atomic>
+#include <condition_variable>
+#include <mutex>
+
 namespace caffe2 {
 
+// A part of a file read by its own tokenizer: either the whole file, or the
+// lines starting in a byte range of a memory-mapped file.
+struct TextFileReaderChunk {
+  TextFileReaderChunk(
+      const std::vector<char>& delims,
+      char escape,
+      std::unique_ptr<StringProvider> provider,
+      int numPasses)
+      : provider(std::move(provider)),
+        tokenizer(Tokenizer(delims, escape), this->provider.get(), numPasses) {}
+
+  std::unique_ptr<StringProvider> provider;
+  BufferedTokenizer tokenizer;
+  size_t rowsRead{0};
+  // Rows of all passes, only counted for deterministic reads
+  size_t numRows{0};
+  std::atomic<bool> finished{false};
+  // Whether the '\r' of "\r\n" line ends is left in the last field, which
+  // FileReader drops on Windows by reading in text mode.
+  bool stripCarriageReturn{false};
+  std::mutex mutex;
+  // Deterministic reads: index of the next batch read from this chunk
+  int64_t nextBatch{0};
+  std::condition_variable batchTurn;
+};
+
 struct TextFileReaderInstance {
   TextFileReaderInstance(
       const std::vector<char>& delims,
       char escape,
       const std::string& filename,
       int numPasses,
-      const std::vector<int>& types)
-      : fileReader(filename),
-        tokenizer(Tokenizer(delims, escape), &fileReader, numPasses),
-        fieldTypes(types) {
+      const std::vector<int>& types,
+      int numChunks = 1,
+      bool useMmap = false,
+      bool deterministic = false)
+      : fieldTypes(types), deterministic(deterministic) {
     for (const auto dt : fieldTypes) {
       fieldMetas.push_back(
           DataTypeToTypeMeta(static_cast<TensorProto_DataType>(dt)));
       fieldByteSizes.push_back(fieldMetas.back().itemsize());
     }
+    if (numChunks == 1 && !useMmap) {
+      chunks.emplace_back(new TextFileReaderChunk(
+          delims,
+          escape,
+          std::unique_ptr<StringProvider>(new FileReader(filename)),
+          numPasses));
+      return;
+    }
+    auto file = std::make_shared<MappedFile>(filename);
+    const size_t size = file->size();
+    for (int i = 0; i < numChunks; ++i) {
+      auto reader = std::unique_ptr<MappedFileReader>(new MappedFileReader(
+          file, size * i / numChunks, size * (i + 1) / numChunks));
+      // Chunks of a small file may have no lines
+      if (reader->start() == reader->end()) {
+        continue;
+      }
+      size_t numRows =
+          deterministic ? file->countLines(reader->start(), reader->end()) : 0;
+      chunks.emplace_back(new TextFileReaderChunk(
+          delims, escape, std::move(reader), numPasses));
+      chunks.back()->numRows = numRows * numPasses;
+#ifdef _WIN32
+      chunks.back()->stripCarriageReturn = true;
+#endif
+    }
   }
 
-  FileReader fileReader;
-  BufferedTokenizer tokenizer;
+  std::vector<std::unique_ptr<TextFileReaderChunk>> chunks;
   std::vector<int> fieldTypes;
   std::vector<TypeMeta> fieldMetas;
   std::vector<size_t> fieldByteSizes;
-  size_t rowsRead{0};
+  const bool deterministic;
+
+  // Non-deterministic reads start from a different chunk each time
+  std::atomic<size_t> nextChunk{0};
 
-  // hack to guarantee thread-safeness of the read op
-  // TODO(azzolini): support multi-threaded reading.
-  std::mutex globalMutex_;
+  // Deterministic reads take the batches of the chunks in turn, so that the
+  // n-th read always returns the same rows.
+  std::mutex scheduleMutex;
+  int64_t scheduleBatchSize{-1};
+  int64_t scheduleRound{0};
+  size_t scheduleChunk{0};
 };
 
 class CreateTextFileReaderOp : public Operator<CPUContext> {
@@ -43,14 +105,25 @@ class CreateTextFileReaderOp : public Operator<CPUContext> {
       : Operator<CPUContext>(std::forward<Args>(args)...),
         filename_(GetSingleArgument<string>("filename", "")),
         numPasses_(GetSingleArgument<int>("num_passes", 1)),
-        fieldTypes_(GetRepeatedArgument<int>("field_types")) {
+        fieldTypes_(GetRepeatedArgument<int>("field_types")),
+        numChunks_(GetSingleArgument<int>("num_chunks", 1)),
+        useMmap_(GetSingleArgument<bool>("use_mmap", false)),
+        deterministic_(GetSingleArgument<bool>("deterministic", false)) {
     CAFFE_ENFORCE(fieldTypes_.size() > 0, "field_types arg must be non-empty");
+    CAFFE_ENFORCE(numChunks_ > 0, "num_chunks must be positive");
   }
 
   bool RunOnDevice() override {
     *OperatorBase::Output<std::unique_ptr<TextFileReaderInstance>>(0) =
         std::unique_ptr<TextFileReaderInstance>(new TextFileReaderInstance(
-            {'\n', '\t'}, '\0', filename_, numPasses_, fieldTypes_));
+            {'\n', '\t'},
+            '\0',
+            filename_,
+            numPasses_,
+            fieldTypes_,
+            numChunks_,
+            useMmap_,
+            deterministic_));
     return true;
   }
 
@@ -58,6 +131,9 @@ class CreateTextFileReaderOp : public Operator<CPUContext> {
   std::string filename_;
   int numPasses_;
   std::vector<int> fieldTypes_;
+  int numChunks_;
+  bool useMmap_;
+  bool deterministic_;
 };
 
 inline void convert(
@@ -114,50 +190,136 @@ class TextFileReaderReadOp : public Operator<CPUContext> {
       datas[i] = (char*)Output(i)->raw_mutable_data(instance->fieldMetas[i]);
     }
 
-    int rowsRead = 0;
-    {
-      // TODO(azzolini): support multi-threaded reading
-      std::lock_guard<std::mutex> guard(instance->globalMutex_);
-
-      bool finished = false;
-      Token token;
-      while (!finished && (rowsRead < batchSize_)) {
-        int field;
-        for (field = 0; field < numFields; ++field) {
-          finished = !instance->tokenizer.next(token);
-          if (finished) {
-            CAFFE_ENFORCE(
-                field == 0, "Invalid number of fields at end of file.");
-            break;
-          }
+    // Reads of a single chunk already return its rows in order
+    const int64_t rowsRead =
+        instance->deterministic && instance->chunks.size() > 1
+        ? readScheduled(instance, datas)
+        : readAny(instance, datas);
+
+    for (int i = 0; i < numFields; ++i) {
+      Output(i)->ShrinkTo(rowsRead);
+    }
+    return true;
+  }
+
+ private:
+  // Reads up to maxRows rows of the chunk, which must be locked, and returns
+  // the number of rows read.
+  int64_t readRows(
+      TextFileReaderInstance* instance,
+      TextFileReaderChunk* chunk,
+      std::vector<char*>& datas,
+      int64_t maxRows) {
+    const int numFields = datas.size();
+    int64_t rowsRead = 0;
+    bool finished = false;
+    Token token;
+    while (!finished && (rowsRead < maxRows)) {
+      int field;
+      for (field = 0; field < numFields; ++field) {
+        finished = !chunk->tokenizer.next(token);
+        if (finished) {
           CAFFE_ENFORCE(
-              (field == 0 && token.startDelimId == 0) ||
-                  (field > 0 && token.startDelimId == 1),
-              "Invalid number of columns at row ",
-              instance->rowsRead + rowsRead + 1);
-          const auto& meta = instance->fieldMetas[field];
-          char*& data = datas[field];
-          convert(
-              (TensorProto_DataType)instance->fieldTypes[field],
-              token.start,
-              token.end,
-              data);
-          data += instance->fieldByteSizes[field];
+              field == 0, "Invalid number of fields at end of file.");
+          break;
         }
-        if (!finished) {
-          ++rowsRead;
+        CAFFE_ENFORCE(
+            (field == 0 && token.startDelimId == 0) ||
+                (field > 0 && token.startDelimId == 1),
+            "Invalid number of columns at row ",
+            chunk->rowsRead + rowsRead + 1);
+        const char* end = token.end;
+        if (chunk->stripCarriageReturn && field == numFields - 1 &&
+            end > token.start && end[-1] == '\r') {
+          --end;
         }
+        char*& data = datas[field];
+        convert(
+            (TensorProto_DataType)instance->fieldTypes[field],
+            token.start,
+            end,
+            data);
+        data += instance->fieldByteSizes[field];
+      }
+      if (!finished) {
+        ++rowsRead;
       }
-      instance->rowsRead += rowsRead;
     }
+    chunk->rowsRead += rowsRead;
+    if (finished) {
+      chunk->finished = true;
+    }
+    return rowsRead;
+  }
 
-    for (int i = 0; i < numFields; ++i) {
-      Output(i)->ShrinkTo(rowsRead);
+  // Fills the batch from the chunks that are not finished, starting from a
+  // different one for each read, so that concurrent reads parse different
+  // chunks in parallel.
+  int64_t readAny(TextFileReaderInstance* instance, std::vector<char*>& datas) {
+    const size_t numChunks = instance->chunks.size();
+    const size_t first = instance->nextChunk++;
+    int64_t rowsRead = 0;
+    for (size_t i = 0; i < numChunks && rowsRead < batchSize_; ++i) {
+      auto* chunk = instance->chunks[(first + i) % numChunks].get();
+      if (chunk->finished) {
+        continue;
+      }
+      std::lock_guard<std::mutex> guard(chunk->mutex);
+      rowsRead += readRows(instance, chunk, datas, batchSize_ - rowsRead);
     }
-    return true;
+    return rowsRead;
+  }
+
+  // Reads the next batch of the deterministic schedule, in which the chunks
+  // give a batch in turn until they run out of rows. Batches of different
+  // chunks are parsed in parallel, and batches of the same chunk in order.
+  int64_t readScheduled(
+      TextFileReaderInstance* instance,
+      std::vector<char*>& datas) {
+    const size_t numChunks = instance->chunks.size();
+    TextFileReaderChunk* chunk = nullptr;
+    int64_t batch = 0;
+    {
+      std::lock_guard<std::mutex> guard(instance->scheduleMutex);
+      if (instance->scheduleBatchSize < 0) {
+        instance->scheduleBatchSize = batchSize_;
+      }
+      CAFFE_ENFORCE_EQ(
+          instance->scheduleBatchSize,
+          batchSize_,
+          "Deterministic reads of a text file must all use the same batch size");
+      // Look for the next chunk with rows left, for at most a full round
+      for (size_t i = 0; i < numChunks && !chunk; ++i) {
+        auto* candidate = instance->chunks[instance->scheduleChunk].get();
+        const int64_t round = instance->scheduleRound;
+        if (++instance->scheduleChunk == numChunks) {
+          instance->scheduleChunk = 0;
+          ++instance->scheduleRound;
+        }
+        if (static_cast<int64_t>(candidate->numRows) > round * batchSize_) {
+          chunk = candidate;
+          batch = round;
+        }
+      }
+    }
+    if (!chunk) {
+      return 0;
+    }
+    std::unique_lock<std::mutex> lock(chunk->mutex);
+    chunk->batchTurn.wait(lock, [&] { return chunk->nextBatch == batch; });
+    int64_t rowsRead = 0;
+    try {
+      rowsRead = readRows(instance, chunk, datas, batchSize_);
+    } catch (...) {
+      ++chunk->nextBatch;
+      chunk->batchTurn.notify_all();
+      throw;
+    }
+    ++chunk->nextBatch;
+    chunk->batchTurn.notify_all();
+    return rowsRead;
   }
 
- private:
   int64_t batchSize_;
 };
 
@@ -176,6 +338,16 @@ OPERATOR_SCHEMA(CreateTextFileReader)
     .Arg(
         "field_types",
         "List with type of each field. Type enum is found at core.DataType.")
+    .Arg(
+        "num_chunks",
+        "Number of byte ranges, aligned on lines, the memory-mapped file is "
+        "split into. Concurrent reads parse different chunks in parallel.")
+    .Arg("use_mmap", "Map the file in memory even if num_chunks is 1.")
+    .Arg(
+        "deterministic",
+        "If true, the chunks give a batch in turn, so that the n-th read "
+        "always returns the same rows. Otherwise reads take rows from any "
+        "chunk that is not being read.")
     .Output(0, "handler", "Pointer to the created TextFileReaderInstance.");
 
 OPERATOR_SCHEMA(TextFileReaderRead)
@@ -1,9 +1,23 @@
 #include "caffe2/operators/text_file_reader_utils.h"
 
 #include <fcntl.h>
+#include <algorithm>
 #include <cerrno>
 #include <cstring>
 #include <sstream>
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#ifndef WIN32_LEAN_AND_MEAN
+#define WIN32_LEAN_AND_MEAN
+#endif
+#include <windows.h>
+#else
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
 
 namespace caffe2 {
 
@@ -116,4 +130,146 @@ void FileReader::operator()(CharRange& range) {
   range.start = buffer;
   range.end = buffer + numRead;
 }
+
+MappedFile::MappedFile(const std::string& path) {
+#ifdef _WIN32
+  HANDLE file = CreateFileA(
+      path.c_str(),
+      GENERIC_READ,
+      // Like open(), don't prevent others from writing or deleting the file
+      FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE,
+      nullptr,
+      OPEN_EXISTING,
+      FILE_ATTRIBUTE_NORMAL,
+      nullptr);
+  if (file == INVALID_HANDLE_VALUE) {
+    throw std::runtime_error(
+        "Error opening file for reading: error " +
+        std::to_string(GetLastError()) + " Path=" + path);
+  }
+  LARGE_INTEGER size;
+  if (!GetFileSizeEx(file, &size)) {
+    auto error = std::to_string(GetLastError());
+    CloseHandle(file);
+    throw std::runtime_error("Error reading file size: error " + error);
+  }
+  size_ = static_cast<size_t>(size.QuadPart);
+  if (size_ > 0) {
+    // Copy-on-write mapping, since tokens are char*: the file is never
+    // modified.
+    HANDLE mapping =
+        CreateFileMappingA(file, nullptr, PAGE_WRITECOPY, 0, 0, nullptr);
+    if (mapping == nullptr) {
+      auto error = std::to_string(GetLastError());
+      CloseHandle(file);
+      throw std::runtime_error(
+          "Error mapping file: error " + error + " Path=" + path);
+    }
+    void* data = MapViewOfFile(mapping, FILE_MAP_COPY, 0, 0, 0);
+    auto error = std::to_string(GetLastError());
+    // The view stays valid after the handles are closed
+    CloseHandle(mapping);
+    if (data == nullptr) {
+      CloseHandle(file);
+      throw std::runtime_error(
+          "Error mapping file: error " + error + " Path=" + path);
+    }
+    data_ = static_cast<char*>(data);
+  }
+  CloseHandle(file);
+#else
+  int fd = open(path.c_str(), O_RDONLY);
+  if (fd < 0) {
+    throw std::runtime_error(
+        "Error opening file for reading: " + std::string(std::strerror(errno)) +
+        " Path=" + path);
+  }
+  struct stat st;
+  if (fstat(fd, &st) == -1) {
+    auto error = std::string(std::strerror(errno));
+    close(fd);
+    throw std::runtime_error("Error reading file size: " + error);
+  }
+  size_ = st.st_size;
+  if (size_ > 0) {
+    // Private writable mapping, since tokens are char*: the file is never
+    // modified.
+    void* data =
+        mmap(nullptr, size_, PROT_READ | PROT_WRITE, MAP_PRIVATE, fd, 0);
+    if (data == MAP_FAILED) {
+      auto error = std::string(std::strerror(errno));
+      close(fd);
+      throw std::runtime_error("Error mapping file: " + error + " Path=" + path);
+    }
+    data_ = static_cast<char*>(data);
+  }
+  // The mapping stays valid after the file is closed
+  close(fd);
+#endif
+}
+
+MappedFile::~MappedFile() {
+  if (data_) {
+#ifdef _WIN32
+    UnmapViewOfFile(data_);
+#else
+    munmap(data_, size_);
+#endif
+  }
+}
+
+size_t MappedFile::lineStart(size_t offset) const {
+  if (offset == 0 || offset >= size_) {
+    return std::min(offset, size_);
+  }
+  // The line starts at offset if the previous character ends a line
+  const char* begin = data_ + offset - 1;
+  const void* newline = std::memchr(begin, '\n', size_ - (offset - 1));
+  if (!newline) {
+    return size_;
+  }
+  return static_cast<const char*>(newline) - data_ + 1;
+}
+
+size_t MappedFile::countLines(size_t start, size_t end) const {
+  size_t count = 0;
+  const char* pos = data_ + start;
+  const char* last = data_ + end;
+  while (pos < last) {
+    const void* newline = std::memchr(pos, '\n', last - pos);
+    if (!newline) {
+      break;
+    }
+    ++count;
+    pos = static_cast<const char*>(newline) + 1;
+  }
+  return count;
+}
+
+MappedFileReader::MappedFileReader(
+    std::shared_ptr<MappedFile> file,
+    size_t start,
+    size_t end,
+    size_t bufferSize)
+    : file_(std::move(file)),
+      start_(file_->lineStart(start)),
+      end_(file_->lineStart(end)),
+      bufferSize_(bufferSize),
+      pos_(start_) {}
+
+void MappedFileReader::reset() {
+  pos_ = start_;
+}
+
+void MappedFileReader::operator()(CharRange& range) {
+  if (pos_ >= end_) {
+    range.start = nullptr;
+    range.end = nullptr;
+    return;
+  }
+  size_t next = std::min(end_, pos_ + bufferSize_);
+  range.start = file_->data() + pos_;
+  range.end = file_->data() + next;
+  pos_ = next;
+}
 }
@@ -117,6 +117,58 @@ class CAFFE2_API FileReader : public StringProvider {
   std::unique_ptr<char[]> buffer_;
 };
 
+// A read-only file mapped in memory, which can be shared by the readers of
+// its chunks.
+class CAFFE2_API MappedFile {
+ public:
+  explicit MappedFile(const std::string& path);
+  ~MappedFile();
+  MappedFile(const MappedFile&) = delete;
+  MappedFile& operator=(const MappedFile&) = delete;
+
+  char* data() const {
+    return data_;
+  }
+  size_t size() const {
+    return size_;
+  }
+  // Offset of the first line starting at or after offset.
+  size_t lineStart(size_t offset) const;
+  // Number of line ends in [start, end).
+  size_t countLines(size_t start, size_t end) const;
+
+ private:
+  char* data_{nullptr};
+  size_t size_{0};
+};
+
+// Provides the lines of a mapped file that start in [start, end), by pieces
+// of at most bufferSize bytes, without copying them.
+class CAFFE2_API MappedFileReader : public StringProvider {
+ public:
+  MappedFileReader(
+      std::shared_ptr<MappedFile> file,
+      size_t start,
+      size_t end,
+      size_t bufferSize = 65536);
+  void operator()(CharRange& range) override;
+  void reset() override;
+
+  size_t start() const {
+    return start_;
+  }
+  size_t end() const {
+    return end_;
+  }
+
+ private:
+  std::shared_ptr<MappedFile> file_;
+  const size_t start_;
+  const size_t end_;
+  const size_t bufferSize_;
+  size_t pos_;
+};
+
 } // namespace caffe2
 
 #endif // CAFFE2_OPERATORS_TEXT_FILE_READER_UTILS_H
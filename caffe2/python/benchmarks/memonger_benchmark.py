@@ -0,0 +1,73 @@
+"""
+Times memonger.optimize_interference on large synthetic nets: a chain of
+Relu ops with Add ops joining skip connections, like a deep residual net,
+for each blob assignment algorithm.
+
+Usage:
+
+    python -m caffe2.python.benchmarks.memonger_benchmark --num-ops 10000
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import random
+import time
+
+from caffe2.python import core, memonger
+
+
+def synthetic_net(num_ops, skip, seed):
+    rng = random.Random(seed)
+    net = core.Net("synthetic")
+    blobs = ["data"]
+    blob_sizes = {"data": 1 << 20}
+    for i in range(num_ops):
+        output = "x{}".format(i)
+        if i >= skip and i % skip == 0:
+            net.Add([blobs[-1], blobs[-skip]], output)
+        else:
+            net.Relu(blobs[-1], output)
+        blobs.append(output)
+        blob_sizes[output] = rng.choice([1, 2, 4, 8]) << 18
+    return net.Proto(), blob_sizes
+
+
+def benchmark_memonger(num_ops, skip, repeat, seed):
+    net, blob_sizes = synthetic_net(num_ops, skip, seed)
+    static_blobs = ["data", net.op[-1].output[0]]
+    baseline = sum(blob_sizes.values())
+    for algo in memonger.AssignmentAlgorithm:
+        # The DP algorithm doesn't scale to these nets
+        if algo == memonger.AssignmentAlgorithm.DYNAMIC_PROGRAMMING:
+            continue
+        memonger.clear_optimization_cache()
+        start = time.time()
+        optim = memonger.optimize_interference(
+            net, static_blobs, blob_sizes=blob_sizes, algo=algo)
+        elapsed = time.time() - start
+        start = time.time()
+        for _ in range(repeat):
+            memonger.optimize_interference(
+                net, static_blobs, blob_sizes=blob_sizes, algo=algo)
+        cached = (time.time() - start) / max(repeat, 1)
+        optimized = sum(
+            max(blob_sizes[blob] for (blob, _) in assignment)
+            for assignment in optim.assignments)
+        print("{:>20}  {:>8.3f} s  cached {:>8.3f} s  {:>8.1f} MB -> {:>8.1f} MB"
+              .format(algo.name, elapsed, cached, baseline / 1e6,
+                      optimized / 1e6))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark memonger on synthetic nets.")
+    parser.add_argument("--num-ops", type=int, default=10000,
+                        help="Number of ops of the net.")
+    parser.add_argument("--skip", type=int, default=4,
+                        help="Length of the skip connections.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of cached optimizations timed.")
+    parser.add_argument("--seed", type=int, default=0)
+    args, extra_args = parser.parse_known_args()
+    core.GlobalInit(["python"] + extra_args)
+    benchmark_memonger(args.num_ops, args.skip, args.repeat, args.seed)
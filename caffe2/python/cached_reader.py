@@ -8,11 +8,44 @@ from __future__ import unicode_literals
 import os
 
 from caffe2.python import core
+from caffe2.python.dataio import Writer
+from caffe2.python.dataset import Dataset
 from caffe2.python.db_file_reader import DBFileReader
 from caffe2.python.pipeline import pipe
 from caffe2.python.task import Cluster, TaskGroup
 
 
+class _RoundRobinWriter(Writer):
+    """Writer that spreads the threads of a pipe over several writers.
+
+    A pipe calls write_ex once per thread, so each thread writes to its own
+    writer, taken in turn.
+    """
+    def __init__(self, writers):
+        self._writers = writers
+        self._next = 0
+
+    def _next_writer(self):
+        writer = self._writers[self._next % len(self._writers)]
+        self._next += 1
+        return writer
+
+    def setup_ex(self, init_net, finish_net):
+        for writer in self._writers:
+            writer.setup_ex(init_net, finish_net)
+
+    def write(self, writer_net, fields):
+        self._next_writer().write(writer_net, fields)
+
+    def write_ex(self, fields, local_init_net, local_finish_net, stop_blob):
+        return self._next_writer().write_ex(
+            fields, local_init_net, local_finish_net, stop_blob)
+
+    def commit(self, finish_net):
+        for writer in self._writers:
+            writer.commit(finish_net)
+
+
 class CachedReader(DBFileReader):
 
     default_name_suffix = 'cached_reader'
@@ -35,6 +68,13 @@ class CachedReader(DBFileReader):
     If db_path doesn't exist, it's expected build_cache_step to be called
     first to build a cache at db_path.
 
+    With num_shards > 1, the cache is split across num_shards DB files at
+    '<db_path>-<i>-of-<num_shards>', each written by its own share of the
+    threads copying from the original reader and saved concurrently, so that
+    neither the dataset appends nor the saves are serialized. The shards are
+    loaded and concatenated when the reader is set up, and reads are then
+    served from memory, like for a single DB file.
+
     build_cache_step will check existence of provided db_path and in case
     it's missing will initialize it by reading data from original reader.
     All consequent attempts to read will ignore original reader
@@ -58,6 +98,13 @@ class CachedReader(DBFileReader):
         loop_over: bool.
             If True given, will go through examples in random order endlessly.
             Defaults to False.
+        num_shards: int.
+            Number of DB files the cache is split across.
+            Defaults to 1.
+        num_threads: int.
+            Number of threads copying data from the original reader when
+            building the cache. At least one per shard is used.
+            Defaults to 16.
     """
     def __init__(
         self,
@@ -67,9 +114,14 @@ class CachedReader(DBFileReader):
         name=None,
         batch_size=100,
         loop_over=False,
+        num_shards=1,
+        num_threads=16,
     ):
         assert original_reader is not None, "original_reader can't be None"
+        assert num_shards >= 1, "num_shards must be positive"
         self.original_reader = original_reader
+        self.num_shards = num_shards
+        self.num_threads = num_threads
 
         super(CachedReader, self).__init__(
             db_path,
@@ -78,6 +130,19 @@ class CachedReader(DBFileReader):
             batch_size,
             loop_over,
         )
+        self.shard_ds = [
+            Dataset(self._schema, '{}_dataset_shard_{}'.format(self.name, i))
+            for i in range(num_shards)
+        ] if num_shards > 1 else []
+
+    def shard_db_paths(self):
+        """Paths of the DB files of the cache."""
+        if self.num_shards == 1:
+            return [self.db_path]
+        return [
+            '{}-{:05d}-of-{:05d}'.format(self.db_path, i, self.num_shards)
+            for i in range(self.num_shards)
+        ]
 
     def _init_reader_schema(self, *args, **kwargs):
         """Prepare the reader schema.
@@ -107,27 +172,90 @@ class CachedReader(DBFileReader):
                 build_cache_step: ExecutionStep.
                     The step to be run for building a cache DB file.
         """
-        if os.path.exists(self.db_path) and not overwrite:
+        if all(os.path.exists(path) for path in self.shard_db_paths()) \
+                and not overwrite:
             # cache already exists, no need to rebuild it
             return core.execution_step('build_step', [])
 
+        if self.num_shards == 1:
+            init_net = core.Net('init')
+            self._init_field_blobs_as_empty(init_net)
+            with Cluster(), core.NameScope(self.name), TaskGroup() as copy_tg:
+                pipe(self.original_reader, self.ds.writer(),
+                     num_threads=self.num_threads)
+                copy_step = copy_tg.to_task().get_step()
+            save_net = core.Net('save')
+            self._save_field_blobs_to_db_file(save_net)
+
+            return core.execution_step(
+                'build_cache', [init_net, copy_step, save_net])
+
         init_net = core.Net('init')
-        self._init_field_blobs_as_empty(init_net)
+        with core.NameScope(self.name):
+            for ds in self.shard_ds:
+                ds.init_empty(init_net)
         with Cluster(), core.NameScope(self.name), TaskGroup() as copy_tg:
-            pipe(self.original_reader, self.ds.writer(), num_threads=16)
+            pipe(
+                self.original_reader,
+                _RoundRobinWriter([ds.writer() for ds in self.shard_ds]),
+                num_threads=max(self.num_threads, self.num_shards),
+            )
             copy_step = copy_tg.to_task().get_step()
-        save_net = core.Net('save')
-        self._save_field_blobs_to_db_file(save_net)
+        save_nets = []
+        for i, (ds, path) in enumerate(zip(self.shard_ds, self.shard_db_paths())):
+            save_net = core.Net('save_shard_{}'.format(i))
+            self._save_field_blobs_to_db_file(save_net, ds, path)
+            # The shards are loaded back from the DB files by setup
+            save_net.Free(ds.get_blobs(), ds.get_blobs())
+            save_nets.append(save_net)
+        save_step = core.execution_step(
+            'save_shards', save_nets, concurrent_substeps=True)
 
-        return core.execution_step('build_cache', [init_net, copy_step, save_net])
+        return core.execution_step('build_cache', [init_net, copy_step, save_step])
 
-    def _save_field_blobs_to_db_file(self, net):
+    def _save_field_blobs_to_db_file(self, net, ds=None, db_path=None):
         """Save dataset field blobs to a DB file at db_path"""
+        ds = ds or self.ds
         net.Save(
-            self.ds.get_blobs(),
+            ds.get_blobs(),
             [],
-            db=self.db_path,
+            db=db_path or self.db_path,
             db_type=self.db_type,
-            blob_name_overrides=self.ds.field_names(),
+            blob_name_overrides=ds.field_names(),
             absolute_path=True,
         )
+
+    def _feed_field_blobs_from_db_file(self, net):
+        """Load the shards of the cache and concatenate them into the dataset
+        field blobs"""
+        if self.num_shards == 1:
+            return super(CachedReader, self)._feed_field_blobs_from_db_file(net)
+
+        with core.NameScope(self.name):
+            for ds in self.shard_ds:
+                ds.init_empty(net)
+        for ds, path in zip(self.shard_ds, self.shard_db_paths()):
+            if self.db_type == "log_file_db":
+                assert os.path.exists(path), \
+                    'db_path [{db_path}] does not exist'.format(db_path=path)
+            net.Load(
+                [],
+                ds.get_blobs(),
+                db=path,
+                db_type=self.db_type,
+                absolute_path=True,
+                source_blob_names=ds.field_names(),
+            )
+        shard_blobs = [ds.get_blobs() for ds in self.shard_ds]
+        split_infos = []
+        for i, blob in enumerate(self.ds.get_blobs()):
+            split_info = net.NextScopedBlob('shard_split_info')
+            net.Concat(
+                [blobs[i] for blobs in shard_blobs],
+                [blob, split_info],
+                axis=0,
+            )
+            split_infos.append(split_info)
+        # Only keep the concatenated copy of the cache in the workspace
+        to_free = [b for blobs in shard_blobs for b in blobs] + split_infos
+        net.Free(to_free, to_free)
@@ -57,6 +57,15 @@ load random images from a directory on a file system.
 
 For a dummy example, see the data_workers_test unit test.
 
+If use_worker_processes is set to True, each fetcher runs in a child process
+instead of a thread, so that fetchers doing python-heavy work (decoding,
+parsing) are not serialized by the GIL. A fetcher process fetches one chunk
+ahead of the thread that drives it, and hands its arrays over in a shared
+memory buffer of 'shared_memory_bytes' bytes; chunks that don't fit in it, or
+that are not all numpy arrays, are sent through a pipe. The fetcher function
+is pickled if the multiprocessing start method is not 'fork', and each process
+reseeds numpy and python random number generators.
+
 Note that for data_parallel_models, init_data_input_workers will be called
 for each GPU. Note that the 'coordinator' returned by the function is same
 each time.
@@ -69,7 +78,10 @@ except ImportError:
     import queue as Queue
 from itertools import chain
 import logging
+import multiprocessing
+import random
 import threading
+import traceback
 import numpy as np
 import time
 
@@ -83,6 +95,29 @@ log.setLevel(logging.INFO)
 LOG_INT_SECS = 60
 
 
+_NUMPY_TO_CAFFE2_TYPE = {
+    np.float32: core.DataType.FLOAT,
+    np.float64: core.DataType.DOUBLE,
+    np.float16: core.DataType.FLOAT16,
+    np.int32: core.DataType.INT32,
+    np.int64: core.DataType.INT64,
+    np.int16: core.DataType.INT16,
+    np.int8: core.DataType.INT8,
+    np.uint16: core.DataType.UINT16,
+    np.uint8: core.DataType.UINT8,
+    np.bool_: core.DataType.BOOL,
+}
+
+
+def _slice_along(arr, axis, start, stop):
+    '''
+    Returns the view of arr from start to stop along axis.
+    '''
+    index = [slice(None)] * arr.ndim
+    index[axis] = slice(start, stop)
+    return arr[tuple(index)]
+
+
 def get_worker_ids(num_workers):
     return list(range(0, num_workers))
 
@@ -99,7 +134,9 @@ def init_data_input_workers(
     external_loggers=None,
     dont_rebatch=False,
     batch_columns=None,
-    timeout=600
+    timeout=600,
+    use_worker_processes=False,
+    shared_memory_bytes=64 << 20,
 ):
     global global_coordinator
     device_option = scope.CurrentDeviceScope()
@@ -127,9 +164,23 @@ def init_data_input_workers(
         for i in range(num_worker_threads)
     ]
 
+    if use_worker_processes:
+        fetchers = [
+            ProcessFetcher(fetch_fun, worker_id, batch_size, shared_memory_bytes)
+            for worker_id in worker_ids
+        ]
+
+        def shutdown_fun():
+            for fetcher in fetchers:
+                fetcher.close()
+    else:
+        fetchers = None
+        shutdown_fun = None
+
     # Create coordinator object
     coordinator = WorkerCoordinator(
-        input_source_name, worker_ids, init_fun, batch_feeder)
+        input_source_name, worker_ids, init_fun, batch_feeder,
+        shutdown_fun=shutdown_fun)
 
     workers = [
         threading.Thread(
@@ -137,8 +188,11 @@ def init_data_input_workers(
             name="data_workers fetcher id {}".format(worker_id),
             args=[coordinator,
                   DataWorker(coordinator, worker_id, fetch_fun, metrics,
-                             batch_size, batch_feeder)],
-        ) for worker_id in worker_ids
+                             batch_size, batch_feeder)
+                  if fetchers is None else
+                  ProcessDataWorker(coordinator, worker_id, fetchers[i],
+                                    metrics, batch_size, batch_feeder)],
+        ) for i, worker_id in enumerate(worker_ids)
     ]
 
     workers.append(threading.Thread(
@@ -171,6 +225,10 @@ class BatchFeeder(State):
         self._prev_seconds = 0
         self._last_warning = time.time()
         self._dont_rebatch = dont_rebatch
+        # Samples of the last chunk that did not fit in the previous batch
+        self._leftover = None
+        self._host_buffers = {}
+        self._scratch_c_blobs = None
         self._init_scratch()
         self._metrics = metrics
 
@@ -181,6 +239,7 @@ class BatchFeeder(State):
     def start(self):
         self._inputs = 0
         self._prev_seconds = time.time()
+        self._scratch_c_blobs = None
 
     def stop(self):
         try:
@@ -192,6 +251,8 @@ class BatchFeeder(State):
             self._log_inputs_per_interval(0, force=True)
 
     def cleanup(self):
+        self._scratch_c_blobs = None
+        self._host_buffers = {}
         utils.ResetBlobs(self._scratch_blob.values())
         utils.ResetBlobs(self._scratch_status.values())
 
@@ -264,61 +325,116 @@ class BatchFeeder(State):
         '''
         This pulls data from the python-side queue and collects them
         into batch-sized pieces, unless dont_rebatch is set to true.
+
+        The chunks are sliced without copies, and copied once into the batch:
+        directly into the memory of the scratch blobs on CPU, and into reused
+        numpy buffers that are fed to the scratch blobs otherwise. Samples
+        over the batch size are kept for the next batch.
         '''
         if self._dont_rebatch:
             self._enqueue_batch_direct(data_input_coordinator)
             return
 
-        cur_batch = [np.array([]) for d in self._input_blob_names]
         first_batch_col = self._batch_columns[0]
+        pieces = []
+        num_samples = 0
 
         # Collect data until we have a full batch size
-        while (
-            cur_batch[0].shape[0] == 0 or
-            cur_batch[0].shape[first_batch_col] < self._batch_size
-        ) and data_input_coordinator.is_active():
-            chunk = self._get(data_input_coordinator)
+        while num_samples < self._batch_size and \
+                data_input_coordinator.is_active():
+            if self._leftover is not None:
+                chunk, self._leftover = self._leftover, None
+            else:
+                chunk = self._get(data_input_coordinator)
             if chunk is None:
                 continue
 
-            for j, chunk_elem in enumerate(chunk):
-                if cur_batch[j].shape[0] == 0:
-                    cur_batch[j] = chunk_elem.copy()
-                else:
-                    cur_batch[j] = np.append(
-                        cur_batch[j], chunk_elem, axis=self._batch_columns[j]
-                    )
+            chunk_samples = chunk[0].shape[first_batch_col]
+            needed = self._batch_size - num_samples
+            if chunk_samples > needed:
+                self._leftover = [
+                    _slice_along(d, col, needed, None)
+                    for d, col in zip(chunk, self._batch_columns)
+                ]
+                chunk = [
+                    _slice_along(d, col, 0, needed)
+                    for d, col in zip(chunk, self._batch_columns)
+                ]
+                chunk_samples = needed
+            pieces.append(chunk)
+            num_samples += chunk_samples
+
+        if not data_input_coordinator.is_active():
+            return
 
         start_time = time.time()
         try:
-            # Return data over the batch size back to queue
-            if cur_batch[0].shape[0] > 0 and cur_batch[0].shape[
-                first_batch_col
-            ] > self._batch_size:
-                leftover = []
-                trimmed_batch = []
-                for j, b in enumerate(cur_batch):
-                    [c, l] = np.split(
-                        b, [self._batch_size], axis=self._batch_columns[j]
-                    )
-                    leftover.append(l)
-                    trimmed_batch.append(c)
-                cur_batch = trimmed_batch
-                try:
-                    self._internal_queue.put(leftover, block=False)
-                except Queue.Full:
-                    pass
-
-                assert cur_batch[0].shape[first_batch_col] == self._batch_size
-
-            if data_input_coordinator.is_active():
-                for b, q, c in zip(
-                    self._input_blob_names, self._queues, cur_batch
-                ):
-                    self._enqueue(b, q, c)
+            for j, (b, q) in enumerate(zip(self._input_blob_names, self._queues)):
+                self._enqueue_pieces(b, q, [chunk[j] for chunk in pieces],
+                                     self._batch_columns[j])
         finally:
             self._metrics.put_metric('enqueue_time', time.time() - start_time)
 
+    def _batch_buffer(self, blob_name, shape, dtype):
+        '''
+        Returns an array of the given shape and dtype to assemble a batch in,
+        and whether it is the memory of the scratch blob itself. It is only
+        valid until the blob is enqueued.
+        '''
+        caffe2_type = _NUMPY_TO_CAFFE2_TYPE.get(dtype.type)
+        if self._device_option.device_type == caffe2_pb2.CPU and \
+                caffe2_type is not None:
+            if self._scratch_c_blobs is None:
+                blobs = workspace.C.Workspace.current.blobs
+                self._scratch_c_blobs = {
+                    name: blobs[str(scratch)]
+                    for name, scratch in self._scratch_blob.items()
+                }
+            # Enqueuing swaps the tensor out of the blob, so it is looked up
+            # for every batch. Its memory is reused if it is large enough.
+            tensor = self._scratch_c_blobs[blob_name].tensor()
+            tensor.init(list(shape), caffe2_type)
+            return tensor.data, True
+
+        buf = self._host_buffers.get(blob_name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._host_buffers[blob_name] = buf
+        return buf, False
+
+    def _enqueue_pieces(self, blob_name, queue, pieces, batch_col):
+        '''
+        Copies the pieces of a batch into the scratch blob and enqueues it.
+        '''
+        first = pieces[0]
+        shape = list(first.shape)
+        shape[batch_col] = sum(p.shape[batch_col] for p in pieces)
+        for p in pieces[1:]:
+            if p.ndim != first.ndim or any(
+                p.shape[k] != first.shape[k]
+                for k in range(first.ndim) if k != batch_col
+            ):
+                raise ValueError(
+                    "Chunks of {} have inconsistent shapes {} and {}".format(
+                        blob_name, first.shape, p.shape))
+        dtype = np.result_type(*pieces)
+
+        start_time = time.time()
+        batch, in_blob = self._batch_buffer(blob_name, tuple(shape), dtype)
+        offset = 0
+        for p in pieces:
+            size = p.shape[batch_col]
+            _slice_along(batch, batch_col, offset, offset + size)[...] = p
+            offset += size
+        self._metrics.put_metric('rebatch_time', time.time() - start_time)
+        self._metrics.put_metric('rebatch_bytes', batch.nbytes, False)
+        del batch
+
+        if in_blob:
+            self._enqueue_scratch(blob_name, queue)
+        else:
+            self._enqueue(blob_name, queue, self._host_buffers[blob_name])
+
     def _init_scratch(self):
         self._scratch_blob = {}
         self._scratch_status = {}
@@ -346,12 +462,20 @@ class BatchFeeder(State):
         '''
         Enqueue the correctly sized batch arrays to Caffe2's queue.
         '''
+        start_time = time.time()
         workspace.FeedBlob(
             self._scratch_blob[blob_name],
             data_arr,
             device_option=self._device_option
         )
+        self._metrics.put_metric('feed_time', time.time() - start_time)
+        self._enqueue_scratch(blob_name, queue)
 
+    def _enqueue_scratch(self, blob_name, queue):
+        '''
+        Enqueue the scratch blob to Caffe2's queue, which swaps it with a
+        free blob of the queue.
+        '''
         op = core.CreateOperator(
             "SafeEnqueueBlobs",
             [queue, self._scratch_blob[blob_name]],
@@ -457,6 +581,184 @@ class DataWorker(Worker):
             'fetcher_time', time.time() - self._start_time)
 
 
+class ProcessDataWorker(DataWorker):
+    '''
+    Data worker whose fetcher function runs in the child process of a
+    ProcessFetcher.
+    '''
+    def __init__(
+        self,
+        coordinator,
+        worker_id,
+        fetcher,
+        metrics,
+        batch_size,
+        batch_feeder
+    ):
+        DataWorker.__init__(self, coordinator, worker_id, None, metrics,
+                            batch_size, batch_feeder)
+        self._fetcher = fetcher
+
+    def run(self):
+        try:
+            input_data = self._fetcher.get(self._coordinator)
+        except (EOFError, IOError, OSError):
+            # The process is closed when the coordinator stops
+            if not self._coordinator.is_active():
+                return
+            raise
+        if input_data is None:
+            return
+        self._batch_feeder.put(input_data, self._coordinator)
+
+
+def _write_chunk(chunk, buf):
+    '''
+    Writes the arrays of chunk to the shared buffer buf, and returns their
+    (dtype, shape, offset), or None if they can't all be written to it.
+    '''
+    if not isinstance(chunk, (list, tuple)) or not all(
+        isinstance(d, np.ndarray) and not d.dtype.hasobject for d in chunk
+    ):
+        return None
+    layout = []
+    offset = 0
+    for d in chunk:
+        offset = (offset + 63) // 64 * 64
+        if offset + d.nbytes > len(buf):
+            return None
+        layout.append((d.dtype.str, d.shape, offset))
+        offset += d.nbytes
+    for d, (_, _, offset) in zip(chunk, layout):
+        np.ndarray(d.shape, dtype=d.dtype, buffer=buf, offset=offset)[...] = d
+    return layout
+
+
+def _read_chunk(layout, buf):
+    return [
+        np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=offset).copy()
+        for dtype, shape, offset in layout
+    ]
+
+
+def _run_fetcher_process(fetch_fun, worker_id, batch_size, buffers, conn):
+    '''
+    Main loop of a fetcher process: fetches chunks while one of the shared
+    buffers is free, and sends them to the parent process. The parent sends
+    back the index of each buffer it is done with, or None to stop.
+    '''
+    np.random.seed()
+    random.seed()
+    views = [memoryview(b).cast('B') for b in buffers]
+    free = list(range(len(buffers)))
+    try:
+        while True:
+            while not free or conn.poll():
+                slot = conn.recv()
+                if slot is None:
+                    return
+                free.append(slot)
+            try:
+                chunk = fetch_fun(worker_id, batch_size)
+            except Exception:
+                conn.send(('error', traceback.format_exc()))
+                return
+            layout = _write_chunk(chunk, views[free[-1]])
+            if layout is None:
+                conn.send(('pickled', chunk))
+            else:
+                conn.send(('shared', free.pop(), layout))
+    except (EOFError, KeyboardInterrupt):
+        return
+
+
+class ProcessFetcher(object):
+    '''
+    Runs a fetcher function in a child process, which is started on the
+    first call to get() and stopped by close(), after which get() returns
+    None.
+    '''
+    def __init__(self, fetch_fun, worker_id, batch_size, shared_memory_bytes,
+                 num_buffers=2):
+        self._fetch_fun = fetch_fun
+        self._worker_id = worker_id
+        self._batch_size = batch_size
+        self._shared_memory_bytes = shared_memory_bytes
+        self._num_buffers = num_buffers
+        self._process = None
+        self._conn = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _launch(self):
+        self._buffers = [
+            multiprocessing.RawArray('B', self._shared_memory_bytes)
+            for _ in range(self._num_buffers)
+        ]
+        self._views = [memoryview(b).cast('B') for b in self._buffers]
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_run_fetcher_process,
+            name="data_workers fetcher process id {}".format(self._worker_id),
+            args=(self._fetch_fun, self._worker_id, self._batch_size,
+                  self._buffers, child_conn),
+        )
+        self._process.daemon = True
+        self._process.start()
+        child_conn.close()
+
+    def get(self, coordinator):
+        '''
+        Returns the next chunk fetched by the process, or None if the
+        coordinator stopped before it was available.
+        '''
+        with self._lock:
+            # The fetcher is closed when the coordinator stops
+            if self._closed:
+                return None
+            if self._process is None:
+                self._launch()
+            # close() may run while this thread polls
+            process = self._process
+            conn = self._conn
+            views = self._views
+        while not conn.poll(0.5):
+            if not coordinator.is_active():
+                return None
+            if not process.is_alive():
+                raise RuntimeError(
+                    "Fetcher process {} exited unexpectedly with code {}".format(
+                        self._worker_id, process.exitcode))
+        message = conn.recv()
+        if message[0] == 'error':
+            raise RuntimeError(
+                "Exception in fetcher process {}:\n{}".format(
+                    self._worker_id, message[1]))
+        if message[0] == 'pickled':
+            return message[1]
+        _, slot, layout = message
+        chunk = _read_chunk(layout, views[slot])
+        conn.send(slot)
+        return chunk
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._process is None:
+                return
+            try:
+                self._conn.send(None)
+            except (IOError, OSError):
+                pass
+            self._process.join(5.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._conn.close()
+            self._process = None
+            self._conn = None
+
+
 global_coordinator = GlobalCoordinator()
 
 
@@ -76,6 +76,75 @@ class DataWorkersTest(unittest.TestCase):
         coordinator.stop_coordinator("unittest")
         self.assertEqual(coordinator._coordinators, [])
 
+    def testProcessWorkers(self):
+        workspace.ResetWorkspace()
+
+        model = model_helper.ModelHelper(name="test_processes")
+        coordinator = data_workers.init_data_input_workers(
+            model,
+            ["data", "label"],
+            dummy_fetcher,
+            32,
+            2,
+            input_source_name="unittest_processes",
+            use_worker_processes=True,
+            # Large chunks don't fit and are sent through the pipe
+            shared_memory_bytes=1024,
+        )
+        coordinator.start()
+
+        workspace.RunNetOnce(model.param_init_net)
+        workspace.CreateNet(model.net)
+
+        for _i in range(100):
+            with timeout_guard.CompleteInTimeOrDie(5):
+                workspace.RunNet(model.net.Proto().name)
+
+            data = workspace.FetchBlob("data")
+            labels = workspace.FetchBlob("label")
+
+            self.assertEqual(data.shape[0], 32)
+            self.assertEqual(labels.shape[0], 32)
+            for j in range(32):
+                self.assertEqual(labels[j], data[j, 0])
+
+        coordinator.stop_coordinator("unittest_processes")
+        self.assertEqual(coordinator._coordinators, [])
+
+    def testRebatchKeepsOrder(self):
+        workspace.ResetWorkspace()
+        counter = [0]
+
+        def sequential_fetcher(fetcher_id, batch_size):
+            # Chunks that don't divide the batch size
+            data = np.arange(counter[0], counter[0] + 7, dtype=np.int64)
+            counter[0] += 7
+            return [data, data.astype(np.float32)]
+
+        model = model_helper.ModelHelper(name="test_rebatch")
+        coordinator = data_workers.init_data_input_workers(
+            model,
+            ["seq", "seq_float"],
+            sequential_fetcher,
+            32,
+            1,
+            input_source_name="unittest_rebatch",
+        )
+        coordinator.start()
+
+        workspace.RunNetOnce(model.param_init_net)
+        workspace.CreateNet(model.net)
+
+        for i in range(20):
+            with timeout_guard.CompleteInTimeOrDie(5):
+                workspace.RunNet(model.net.Proto().name)
+            expected = np.arange(32 * i, 32 * (i + 1))
+            np.testing.assert_array_equal(workspace.FetchBlob("seq"), expected)
+            np.testing.assert_array_equal(
+                workspace.FetchBlob("seq_float"), expected.astype(np.float32))
+
+        coordinator.stop_coordinator("unittest_rebatch")
+
     def testRNNInput(self):
         workspace.ResetWorkspace()
         model = model_helper.ModelHelper(name="rnn_test")
@@ -420,6 +420,36 @@ class TestDBFileReader(TestCase):
 
         self._delete_path(db_path)
 
+    def test_sharded_cached_reader(self):
+        ws = workspace.C.Workspace()
+        session = LocalSession(ws)
+        db_path = self._make_temp_path()
+
+        cached_reader1 = CachedReader(
+            self._build_source_reader(ws, 100), db_path, num_shards=3,
+        )
+        shard_paths = cached_reader1.shard_db_paths()
+        self.temp_paths.extend(shard_paths)
+        self.assertEqual(len(shard_paths), 3)
+        session.run(cached_reader1.build_cache_step())
+        for path in shard_paths:
+            self.assertTrue(os.path.exists(path))
+
+        data = self._read_all_data(ws, cached_reader1, session)
+        self.assertEqual(sorted(data), list(range(100)))
+
+        # Read data from the sharded cache.
+        cached_reader2 = CachedReader(
+            self._build_source_reader(ws, 200), db_path, num_shards=3,
+        )
+        session.run(cached_reader2.build_cache_step())
+
+        data = self._read_all_data(ws, cached_reader2, session)
+        self.assertEqual(sorted(data), list(range(100)))
+
+        for path in shard_paths:
+            self._delete_path(path)
+
     def test_db_file_reader(self):
         ws = workspace.C.Workspace()
         session = LocalSession(ws)
@@ -6,7 +6,10 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import networkx as nx
+import bisect
 import collections
+import hashlib
+import heapq
 import time
 import copy
 from caffe2.python import workspace, core
@@ -560,6 +563,66 @@ def compute_assignments_greedy(ranges_sorted, init_assignments=None):
     return assignments
 
 
+def compute_assignments_interval(ranges_sorted, init_assignments=None):
+    ''' Compute assignment for blobs in 'ranges_sorted' by coloring their
+        interval graph: blobs are visited in the order they are defined, the
+        assignments whose last blob is no longer used are kept in a free list
+        sorted by size, and each blob goes to the free assignment closest to
+        its size (as in compute_assignments_greedy) or to a new one.
+
+        Visiting blobs by definition gives the minimum number of assignments.
+        With k assignments, each blob takes O(log n) heap and O(log k) search
+        operations, plus an O(k) insertion into and removal from the free
+        list, which are memmoves of a Python list rather than the Python loop
+        over all the assignments of compute_assignments_greedy.
+    '''
+    assignments = init_assignments or []
+    visited = {y[0] for x in assignments for y in x}
+    max_sizes = [_get_max_size(x) for x in assignments]
+    # (last used, index) of the assignments whose last blob is still live
+    live = [(x[-1][1].used, idx) for idx, x in enumerate(assignments)
+            if x[-1][1].defined is not None and x[-1][1].used is not None]
+    heapq.heapify(live)
+    # (max size, index) of the assignments a blob can be appended to
+    free = []
+
+    ranges_sorted = [x for x in ranges_sorted if x[0] not in visited]
+    # Blobs without a definition can't share an assignment
+    for (name, range_) in ranges_sorted:
+        if range_.defined is None:
+            assignments.append([(name, range_)])
+            max_sizes.append(range_.size or 0)
+    ranges_defined = sorted(
+        (x for x in ranges_sorted if x[1].defined is not None),
+        key=lambda x: x[1].defined)
+
+    for (name, range_) in ranges_defined:
+        while live and live[0][0] < range_.defined:
+            _, idx = heapq.heappop(live)
+            bisect.insort(free, (max_sizes[idx], idx))
+        candidate_size = range_.size or 0
+        best = None
+        pos = bisect.bisect_left(free, (candidate_size, -1))
+        # Closest sizes are the smallest one not below the blob size and the
+        # largest one below it, the former wins ties as it doesn't grow.
+        if pos < len(free):
+            best = pos
+        if pos > 0 and (best is None or candidate_size - free[pos - 1][0] <
+                        free[pos][0] - candidate_size):
+            best = pos - 1
+        if best is not None:
+            _, idx = free.pop(best)
+            assignments[idx].append((name, range_))
+            max_sizes[idx] = max(max_sizes[idx], candidate_size)
+        else:
+            idx = len(assignments)
+            assignments.append([(name, range_)])
+            max_sizes.append(candidate_size)
+        if range_.used is not None:
+            heapq.heappush(live, (range_.used, idx))
+    return assignments
+
+
 def _get_count(assignments):
     ''' Return number of blobs in assignments '''
     if assignments:
@@ -716,12 +779,14 @@ def get_updated_ranges(ranges, max_live=None):
 
 def compute_assignments(ranges, static_blobs, algo):
     '''
-    algo: Method used to find assignments (AssignmentAlgorithm.GREEDY or
-          AssignmentAlgorithm.DYNAMIC_PROGRAMMING).
+    algo: Method used to find assignments (AssignmentAlgorithm.GREEDY,
+          AssignmentAlgorithm.DYNAMIC_PROGRAMMING or
+          AssignmentAlgorithm.INTERVAL_COLORING).
           AssignmentAlgorithm.DYNAMIC_PROGRAMMING gives optimal solution at the
           cost of more computation.
           AssignmentAlgorithm.GREEDY may be better in the case 'blob_sizes' is
           not provided.
+          AssignmentAlgorithm.INTERVAL_COLORING is the fastest, for large nets.
     '''
 
     # Sort the ranges based on when they are last used.
@@ -747,6 +812,8 @@ def compute_assignments(ranges, static_blobs, algo):
         best_assignment = compute_assignments_dp(ranges_sharable, [])
     elif algo == AssignmentAlgorithm.GREEDY:
         best_assignment = compute_assignments_greedy(ranges_sharable, [])
+    elif algo == AssignmentAlgorithm.INTERVAL_COLORING:
+        best_assignment = compute_assignments_interval(ranges_sharable, [])
     else:
         assert "Invalid algo name {}".format(algo)
     best_assignment += [[x] for x in ranges_static]
@@ -766,14 +833,22 @@ def compute_interference_graph(ops):
     g = nx.DiGraph()
     for i, op in enumerate(ops):
         g.add_node(i, op=op)
-    for i, parent_op in enumerate(ops):
-        for j, child_op in enumerate(ops):
-            if i >= j:
-                continue
-            if any(output in child_op.input for output in parent_op.output):
-                deps = set(child_op.input).intersection(parent_op.output)
-                g.add_edge(i, j, deps=deps)
-                assert nx.is_directed_acyclic_graph(g), child_op
+    # Ops that output each blob, so that an op is only compared with the
+    # ops it reads from rather than with all the previous ops.
+    producers = collections.defaultdict(list)
+    for j, child_op in enumerate(ops):
+        deps = collections.defaultdict(set)
+        for input_ in child_op.input:
+            for i in producers.get(input_, ()):
+                deps[i].add(input_)
+        # Edges are added in the same order as by comparing all pairs of ops
+        for i in sorted(deps):
+            g.add_edge(i, j, deps=deps[i])
+        for output in child_op.output:
+            if not producers[output] or producers[output][-1] != j:
+                producers[output].append(j)
+    # Edges always go to a later op
+    assert nx.is_directed_acyclic_graph(g)
     return g
 
 
@@ -819,6 +894,30 @@ def apply_recurrent_blob_assignments(op, blob_assignments, canonical_name):
 class AssignmentAlgorithm(enum.Enum):
     GREEDY = 0
     DYNAMIC_PROGRAMMING = 1
+    INTERVAL_COLORING = 2
+
+
+# Results of optimize_interference, most recently used last
+_optimization_cache = collections.OrderedDict()
+_OPTIMIZATION_CACHE_SIZE = 32
+
+
+def clear_optimization_cache():
+    _optimization_cache.clear()
+
+
+def _optimization_cache_key(net, static_blobs, ordering_function, blob_sizes,
+                            algo):
+    h = hashlib.sha1(net.SerializeToString())
+    for blob in sorted(str(b) for b in static_blobs):
+        h.update(b'\0' + blob.encode('utf-8'))
+    h.update(b'\1')
+    if blob_sizes:
+        for blob, size in sorted(
+                (str(b), int(sz)) for b, sz in viewitems(blob_sizes)
+                if sz is not None):
+            h.update('\0{}={}'.format(blob, size).encode('utf-8'))
+    return (h.hexdigest(), ordering_function, algo)
 
 
 def optimize_inference_fast(net, static_blobs):
@@ -834,18 +933,24 @@ def optimize_inference_fast(net, static_blobs):
 def optimize_interference(net, static_blobs,
                           ordering_function=topological_sort_traversal,
                           blob_sizes=None,
-                          algo=AssignmentAlgorithm.GREEDY):
+                          algo=AssignmentAlgorithm.GREEDY,
+                          use_cache=True):
     """
     ordering_function: topological_sort_traversal or
                        topological_sort_traversal_longest_path.
                        topological_sort_traversal_longest_path gives better
                        results but needs a bit more computation.
-    algo: Method used to find assignments (AssignmentAlgorithm.GREEDY or
-          AssignmentAlgorithm.DYNAMIC_PROGRAMMING).
+    algo: Method used to find assignments (AssignmentAlgorithm.GREEDY,
+          AssignmentAlgorithm.DYNAMIC_PROGRAMMING or
+          AssignmentAlgorithm.INTERVAL_COLORING).
           AssignmentAlgorithm.DYNAMIC_PROGRAMMING gives optimal solution at the
           cost of more computation.
           AssignmentAlgorithm.GREEDY may be better in the case 'blob_sizes' is
           not provided.
+          AssignmentAlgorithm.INTERVAL_COLORING is the fastest, for large nets.
+    use_cache: Reuse the result of a previous call with the same net, static
+               blobs, blob sizes, ordering function and algo. Call
+               clear_optimization_cache() to drop the cached results.
     """
 
     """
@@ -857,6 +962,14 @@ def optimize_interference(net, static_blobs,
     4) Rename blobs to canonical blobs
     """
 
+    if use_cache:
+        key = _optimization_cache_key(
+            net, static_blobs, ordering_function, blob_sizes, algo)
+        if key in _optimization_cache:
+            _optimization_cache[key] = _optimization_cache.pop(key)
+            log.info("Reusing the optimization of net {}".format(net.name))
+            return copy.deepcopy(_optimization_cache[key])
+
     net = copy.deepcopy(net)
     g = compute_interference_graph(net.op)
     ordering = ordering_function(g)
@@ -873,10 +986,15 @@ def optimize_interference(net, static_blobs,
     assignments = compute_assignments(ranges, static_blobs, algo)
     blob_assignments = compute_blob_assignments(assignments)
     apply_assignments(net, blob_assignments)
-    return Optimization(
+    optimization = Optimization(
         net=net,
         blob_assignments=blob_assignments,
         assignments=assignments)
+    if use_cache:
+        _optimization_cache[key] = copy.deepcopy(optimization)
+        while len(_optimization_cache) > _OPTIMIZATION_CACHE_SIZE:
+            _optimization_cache.popitem(last=False)
+    return optimization
 
 
 def verify_inplace_blobs(net_a, net_b):
@@ -518,6 +518,43 @@ class MemongerTest(hu.HypothesisTestCase):
         g = memonger.compute_interference_graph(m.net.Proto().op)
         self.assertEqual(list(g.edges()), [(0, 1), (0, 2), (1, 2)])
 
+    def test_compute_interference_graph_deps(self):
+        m = model_helper.ModelHelper()
+        m.Copy("a", "b")
+        m.Add(["a", "b"], "c")
+        m.Sum(["b", "c", "b"], ["a"])
+        m.Copy("c", "d")
+        g = memonger.compute_interference_graph(m.net.Proto().op)
+        self.assertEqual(
+            list(g.edges(data='deps')),
+            [(0, 1, {"b"}), (0, 2, {"b"}), (1, 2, {"c"}), (1, 3, {"c"})])
+
+    def test_optimize_interference_cache(self):
+        m = model_helper.ModelHelper()
+        fc1 = brew.fc(m, "data", "fc1", dim_in=4, dim_out=4)
+        fc2 = brew.fc(m, fc1, "fc2", dim_in=4, dim_out=4)
+        fc3 = brew.fc(m, fc2, "fc3", dim_in=4, dim_out=4)
+        brew.fc(m, fc3, "fc4", dim_in=4, dim_out=4)
+        static_blobs = ["data", "fc4"] + \
+            [o for op in m.param_init_net.Proto().op for o in op.output]
+
+        memonger.clear_optimization_cache()
+        optim = memonger.optimize_interference(m.Proto(), static_blobs)
+        expected = str(optim.net)
+        # Changing the result must not change the cached one
+        optim.net.op[0].output[0] = "changed"
+        optim.blob_assignments.clear()
+        cached = memonger.optimize_interference(m.Proto(), static_blobs)
+        self.assertEqual(str(cached.net), expected)
+        self.assertNotEqual(cached.blob_assignments, {})
+        uncached = memonger.optimize_interference(
+            m.Proto(), static_blobs, use_cache=False)
+        self.assertEqual(str(uncached.net), expected)
+        self.assertEqual(cached.blob_assignments, uncached.blob_assignments)
+        other = memonger.optimize_interference(
+            m.Proto(), static_blobs + ["fc1"])
+        self.assertNotIn("fc1", other.blob_assignments)
+
     def test_topological_sort_longest_path(self):
         m = model_helper.ModelHelper()
         # 0
@@ -624,6 +661,46 @@ class MemongerTest(hu.HypothesisTestCase):
         best = memonger.compute_assignments_dp(ranges_sorted, [])
         self.assertEqual(memonger.get_memory_usage(best), 11)
 
+    def test_compute_assignments_interval(self):
+        LiveRange = memonger.LiveRange
+        ranges_sorted = [
+            ('b1', LiveRange(1, 3, 10)),
+            ('b2', LiveRange(3, 4, 1)),
+            ('b3', LiveRange(5, 6, 1)),
+            ('b4', LiveRange(5, 7, 10)),
+        ]
+        assignment_gt = [
+            [ranges_sorted[0], ranges_sorted[3]],
+            [ranges_sorted[1], ranges_sorted[2]],
+        ]
+
+        best = memonger.compute_assignments_interval(ranges_sorted, None)
+        self.assertEqual(memonger.get_memory_usage(best), 11)
+        self.assertEqual(best, assignment_gt)
+
+    def test_compute_assignments_interval_random(self):
+        LiveRange = memonger.LiveRange
+        np.random.seed(0)
+        ranges = []
+        for i in range(500):
+            defined = np.random.randint(1000)
+            ranges.append(('b{}'.format(i), LiveRange(
+                defined, defined + np.random.randint(1, 50),
+                np.random.randint(1, 100))))
+        ranges_sorted = sorted(ranges, key=lambda x: x[1].used)
+
+        best = memonger.compute_assignments_interval(ranges_sorted, [])
+        memonger.verify_assignments(best)
+        self.assertEqual(
+            sorted(x for assignment in best for x in assignment),
+            sorted(ranges))
+        # Interval graphs are colored with as many assignments as the
+        # largest number of blobs live at once.
+        max_live = max(
+            sum(1 for _, r in ranges if r.defined <= t <= r.used)
+            for t in range(1050))
+        self.assertEqual(len(best), max_live)
+
     @given(input_dim=st.integers(min_value=4, max_value=4),
            output_dim=st.integers(min_value=4, max_value=4),
            batch_size=st.integers(min_value=4, max_value=4))
@@ -62,6 +62,51 @@ class TestTextFileReader(TestCase):
                         else:
                             np.testing.assert_array_equal(col_batch, results[i])
 
+    def test_chunked_text_file_reader(self):
+        schema = Struct(
+            ('field1', Scalar(dtype=str)),
+            ('field2', Scalar(dtype=np.float32)))
+        num_rows = 100
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False) as txt_file:
+            txt_file.write(''.join(
+                'row{}\t{}\n'.format(i, i) for i in range(num_rows)))
+            txt_file.flush()
+
+            def read_all(num_chunks, deterministic, num_passes, batch_size):
+                init_net = core.Net('init_net')
+                reader = TextFileReader(
+                    init_net,
+                    filename=txt_file.name,
+                    schema=schema,
+                    batch_size=batch_size,
+                    num_passes=num_passes,
+                    num_chunks=num_chunks,
+                    deterministic=deterministic)
+                workspace.RunNetOnce(init_net)
+
+                net = core.Net('read_net')
+                should_stop, record = reader.read_record(net)
+                values = []
+                while True:
+                    workspace.RunNetOnce(net)
+                    values.extend(FetchRecord(record).field_blobs()[1])
+                    if workspace.FetchBlob(should_stop):
+                        break
+                return values
+
+            for num_chunks in (1, 3, 7):
+                for num_passes in (1, 2):
+                    for deterministic in (False, True):
+                        values = read_all(num_chunks, deterministic, num_passes, 8)
+                        self.assertEqual(
+                            sorted(values),
+                            sorted(list(range(num_rows)) * num_passes))
+                        if deterministic:
+                            self.assertEqual(
+                                values,
+                                read_all(num_chunks, deterministic, num_passes, 8))
+
+
 if __name__ == "__main__":
     import unittest
     unittest.main()
@@ -13,17 +13,28 @@ class TextFileReader(Reader):
     """
     Wrapper around operators for reading from text files.
     """
-    def __init__(self, init_net, filename, schema, num_passes=1, batch_size=1):
+    def __init__(self, init_net, filename, schema, num_passes=1, batch_size=1,
+                 num_chunks=1, deterministic=False, use_mmap=False):
         """
         Create op for building a TextFileReader instance in the workspace.
 
         Args:
-            init_net   : Net that will be run only once at startup.
-            filename   : Path to file to read from.
-            schema     : schema.Struct representing the schema of the data.
-                         Currently, only support Struct of strings and float32.
-            num_passes : Number of passes over the data.
-            batch_size : Number of rows to read at a time.
+            init_net      : Net that will be run only once at startup.
+            filename      : Path to file to read from.
+            schema        : schema.Struct representing the schema of the data.
+                            Currently, only support Struct of strings and
+                            float32.
+            num_passes    : Number of passes over the data.
+            batch_size    : Number of rows to read at a time.
+            num_chunks    : Number of byte ranges, aligned on lines, the file
+                            is split into. The file is then mapped in memory,
+                            and reads running concurrently (e.g. the threads
+                            of a pipe) parse different chunks in parallel.
+            deterministic : If True, the chunks give a batch in turn, so that
+                            the n-th read always returns the same rows.
+                            Otherwise a read takes rows from any chunk that
+                            is not being read, which waits less.
+            use_mmap      : Map the file in memory even if num_chunks is 1.
         """
         assert isinstance(schema, Struct), 'Schema must be a schema.Struct'
         for name, child in schema.get_children():
@@ -36,7 +47,10 @@ class TextFileReader(Reader):
             [],
             filename=filename,
             num_passes=num_passes,
-            field_types=field_types)
+            field_types=field_types,
+            num_chunks=num_chunks,
+            deterministic=deterministic,
+            use_mmap=use_mmap)
         self._batch_size = batch_size
 
     def read(self, net):
@@ -268,6 +268,37 @@ def _unflatten_dense_tensors(flat, tensors):
     return tuple(outputs)
 
 
+def _flat_view_of_dense_tensors(tensors):
+    """Returns a 1-D view over the memory of tensors if they are contiguous
+    tensors of the same type, laid out back to back in a single storage (e.g.
+    if they were returned by _unflatten_dense_tensors), or None otherwise.
+
+    Arguments:
+        tensors (Sequence[Tensor]): non-empty sequence of dense tensors.
+
+    Returns:
+        A flat tensor sharing the storage of tensors, or None.
+    """
+    first = tensors[0]
+    dtype = first.dtype
+    device = first.device
+    element_size = first.element_size()
+    ptr = first.data_ptr()
+    numel = 0
+    for t in tensors:
+        if t.dtype != dtype or t.device != device or t.data_ptr() != ptr or not t.is_contiguous():
+            return None
+        ptr += t.numel() * element_size
+        numel += t.numel()
+    # tensors of other storages may happen to follow each other in memory,
+    # but can't overlap with this one
+    storage = first.storage()
+    offset = first.storage_offset()
+    if offset + numel > storage.size():
+        return None
+    return first.new_empty(0).set_(storage, offset, (numel,))
+
+
 def _unflatten_sparse_tensors(flat, tensors):
     """View flat buffer (containing indices and values) using the sizes of
     tensors. Assume that tensors are of same sparse type, and that flat is given
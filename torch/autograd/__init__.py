@@ -18,6 +18,7 @@ from .grad_mode import no_grad, enable_grad, set_grad_enabled
 from .anomaly_mode import detect_anomaly, set_detect_anomaly
 from . import profiler
 from . import functional
+from . import graph
 
 __all__ = ['Variable', 'Function', 'backward', 'grad_mode']
 
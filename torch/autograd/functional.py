@@ -363,7 +363,77 @@ def jvp(func, inputs, v=None, create_graph=False, strict=False):
     return _tuple_postprocess(outputs, is_outputs_tuple), _tuple_postprocess(jvp, is_outputs_tuple)
 
 
-def jacobian(func, inputs, create_graph=False, strict=False):
+def _batched_jacobian(func, inputs, outputs, create_graph, strict, chunk_size):
+    # Computes the rows of the Jacobian by chunks of `chunk_size` rows: the inputs
+    # are repeated along a new leading dimension, one entry per row, so that a
+    # single backward pass through the batched function gives a whole chunk,
+    # the grad_outputs selecting a different output element for each entry.
+    numels = [out.nelement() for out in outputs]
+    offsets = [sum(numels[:i]) for i in range(len(numels))]
+    total = sum(numels)
+    if chunk_size is None:
+        chunk_size = max(total, 1)
+
+    jac = tuple(tuple([] for _ in inputs) for _ in outputs)
+    for start in range(0, total, chunk_size):
+        size = min(chunk_size, total - start)
+        batched_inputs = tuple(inp.unsqueeze(0).repeat((size,) + (1,) * inp.dim()) for inp in inputs)
+        _, batched_outputs = _as_tuple(func(*batched_inputs),
+                                       "outputs of the user-provided function",
+                                       "jacobian")
+        expected_sizes = [torch.Size((size,)) + out.size() for out in outputs]
+        if [out.size() for out in batched_outputs] != expected_sizes:
+            raise RuntimeError("When vectorize=True, the user-provided function should support inputs with an "
+                               "extra leading batch dimension. For a batch of size {}, expected outputs of sizes "
+                               "{} but got {}.".format(size, expected_sizes,
+                                                       [out.size() for out in batched_outputs]))
+
+        # Outputs without any row in this chunk are left out of the backward pass
+        rows = []
+        chunk_outputs = tuple()
+        grad_outputs = tuple()
+        for out, offset, numel in zip(batched_outputs, offsets, numels):
+            lo, hi = max(start, offset), min(start + size, offset + numel)
+            rows.append((lo, hi))
+            if lo >= hi:
+                chunk_outputs += (None,)
+                grad_outputs += (None,)
+                continue
+            idx = torch.arange(lo, hi, device=out.device)
+            grad_out = out.new_zeros(size, numel)
+            grad_out[idx - start, idx - offset] = 1
+            chunk_outputs += (out,)
+            grad_outputs += (grad_out.view(out.size()),)
+
+        vjs = _autograd_grad(chunk_outputs, batched_inputs, grad_outputs, create_graph=create_graph)
+
+        for i, (lo, hi) in enumerate(rows):
+            if lo >= hi:
+                continue
+            for el_idx, (jac_i_el, vj_el, inp_el) in enumerate(zip(jac[i], vjs, inputs)):
+                if vj_el is not None:
+                    if strict and create_graph and not vj_el.requires_grad:
+                        msg = ("The jacobian of the user-provided function is "
+                               "independent of input {}. This is not allowed in "
+                               "strict mode when create_graph=True.".format(i))
+                        raise RuntimeError(msg)
+                    jac_i_el.append(vj_el[lo - start:hi - start])
+                else:
+                    if strict:
+                        msg = ("Output {} of the user-provided function is "
+                               "independent of input {}. This is not allowed in "
+                               "strict mode.".format(i, el_idx))
+                        raise RuntimeError(msg)
+                    jac_i_el.append(inp_el.new_zeros((hi - lo,) + inp_el.size()))
+
+    return tuple(tuple(torch.cat(jac_i_el, dim=0).view(out.size() + inputs[el_idx].size())
+                       if len(jac_i_el) > 0 else
+                       inputs[el_idx].new_zeros(out.size() + inputs[el_idx].size())
+                       for (el_idx, jac_i_el) in enumerate(jac_i))
+                 for jac_i, out in zip(jac, outputs))
+
+
+def jacobian(func, inputs, create_graph=False, strict=False, vectorize=False, chunk_size=None):
     r"""Function that computes the Jacobian of a given function.
 
     Args:
@@ -379,6 +449,18 @@ def jacobian(func, inputs, create_graph=False, strict=False):
             independent of it. If ``False``, we return a Tensor of zeros as the
             jacobian for said inputs, which is the expected mathematical value.
             Defaults to ``False``.
+        vectorize (bool, optional): If ``True``, many rows of the Jacobian are
+            computed with a single backward pass, by evaluating ``func`` on a
+            batch of copies of the inputs (stacked along a new leading
+            dimension) rather than one backward pass per output element.
+            ``func`` must then support such batched inputs, each entry of the
+            batch being independent of the others, and return outputs batched
+            the same way. Note that in strict mode, an output independent of an
+            input is only detected if the other outputs computed in the same
+            chunk are independent of it too. Defaults to ``False``.
+        chunk_size (int, optional): If ``vectorize`` is ``True``, the number of
+            rows of the Jacobian computed by each backward pass, which bounds
+            the memory used. Defaults to ``None`` (all the rows at once).
 
     Returns:
         Jacobian (Tensor or nested tuple of Tensors): if there are a single
@@ -429,6 +511,13 @@ def jacobian(func, inputs, create_graph=False, strict=False):
                                           "jacobian")
     _check_requires_grad(outputs, "outputs", strict=strict)
 
+    if vectorize:
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size should be a positive integer, but got {}".format(chunk_size))
+        jacobian = _batched_jacobian(func, inputs, outputs, create_graph, strict, chunk_size)
+        jacobian = _grad_postprocess(jacobian, create_graph)
+        return _tuple_postprocess(jacobian, (is_outputs_tuple, is_inputs_tuple))
+
     jacobian = tuple()
     for i, out in enumerate(outputs):
 
@@ -461,7 +550,7 @@ def jacobian(func, inputs, create_graph=False, strict=False):
     return _tuple_postprocess(jacobian, (is_outputs_tuple, is_inputs_tuple))
 
 
-def hessian(func, inputs, create_graph=False, strict=False):
+def hessian(func, inputs, create_graph=False, strict=False, vectorize=False, chunk_size=None):
     r"""Function that computes the Hessian of a given scalar function.
 
     Args:
@@ -476,6 +565,14 @@ def hessian(func, inputs, create_graph=False, strict=False):
             such that all the outputs are independent of it. If ``False``, we return a Tensor of zeros as the
             hessian for said inputs, which is the expected mathematical value.
             Defaults to ``False``.
+        vectorize (bool, optional): If ``True``, many rows of the Hessian are
+            computed with a single double backward pass, by evaluating ``func``
+            on a batch of copies of the inputs (see :func:`jacobian`). ``func``
+            must then support batched inputs, and return a Tensor with one
+            element per entry of the batch. Defaults to ``False``.
+        chunk_size (int, optional): If ``vectorize`` is ``True``, the number of
+            rows of the Hessian computed by each pass. Defaults to ``None``
+            (all the rows at once).
 
     Returns:
         Hessian (Tensor or a tuple of tuple of Tensors) if there are a single input,
@@ -553,7 +650,32 @@ def hessian(func, inputs, create_graph=False, strict=False):
         _check_requires_grad(jac, "jacobian", strict=strict)
         return jac
 
-    res = jacobian(jac_func, inputs, create_graph=create_graph, strict=strict)
+    def batched_jac_func(*inp):
+        # Called both on the inputs and on batches of copies of the inputs,
+        # in which case func returns one element per entry of the batch and
+        # the gradient of their sum gives the gradient of each entry.
+        is_batched = inp[0].dim() > inputs[0].dim()
+        out = func(*inp)
+        is_out_tuple, t_out = _as_tuple(out, "outputs of the user-provided function", "hessian")
+        _check_requires_grad(t_out, "outputs", strict=strict)
+
+        if is_out_tuple or not isinstance(out, torch.Tensor):
+            raise RuntimeError("The function given to hessian should return a single Tensor")
+
+        if out.nelement() != (inp[0].size(0) if is_batched else 1):
+            raise RuntimeError("The Tensor returned by the function given to hessian should contain a single element"
+                               " (per entry of the batch when vectorize=True)")
+
+        jac = _autograd_grad((out.sum(),), inp, create_graph=True)
+        jac = _fill_in_zeros(jac, inp, False, True, "back")
+        _check_requires_grad(jac, "jacobian", strict=strict)
+        return jac
+
+    if vectorize:
+        res = jacobian(batched_jac_func, inputs, create_graph=create_graph, strict=strict,
+                       vectorize=True, chunk_size=chunk_size)
+    else:
+        res = jacobian(jac_func, inputs, create_graph=create_graph, strict=strict)
     return _tuple_postprocess(res, (is_inputs_tuple, is_inputs_tuple))
 
 
@@ -640,7 +762,7 @@ def vhp(func, inputs, v=None, create_graph=False, strict=False):
     return _tuple_postprocess(outputs, is_outputs_tuple), _tuple_postprocess(vhp, is_inputs_tuple)
 
 
-def hvp(func, inputs, v=None, create_graph=False, strict=False):
+def hvp(func, inputs, v=None, create_graph=False, strict=False, symmetric=False):
     r"""Function that computes the dot product between the Hessian of a given scalar
     function and a vector ``v`` at the point given by the inputs.
 
@@ -662,6 +784,11 @@ def hvp(func, inputs, v=None, create_graph=False, strict=False):
             independent of it. If ``False``, we return a Tensor of zeros as the
             hvp for said inputs, which is the expected mathematical value.
             Defaults to ``False``.
+        symmetric (bool, optional): If ``True``, assumes that the Hessian of
+            ``func`` is symmetric (which is the case when ``func`` is twice
+            continuously differentiable), and computes the product with a single
+            backward pass through the graph of the gradient, instead of the
+            double backward trick. Defaults to ``False``.
     Returns:
         func_output (tuple of Tensors or Tensor): output of ``func(inputs)``
             hvp (tuple of Tensors or Tensor): result of the dot product with
@@ -698,7 +825,7 @@ def hvp(func, inputs, v=None, create_graph=False, strict=False):
         This function is significantly slower than `vhp` due to backward mode AD constraints.
         If your functions is twice continuously differentiable, then hvp = vhp.t(). So if you
         know that your function satisfies this condition, you should use vhp instead that is
-        much faster with the current implementation.
+        much faster with the current implementation, or pass ``symmetric=True``.
 
     """
 
@@ -727,14 +854,20 @@ def hvp(func, inputs, v=None, create_graph=False, strict=False):
     jac = _autograd_grad(outputs, inputs, create_graph=True)
     _check_requires_grad(jac, "jacobian", strict=strict)
 
-    grad_jac = tuple(torch.zeros_like(inp, requires_grad=True) for inp in inputs)
+    if symmetric:
+        # hvp = vhp.t() for a symmetric Hessian
+        grad_res = _autograd_grad(jac, inputs, v, create_graph=create_graph)
+
+        hvp = _fill_in_zeros(grad_res, inputs, strict, create_graph, "double_back")
+    else:
+        grad_jac = tuple(torch.zeros_like(inp, requires_grad=True) for inp in inputs)
 
-    double_back = _autograd_grad(jac, inputs, grad_jac, create_graph=True)
-    _check_requires_grad(jac, "hessian", strict=strict)
+        double_back = _autograd_grad(jac, inputs, grad_jac, create_graph=True)
+        _check_requires_grad(jac, "hessian", strict=strict)
 
-    grad_res = _autograd_grad(double_back, grad_jac, v, create_graph=create_graph)
+        grad_res = _autograd_grad(double_back, grad_jac, v, create_graph=create_graph)
 
-    hvp = _fill_in_zeros(grad_res, inputs, strict, create_graph, "double_back_trick")
+        hvp = _fill_in_zeros(grad_res, inputs, strict, create_graph, "double_back_trick")
 
     outputs = _grad_postprocess(outputs, create_graph)
     hvp = _grad_postprocess(hvp, create_graph)
@@ -177,6 +177,66 @@ def get_analytical_jacobian(input, output, nondet_tol=0.0):
     return jacobian, reentrant, correct_grad_sizes
 
 
+def _unit_randn_like(x):
+    v = torch.randn(x.size(), dtype=x.dtype, device=x.device)
+    return v / v.norm() if v.numel() > 0 else v
+
+
+def _fast_gradcheck(func, inputs, func_out, eps, atol, rtol, nondet_tol):
+    r"""Compares the projections ``u^T J v`` of the analytical and numerical
+    Jacobians on random unit vectors ``u`` and ``v``, for each differentiable
+    output and input. This takes two evaluations of :attr:`func` per input and
+    two backward passes per output, instead of a number proportional to the
+    number of elements of the inputs and outputs.
+
+    Returns the indices (in the differentiable outputs) of the outputs whose
+    projections don't match, or whose backward isn't reentrant or gives
+    gradients of the wrong size.
+    """
+    diff_output_idx = [k for k, o in enumerate(_as_tuple(func_out)) if o.requires_grad]
+    outputs = [_as_tuple(func_out)[k] for k in diff_output_idx]
+    diff_input_list = list(iter_tensors(inputs, True))
+    us = [_unit_randn_like(o) for o in outputs]
+    vs = [_unit_randn_like(x) for x in diff_input_list]
+
+    # numerical[i][j] = u_i^T J_ij v_j, as the directional derivative of the
+    # outputs along v_j
+    numerical = [[None] * len(diff_input_list) for _ in outputs]
+    for j, (x, v) in enumerate(zip(diff_input_list, vs)):
+        # Use .data here to get around the version check
+        x = x.data
+        orig = x.clone()
+        x.copy_(orig - eps * v)
+        outa = [_as_tuple(func(*inputs))[k].clone() for k in diff_output_idx]
+        x.copy_(orig + eps * v)
+        outb = [_as_tuple(func(*inputs))[k].clone() for k in diff_output_idx]
+        x.copy_(orig)
+        for i, (a, b, u) in enumerate(zip(outa, outb, us)):
+            numerical[i][j] = ((b - a) / (2 * eps) * u).detach().sum()
+
+    failed = []
+    for i, (o, u) in enumerate(zip(outputs, us)):
+        analytical = []
+        for _ in range(2):
+            grads_input = torch.autograd.grad(o, diff_input_list, u, retain_graph=True, allow_unused=True)
+            projections = []
+            for d_x, x, v in zip(grads_input, diff_input_list, vs):
+                if d_x is None:
+                    projections.append(torch.zeros((), dtype=x.dtype, device=x.device))
+                elif d_x.size() != x.size():
+                    projections.append(None)
+                else:
+                    d_x = d_x.to_dense() if not d_x.layout == torch.strided else d_x
+                    projections.append((d_x * v).sum())
+            analytical.append(projections)
+
+        for a, a_reentrant, n in zip(analytical[0], analytical[1], numerical[i]):
+            if a is None or (a - a_reentrant).abs() > nondet_tol or not torch.allclose(a, n, rtol, atol):
+                failed.append(i)
+                break
+    return failed
+
+
 def _as_tuple(x):
     if istuple(x):
         return x
@@ -208,7 +268,8 @@ def gradcheck(
     raise_exception: bool = True,
     check_sparse_nnz: bool = False,
     nondet_tol: float = 0.0,
-    check_undefined_grad: bool = True
+    check_undefined_grad: bool = True,
+    fast_mode: bool = False
 ) -> bool:
     r"""Check gradients computed via small finite differences against analytical
     gradients w.r.t. tensors in :attr:`inputs` that are of floating point or complex type
@@ -245,6 +306,12 @@ def gradcheck(
             exactly (default, 0.0) or be within this tolerance.
         check_undefined_grad (bool, options): if True, check if undefined output grads
             are supported and treated as zeros
+        fast_mode (bool, optional): if True, only compare the projections
+            ``u^T J v`` of the numerical and analytical Jacobians on random
+            vectors ``u`` and ``v``, which takes a number of evaluations of
+            :attr:`func` independent of the size of the inputs. The full
+            Jacobians are only computed and compared for the outputs failing
+            this check. Only used for dense, real inputs.
 
     Returns:
         True if all differences satisfy allclose condition
@@ -298,8 +365,14 @@ def gradcheck(
                     return fail_test('Numerical gradient for function expected to be zero')
         return True
 
+    slow_outputs = range(len(output))
+    if fast_mode and all(t.layout == torch.strided and not t.is_complex()
+                         for t in iter_tensors(tupled_inputs, True)):
+        # Only fall back to the full check for the outputs failing the fast one
+        slow_outputs = _fast_gradcheck(func, tupled_inputs, func_out, eps, atol, rtol, nondet_tol)
+
     for i, o in enumerate(output):
-        if not o.requires_grad:
+        if not o.requires_grad or i not in slow_outputs:
             continue
 
         def fn(input):
@@ -411,7 +484,8 @@ def gradgradcheck(
     gen_non_contig_grad_outputs: bool = False,
     raise_exception: bool = True,
     nondet_tol: float = 0.0,
-    check_undefined_grad: bool = True
+    check_undefined_grad: bool = True,
+    fast_mode: bool = False
 ) -> bool:
     r"""Check gradients of gradients computed via small finite differences
     against analytical gradients w.r.t. tensors in :attr:`inputs` and
@@ -458,6 +532,7 @@ def gradgradcheck(
             the second derivative.
         check_undefined_grad (bool, options): if True, check if undefined output grads
             are supported and treated as zeros
+        fast_mode (bool, optional): if True, run :func:`gradcheck` in fast mode.
 
     Returns:
         True if all differences satisfy allclose condition
@@ -489,4 +564,5 @@ def gradgradcheck(
         return grad_inputs
 
     return gradcheck(new_func, tupled_inputs + tupled_grad_outputs, eps, atol, rtol, raise_exception,
-                     nondet_tol=nondet_tol, check_undefined_grad=check_undefined_grad)
+                     nondet_tol=nondet_tol, check_undefined_grad=check_undefined_grad,
+                     fast_mode=fast_mode)
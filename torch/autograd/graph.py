@@ -0,0 +1,257 @@
+import os
+import tempfile
+import threading
+
+import torch
+
+
+_hooks_state = threading.local()
+
+
+def _hooks_stack():
+    if not hasattr(_hooks_state, 'stack'):
+        _hooks_state.stack = []
+    return _hooks_state.stack
+
+
+class saved_tensors_hooks(object):
+    r"""Context-manager that sets a pair of pack / unpack hooks for the tensors
+    saved for backward by the operations run in it.
+
+    ``pack_hook(tensor)`` is called when an operation saves ``tensor``, and
+    can return any object to store instead of it, or ``None`` to save the
+    tensor as usual. ``unpack_hook(packed)`` is called with that object when
+    the backward pass needs the tensor, and must return a tensor with the same
+    content (size, dtype, device and values).
+
+    The pack hook runs with gradient computation disabled. It must not keep a
+    reference to ``tensor``, which may be an output of the operation saving
+    it, and would then never be freed.
+
+    The hooks are set for the current thread. Nested contexts replace the
+    hooks of the outer ones rather than composing with them.
+
+    Example::
+
+        >>> def pack_hook(tensor):
+        ...     return tensor.to('cpu'), tensor.device
+        >>> def unpack_hook(packed):
+        ...     tensor, device = packed
+        ...     return tensor.to(device)
+        >>> with torch.autograd.graph.saved_tensors_hooks(pack_hook, unpack_hook):
+        ...     y = model(x)
+        >>> y.sum().backward()
+    """
+
+    def __init__(self, pack_hook, unpack_hook):
+        self.pack_hook = pack_hook
+        self.unpack_hook = unpack_hook
+
+    def __enter__(self):
+        _hooks_stack().append((self.pack_hook, self.unpack_hook))
+        torch.autograd._set_saved_tensors_hooks(self.pack_hook, self.unpack_hook)
+        return self
+
+    def __exit__(self, *args):
+        stack = _hooks_stack()
+        stack.pop()
+        if stack:
+            torch.autograd._set_saved_tensors_hooks(*stack[-1])
+        else:
+            torch.autograd._reset_saved_tensors_hooks()
+        return False
+
+
+_INT_DTYPES = (torch.uint8, torch.int8, torch.int16, torch.int32)
+
+
+def _narrowest_int_dtype(tensor):
+    r"""Returns the smallest integer dtype that holds all values of
+    :attr:`tensor` exactly."""
+    low, high = tensor.min().item(), tensor.max().item()
+    for dtype in _INT_DTYPES:
+        info = torch.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return tensor.dtype
+
+
+def _pack_bits(mask):
+    r"""Packs the boolean tensor :attr:`mask` into a ``uint8`` tensor holding
+    8 of its values per element."""
+    flat = mask.reshape(-1).to(torch.uint8)
+    padding = -flat.numel() % 8
+    if padding:
+        flat = torch.cat([flat, flat.new_zeros(padding)])
+    weights = torch.tensor([1 << i for i in range(8)], dtype=torch.uint8, device=flat.device)
+    return (flat.view(-1, 8) * weights).sum(1).to(torch.uint8)
+
+
+def _unpack_bits(bits, numel):
+    weights = torch.tensor([1 << i for i in range(8)], dtype=torch.uint8, device=bits.device)
+    return bits.unsqueeze(1).bitwise_and(weights).ne(0).view(-1)[:numel]
+
+
+class _SpillArena(object):
+    r"""A temporary file that packed tensors are appended to. Its space is
+    reclaimed when all the tensors written to it are freed, which happens
+    after each backward pass when it holds the activations of one iteration."""
+
+    def __init__(self, directory):
+        self._file = tempfile.TemporaryFile(dir=directory, buffering=0)
+        self._lock = threading.Lock()
+        self._live = 0
+
+    def write(self, tensor):
+        if tensor.storage_offset() != 0 or not tensor.is_contiguous() or \
+                tensor.storage().size() != tensor.numel():
+            tensor = tensor.clone(memory_format=torch.contiguous_format)
+        with self._lock:
+            offset = self._file.seek(0, os.SEEK_END)
+            tensor.storage()._write_file(self._file, True, True)
+            self._live += 1
+        return offset
+
+    def read(self, offset, numel, dtype):
+        result = torch.empty(numel, dtype=dtype)
+        with self._lock:
+            result.storage()._set_from_file(self._file, offset, True)
+        return result
+
+    def free(self):
+        with self._lock:
+            self._live -= 1
+            if self._live == 0:
+                self._file.truncate(0)
+
+
+class _Spilled(object):
+    def __init__(self, arena, tensor):
+        self.arena = arena
+        self.numel = tensor.numel()
+        self.dtype = tensor.dtype
+        self.offset = arena.write(tensor)
+
+    def load(self):
+        return self.arena.read(self.offset, self.numel, self.dtype)
+
+    def __del__(self):
+        # offset is only set once the tensor is written
+        if getattr(self, 'offset', None) is not None:
+            self.arena.free()
+
+
+class _Packed(object):
+    __slots__ = ['payload', 'kind', 'size', 'dtype', 'device']
+
+    def __init__(self, payload, kind, tensor):
+        self.payload = payload
+        self.kind = kind
+        self.size = tensor.size()
+        self.dtype = tensor.dtype
+        self.device = tensor.device
+
+
+class offload_saved_tensors(saved_tensors_hooks):
+    r"""Context-manager that stores the tensors saved for backward by the
+    operations run in it in a smaller form, and restores them when the
+    backward pass needs them. This trades the memory of the activations for
+    the time to pack and unpack them, where
+    :func:`torch.utils.checkpoint.checkpoint` trades it for recomputing them.
+
+    Each saved tensor of at least :attr:`min_bytes` bytes is:
+
+    - compressed: floating point tensors are converted to :attr:`dtype` if it
+      is set, which is lossy, and boolean and integer tensors are compressed
+      losslessly, by packing 8 booleans per byte and by storing integers in
+      the narrowest integer dtype that holds their values;
+    - moved to host memory if it is on a GPU, in pinned memory if
+      :attr:`pin_memory` is ``True``, so that the copies back to the GPU are
+      asynchronous;
+    - written to a temporary file in :attr:`spill_dir` if it is set and the
+      packed tensor has at least :attr:`spill_bytes` bytes. The file is
+      truncated whenever all the tensors written to it have been freed.
+
+    Tensors that require grad and are leaves (e.g. parameters) are always
+    saved as usual, since their memory is not released by packing them. The
+    same holds for any saved tensor still referenced outside of the graph, so
+    the savings come from the intermediate activations.
+
+    Arguments:
+        dtype (torch.dtype, optional): ``torch.float16`` or ``torch.bfloat16``,
+            the dtype floating point tensors of a wider dtype are stored in.
+            ``bfloat16`` keeps the range of ``float32`` where ``float16``
+            overflows above 65504, but is less precise. Default: ``None``
+            (floating point tensors are not compressed)
+        pin_memory (bool, optional): whether tensors moved from a GPU are put in
+            pinned memory. Default: ``False``
+        spill_dir (str, optional): directory of the file tensors are spilled to.
+            Default: ``None`` (tensors are kept in memory)
+        spill_bytes (int, optional): minimum size in bytes of the packed tensors
+            that are spilled. Default: ``0``
+        min_bytes (int, optional): tensors smaller than this many bytes are
+            saved as usual. Default: ``65536``
+
+    Example::
+
+        >>> with torch.autograd.graph.offload_saved_tensors(dtype=torch.bfloat16,
+        ...                                                 spill_dir='/scratch'):
+        ...     loss = criterion(model(input), target)
+        >>> loss.backward()
+    """
+
+    def __init__(self, dtype=None, pin_memory=False, spill_dir=None, spill_bytes=0,
+                 min_bytes=1 << 16):
+        if dtype not in (None, torch.float16, torch.bfloat16):
+            raise ValueError("dtype must be torch.float16, torch.bfloat16 or None, "
+                             "but got {}".format(dtype))
+        self.compress_dtype = dtype
+        self.pin_memory = pin_memory
+        self.spill_bytes = spill_bytes
+        self.min_bytes = min_bytes
+        self._arena = _SpillArena(spill_dir) if spill_dir is not None else None
+        super(offload_saved_tensors, self).__init__(self._pack, self._unpack)
+
+    def _compress(self, tensor):
+        if tensor.dtype == torch.bool:
+            return _pack_bits(tensor), 'bits'
+        if not tensor.is_floating_point():
+            dtype = _narrowest_int_dtype(tensor)
+            if dtype != tensor.dtype:
+                return tensor.to(dtype), 'cast'
+            return tensor, None
+        if self.compress_dtype is not None and \
+                torch.finfo(tensor.dtype).bits > torch.finfo(self.compress_dtype).bits:
+            return tensor.to(self.compress_dtype), 'cast'
+        return tensor, None
+
+    def _pack(self, tensor):
+        if tensor.layout != torch.strided or tensor.numel() == 0 or \
+                tensor.numel() * tensor.element_size() < self.min_bytes or \
+                (tensor.requires_grad and tensor.is_leaf) or tensor.is_complex():
+            return None
+        payload, kind = self._compress(tensor)
+        spill = self._arena is not None and \
+            payload.numel() * payload.element_size() >= self.spill_bytes
+        if payload.device.type != 'cpu':
+            host = torch.empty(payload.size(), dtype=payload.dtype,
+                               pin_memory=self.pin_memory and not spill)
+            host.copy_(payload, non_blocking=self.pin_memory and not spill)
+            payload = host
+        elif kind is None and not spill:
+            # Nothing would be saved.
+            return None
+        if spill:
+            payload = _Spilled(self._arena, payload)
+        return _Packed(payload, kind, tensor)
+
+    def _unpack(self, packed):
+        payload = packed.payload
+        if isinstance(payload, _Spilled):
+            payload = payload.load()
+        payload = payload.to(packed.device, non_blocking=True)
+        if packed.kind == 'bits':
+            payload = _unpack_bits(payload, packed.size.numel())
+        elif packed.kind == 'cast':
+            payload = payload.to(packed.dtype)
+        return payload.reshape(packed.size)
@@ -1,7 +1,10 @@
+import array
 import itertools
+import math
 import torch
 
 from collections import defaultdict, namedtuple
+from enum import Enum
 from operator import attrgetter
 
 try:
@@ -232,6 +235,50 @@ class EventList(list):
         return total_stat
 
 
+class ProfilerAction(Enum):
+    """Actions of a :class:`profile` schedule for a given step."""
+    NONE = 0
+    WARMUP = 1
+    RECORD = 2
+    RECORD_AND_SAVE = 3
+
+
+def schedule(wait, warmup, active, repeat=0, skip=0):
+    """Returns a schedule for :class:`profile` that repeatedly waits for
+    ``wait`` steps, warms up the profiler during ``warmup`` steps (events are
+    recorded but discarded), records ``active`` steps, and then does nothing
+    for ``skip`` steps.
+
+    Arguments:
+        wait (int): Number of steps to wait before warming up.
+        warmup (int): Number of warm up steps.
+        active (int): Number of recorded steps of each window.
+        repeat (int, optional): Number of recording windows, ``0`` meaning
+            that the cycle repeats until the profiler exits. Default: ``0``
+        skip (int, optional): Number of steps to wait after each recording
+            window. Default: ``0``
+    """
+    if wait < 0 or warmup < 0 or active <= 0 or repeat < 0 or skip < 0:
+        raise ValueError("invalid profiler schedule: wait={}, warmup={}, active={}, "
+                         "repeat={}, skip={}".format(wait, warmup, active, repeat, skip))
+    cycle = wait + warmup + active + skip
+
+    def schedule_fn(step):
+        if repeat > 0 and step // cycle >= repeat:
+            return ProfilerAction.NONE
+        step = step % cycle
+        if step < wait:
+            return ProfilerAction.NONE
+        if step < wait + warmup:
+            return ProfilerAction.WARMUP
+        if step < wait + warmup + active - 1:
+            return ProfilerAction.RECORD
+        if step == wait + warmup + active - 1:
+            return ProfilerAction.RECORD_AND_SAVE
+        return ProfilerAction.NONE
+    return schedule_fn
+
+
 class profile(object):
     """Context manager that manages autograd profiler state and holds a summary of results.
     Under the hood it just records events of functions being executed in C++ and
@@ -260,9 +307,43 @@ class profile(object):
 
         profile_memory (bool, optional): Whether to report memory usage, default: ``False``
 
+        aggregate (bool, optional): If ``True``, events are folded into per-key
+            running averages as they are parsed, instead of being kept around
+            as :class:`FunctionEvent` objects. Call :meth:`flush` periodically
+            (e.g. once per training step) to parse the events collected so far
+            and free them, which bounds the memory used by long profiling runs.
+            Default: ``False``
+
+        group_by_input_shape (bool, optional): If ``True``, the running averages
+            of ``aggregate`` mode are keyed by event name and input shapes
+            (see :meth:`EventList.key_averages`). Default: ``False``
+
+        max_events (int, optional): In ``aggregate`` mode, the number of most
+            recent events kept for :meth:`table` and :meth:`export_chrome_trace`.
+            Default: ``None`` (no events are kept)
+
+        schedule (callable, optional): A function that takes the current step
+            number (see :meth:`step`) and returns the :class:`ProfilerAction`
+            to take during that step, e.g. one built by :func:`schedule`.
+            Default: ``None`` (record all steps)
+
+        on_trace_ready (callable, optional): Called with this profiler at the
+            end of each recording window, when the results of the window are
+            available (e.g. to print :meth:`table` or to
+            :meth:`export_chrome_trace`). Default: ``None``
+
+        sample_every (int, optional): Only record one op out of every
+            ``sample_every`` ops of each thread, to reduce the profiler
+            overhead. Default: ``1``
+
     .. warning:
         Enabling memory profiling incurs additional profiler overhead
 
+    .. warning:
+        Ranges that are open while calling :meth:`flush` (e.g. an enclosing
+        :class:`record_function`) are not recorded, so :meth:`flush` is best
+        called at the top level of the training loop.
+
     .. warning:
         This context managers should not be called recursively, i.e. no nested
         instances are allowed
@@ -291,21 +372,54 @@ class profile(object):
         torch::autograd::GraphRoot           691.816us        691.816us        100
         -----------------------------------  ---------------  ---------------  ---------------
 
+        >>> # record steps 2-4 out of every 10 steps
+        >>> def trace_handler(prof):
+        >>>     print(prof.key_averages().table(sort_by="self_cpu_time_total"))
+        >>> with torch.autograd.profiler.profile(
+        >>>         schedule=torch.autograd.profiler.schedule(wait=1, warmup=1, active=3, skip=5),
+        >>>         on_trace_ready=trace_handler) as prof:
+        >>>     for _ in range(100):
+        >>>         train_step()
+        >>>         prof.step()
+
     """
     def __init__(
             self,
             enabled=True,
             use_cuda=False,
             record_shapes=False,
-            profile_memory=False):
+            profile_memory=False,
+            *,
+            aggregate=False,
+            group_by_input_shape=False,
+            max_events=None,
+            schedule=None,
+            on_trace_ready=None,
+            sample_every=1):
         self.enabled = enabled
         self.use_cuda = use_cuda
         self.function_events = None
         if not self.enabled:
             return
+        if not aggregate and (group_by_input_shape or max_events is not None):
+            raise ValueError('group_by_input_shape and max_events options '
+                             'need aggregate=True')
+        if max_events is not None and max_events < 0:
+            raise ValueError('max_events option should be non-negative')
+        if sample_every < 1:
+            raise ValueError('sample_every option should be positive')
         self.entered = False
         self.record_shapes = record_shapes
         self.profile_memory = profile_memory
+        self.aggregate = aggregate
+        self.group_by_input_shape = group_by_input_shape
+        self.max_events = max_events
+        self.schedule = schedule
+        self.on_trace_ready = on_trace_ready
+        self.sample_every = sample_every
+        self.step_num = 0
+        self._action = None
+        self._stats = None
 
     def __enter__(self):
         if not self.enabled:
@@ -316,19 +430,105 @@ class profile(object):
         profiler_kind = torch.autograd.ProfilerState.CUDA if self.use_cuda \
             else torch.autograd.ProfilerState.CPU
 
-        config = torch.autograd.ProfilerConfig(profiler_kind, self.record_shapes, self.profile_memory)
-        torch.autograd._enable_profiler(config)
+        self._config = torch.autograd.ProfilerConfig(
+            profiler_kind, self.record_shapes, self.profile_memory, self.sample_every)
+        self._transition(self._next_action())
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if not self.enabled:
             return
+        if self._action == ProfilerAction.WARMUP:
+            torch.autograd._disable_profiler()
+        elif self._action is not None and self._action != ProfilerAction.NONE:
+            self._stop_trace()
+        self._action = None
+        return False
+
+    def step(self):
+        """Signals the profiler that the next step has started, and switches
+        to the next action of the ``schedule``.
+        """
+        if not self.enabled:
+            return
+        if self.schedule is None:
+            raise RuntimeError("step() requires a profiler with a schedule")
+        if self._action is None:
+            raise RuntimeError("step() can only be called while profiling")
+        self.step_num += 1
+        self._transition(self._next_action())
+
+    def _next_action(self):
+        if self.schedule is None:
+            return ProfilerAction.RECORD
+        return self.schedule(self.step_num)
+
+    def _transition(self, action):
+        prev_action = self._action
+        if prev_action == ProfilerAction.RECORD_AND_SAVE or \
+                (prev_action == ProfilerAction.RECORD and action in
+                 (ProfilerAction.NONE, ProfilerAction.WARMUP)):
+            # the recording window is over
+            self._stop_trace()
+            prev_action = None
+        elif prev_action == ProfilerAction.WARMUP and action != ProfilerAction.WARMUP:
+            # events recorded while warming up are discarded
+            torch.autograd._disable_profiler()
+            prev_action = None
+        if prev_action in (None, ProfilerAction.NONE):
+            if action == ProfilerAction.WARMUP:
+                torch.autograd._enable_profiler(self._config)
+            elif action != ProfilerAction.NONE:
+                self._start_trace()
+        self._action = action
+
+    def _start_trace(self):
+        if self.aggregate:
+            self._parser = _RecordParser()
+            self._stats = _EventStats(self.group_by_input_shape)
+            self._events = _EventRing(self.max_events) if self.max_events else None
+        self.function_events = None
+        torch.autograd._enable_profiler(self._config)
+
+    def _stop_trace(self):
         records = torch.autograd._disable_profiler()
+        if self.aggregate:
+            self._aggregate(records)
+            function_events = self._events.events(self._parser.string_table) \
+                if self._events is not None else []
+            self._parser = self._events = None
+        else:
+            function_events = parse_cpu_trace(records)
         self.function_events = EventList(
-            parse_cpu_trace(records),
+            function_events,
             use_cuda=self.use_cuda,
             profile_memory=self.profile_memory)
-        return False
+        if self.on_trace_ready is not None:
+            self.on_trace_ready(self)
+
+    def flush(self):
+        """Parses the events recorded so far into the running averages of
+        ``aggregate`` mode, and frees them.
+        """
+        if not self.enabled:
+            return
+        if not self.aggregate:
+            raise RuntimeError("flush() requires a profiler with aggregate=True")
+        if self._action is None:
+            raise RuntimeError("flush() can only be called while profiling")
+        if self._action not in (ProfilerAction.RECORD, ProfilerAction.RECORD_AND_SAVE):
+            return
+        records = torch.autograd._disable_profiler()
+        torch.autograd._enable_profiler(self._config)
+        self._aggregate(records)
+
+    def _aggregate(self, records):
+        string_table = self._parser.string_table
+        for r in self._parser.ranges(records):
+            self._stats.add(r, string_table[r.start.name()])
+            if self._events is not None:
+                self._events.add(r)
+        self._stats.end_batch()
 
     def __repr__(self):
         if self.function_events is None:
@@ -359,11 +559,25 @@ class profile(object):
 
     def key_averages(self, group_by_input_shape=False):
         self._check_finish()
-        return self.function_events.key_averages(group_by_input_shape)
+        if self._stats is None:
+            return self.function_events.key_averages(group_by_input_shape)
+        if group_by_input_shape and not self._stats.group_by_input_shapes:
+            raise RuntimeError(
+                "key averages by input shape require a profiler with "
+                "group_by_input_shape=True")
+        averages = self._stats.averages()
+        if self._stats.group_by_input_shapes and not group_by_input_shape:
+            stats = defaultdict(FunctionEventAvg)
+            for avg in averages:
+                stats[(avg.key, avg.node_id)].add(avg)
+            averages = stats.values()
+        return EventList(averages, use_cuda=self.use_cuda, profile_memory=self.profile_memory)
     key_averages.__doc__ = EventList.key_averages.__doc__
 
     def total_average(self):
         self._check_finish()
+        if self._stats is not None:
+            return EventList(self._stats.averages()).total_average()
         return self.function_events.total_average()
     total_average.__doc__ = EventList.total_average.__doc__
 
@@ -373,6 +587,8 @@ class profile(object):
         all self times across all the events.
         """
         self._check_finish()
+        if self._stats is not None:
+            return sum(avg.self_cpu_time_total for avg in self._stats.averages())
         return self.function_events.self_cpu_time_total
 
 
@@ -813,133 +1029,178 @@ class StringTable(defaultdict):
 ################################################################################
 # CPU checkpoints
 
-def parse_cpu_trace(thread_records):
-    def get_record_key(record):
-        """
-        Returns a tuple to be used by parse_cpu_trace for correlating start and
-        end records.
-        """
-        return (record.handle(), record.node_id())
+_Range = namedtuple('_Range', [
+    'start', 'end', 'key', 'parent_key', 'cpu_start', 'cpu_end', 'cuda_start',
+    'cuda_end', 'cpu_memory_usage', 'cuda_memory_usage', 'is_async'])
 
-    next_id = 0
-    start_record = None
-    cuda_records = {}
-    functions = []
-    record_stack = []
-    string_table = StringTable()
+
+class _RecordParser(object):
+    """Matches the push and pop records returned by the profiler into ranges.
+
+    The records of a profiling run can be parsed in several batches (see
+    :meth:`profile.flush`), all times being relative to the ``__start_profile``
+    record of the first batch.
+    """
 
     # ignoring the following utility ops
-    filtered_out_names = [
+    filtered_out_names = frozenset([
         "profiler::_record_function_enter",
         "profiler::_record_function_exit",
         "is_leaf",
         "output_nr",
         "_version",
-    ]
+    ])
 
-    # cuda start events and the overall profiler start event don't happen
-    # at exactly the same time because we need to record an event on each device
-    # and each record takes ~4us. So we adjust here by the difference
-    # adding the difference in CPU time between the profiler start event
-    # and the CPU time of the cuda start event for the device
-    def adjusted_time(cuda_record, cuda_records_map):
-        assert cuda_record.device() != -1
-        cuda_time_0 = cuda_records_map[(cuda_record.node_id(), cuda_record.device())]
-        return cuda_time_0.cuda_elapsed_us(cuda_record) + start_record.cpu_elapsed_us(cuda_time_0)
-
-    # '__start_profile' is not guaranteed to be first, so we must find it here
-    for record in itertools.chain(*thread_records):
-        name = record.name()
-        if start_record is None and name == '__start_profile':
-            start_record = record
-        elif '__cuda_start_event' in name:
-            # N.B.: Each CUDA device has its own __cuda_start_event.
-            assert record.device() != -1
-            # key for cuda_records is (node_id, device) in case of multiple nodes
-            # having the same device
-            cuda_records[(record.node_id(), record.device())] = record
-
-    assert start_record is not None and not start_record.is_remote()
-
-    for thread_record_list in thread_records:
-        # accumulated memory allocations per handle
-        cpu_memory_allocs = {}
-        cuda_memory_allocs = {}
-        # ranges per handle
-        range_starts = {}
-
-        filtered_handles = set()
-        prev_record = None
-        for record in thread_record_list:
-            record_key = get_record_key(record)
-            if (record.name() in filtered_out_names or
-                    record_key in filtered_handles):
-                filtered_handles.add(record_key)
-                continue
-
-            if record.kind() == 'push':
-                # workaround to reduce double logging from operator
-                # wrappers and redispatch
-                if prev_record is not None:
-                    duplicate = (
-                        prev_record.name() == record.name()
-                        and prev_record.kind() == record.kind()
-                        and prev_record.node_id() == record.node_id()
+    def __init__(self):
+        self.start_record = None
+        self.string_table = StringTable()
+
+    def ranges(self, thread_records):
+        """Yields a ``_Range`` per matched push/pop pair of
+        :attr:`thread_records`. Ranges that are still open at the end of the
+        records are dropped. The ``parent_key`` of a synchronous range is the
+        key of the innermost range that was open on its thread when it started,
+        if any."""
+        def get_record_key(record):
+            """
+            Returns a tuple to be used by parse_cpu_trace for correlating start and
+            end records.
+            """
+            return (record.handle(), record.node_id())
+
+        start_record = self.start_record
+        cuda_records = {}
+
+        # cuda start events and the overall profiler start event don't happen
+        # at exactly the same time because we need to record an event on each device
+        # and each record takes ~4us. So we adjust here by the difference
+        # adding the difference in CPU time between the profiler start event
+        # and the CPU time of the cuda start event for the device
+        def adjusted_time(cuda_record, cuda_records_map):
+            assert cuda_record.device() != -1
+            cuda_time_0 = cuda_records_map[(cuda_record.node_id(), cuda_record.device())]
+            return cuda_time_0.cuda_elapsed_us(cuda_record) + start_record.cpu_elapsed_us(cuda_time_0)
+
+        # '__start_profile' is not guaranteed to be first, so we must find it here
+        for record in itertools.chain(*thread_records):
+            name = record.name()
+            if start_record is None and name == '__start_profile':
+                start_record = record
+            elif '__cuda_start_event' in name:
+                # N.B.: Each CUDA device has its own __cuda_start_event.
+                assert record.device() != -1
+                # key for cuda_records is (node_id, device) in case of multiple nodes
+                # having the same device
+                cuda_records[(record.node_id(), record.device())] = record
+
+        assert start_record is not None and not start_record.is_remote()
+        self.start_record = start_record
+
+        for thread_record_list in thread_records:
+            # accumulated memory allocations per handle
+            cpu_memory_allocs = {}
+            cuda_memory_allocs = {}
+            # ranges per handle
+            range_starts = {}
+            # handles of the open ranges, innermost last
+            open_keys = []
+
+            filtered_handles = set()
+            prev_record = None
+            for record in thread_record_list:
+                record_key = get_record_key(record)
+                if (record.name() in self.filtered_out_names or
+                        record_key in filtered_handles):
+                    filtered_handles.add(record_key)
+                    continue
+
+                if record.kind() == 'push':
+                    # workaround to reduce double logging from operator
+                    # wrappers and redispatch
+                    if prev_record is not None:
+                        duplicate = (
+                            prev_record.name() == record.name()
+                            and prev_record.kind() == record.kind()
+                            and prev_record.node_id() == record.node_id()
+                        )
+                        if duplicate:
+                            filtered_handles.add(record_key)
+                            continue
+
+                    range_starts[record_key] = record
+                    cpu_memory_allocs[record_key] = 0
+                    cuda_memory_allocs[record_key] = 0
+                    open_keys.append(record_key)
+                elif record.kind() == 'pop':
+                    assert (
+                        record_key in range_starts
+                    ), """Expected record (name={}) with key {} to exist in range_starts.
+                        This means that the pop event did not have a corresponding push.""".format(
+                        record.name(), record_key
                     )
-                    if duplicate:
-                        filtered_handles.add(record_key)
-                        continue
-
-                range_starts[record_key] = record
-                cpu_memory_allocs[record_key] = 0
-                cuda_memory_allocs[record_key] = 0
-            elif record.kind() == 'pop':
-                assert (
-                    record_key in range_starts
-                ), """Expected record (name={}) with key {} to exist in range_starts.
-                    This means that the pop event did not have a corresponding push.""".format(
-                    record.name(), record_key
-                )
 
-                start = range_starts[record_key]
-
-                cpu_memory_usage = cpu_memory_allocs[record_key]
-                cuda_memory_usage = cuda_memory_allocs[record_key]
-                is_async = start.thread_id() != record.thread_id()
-                is_remote_event = record.is_remote()
-
-                fe = FunctionEvent(
-                    id=record.handle(),
-                    node_id=record.node_id(),
-                    name=string_table[start.name()],
-                    thread=start.thread_id(),
-                    cpu_start=start_record.cpu_elapsed_us(start),
-                    cpu_end=start_record.cpu_elapsed_us(record),
-                    input_shapes=start.shapes(),
-                    cpu_memory_usage=cpu_memory_usage,
-                    cuda_memory_usage=cuda_memory_usage,
-                    is_async=is_async,
-                    is_remote=is_remote_event,
-                )
-                # note: async events have only cpu total time
-                if not is_async and start.has_cuda():
-                    cuda_start = adjusted_time(start, cuda_records)
-                    cuda_end = adjusted_time(record, cuda_records)
-                    fe.append_kernel(
-                        start.name(),
-                        start.device(),
-                        cuda_start,
-                        cuda_end)
-                functions.append(fe)
-                del range_starts[record_key]
-                del cpu_memory_allocs[record_key]
-                del cuda_memory_allocs[record_key]
-            elif record.kind() == 'memory_alloc':
-                for handle in cpu_memory_allocs.keys():
-                    cpu_memory_allocs[handle] += record.cpu_memory_usage()
-                for handle in cuda_memory_allocs.keys():
-                    cuda_memory_allocs[handle] += record.cuda_memory_usage()
-            prev_record = record
+                    start = range_starts[record_key]
+                    is_async = start.thread_id() != record.thread_id()
+                    if open_keys[-1] == record_key:
+                        open_keys.pop()
+                    else:
+                        open_keys.remove(record_key)
+                    parent_key = open_keys[-1] if open_keys and not is_async else None
+
+                    # note: async events have only cpu total time
+                    cuda_start = cuda_end = None
+                    if not is_async and start.has_cuda():
+                        cuda_start = adjusted_time(start, cuda_records)
+                        cuda_end = adjusted_time(record, cuda_records)
+
+                    yield _Range(
+                        start=start,
+                        end=record,
+                        key=record_key,
+                        parent_key=parent_key,
+                        cpu_start=start_record.cpu_elapsed_us(start),
+                        cpu_end=start_record.cpu_elapsed_us(record),
+                        cuda_start=cuda_start,
+                        cuda_end=cuda_end,
+                        cpu_memory_usage=cpu_memory_allocs[record_key],
+                        cuda_memory_usage=cuda_memory_allocs[record_key],
+                        is_async=is_async,
+                    )
+                    del range_starts[record_key]
+                    del cpu_memory_allocs[record_key]
+                    del cuda_memory_allocs[record_key]
+                elif record.kind() == 'memory_alloc':
+                    for handle in cpu_memory_allocs.keys():
+                        cpu_memory_allocs[handle] += record.cpu_memory_usage()
+                    for handle in cuda_memory_allocs.keys():
+                        cuda_memory_allocs[handle] += record.cuda_memory_usage()
+                prev_record = record
+
+
+def parse_cpu_trace(thread_records):
+    parser = _RecordParser()
+    functions = []
+    for r in parser.ranges(thread_records):
+        fe = FunctionEvent(
+            id=r.end.handle(),
+            node_id=r.end.node_id(),
+            name=parser.string_table[r.start.name()],
+            thread=r.start.thread_id(),
+            cpu_start=r.cpu_start,
+            cpu_end=r.cpu_end,
+            input_shapes=r.start.shapes(),
+            cpu_memory_usage=r.cpu_memory_usage,
+            cuda_memory_usage=r.cuda_memory_usage,
+            is_async=r.is_async,
+            is_remote=r.end.is_remote(),
+        )
+        if r.cuda_start is not None:
+            fe.append_kernel(
+                r.start.name(),
+                r.start.device(),
+                r.cuda_start,
+                r.cuda_end)
+        functions.append(fe)
 
     # Sort functions by start time then by end time ascending.
     # This ensures that--in the case of nested events which
@@ -951,6 +1212,197 @@ def parse_cpu_trace(thread_records):
     return functions
 
 
+################################################################################
+# Streaming aggregation
+
+class _EventStats(object):
+    """Running per-key totals of the ranges produced by a ``_RecordParser``.
+
+    Ranges are folded in as they are parsed, so no ``FunctionEvent`` is built
+    for them: the totals of each key live in one slot of a few flat arrays,
+    and only the children totals of the ranges that are still open are kept
+    around to compute self times and self memory usages.
+    """
+    def __init__(self, group_by_input_shapes=False):
+        self.group_by_input_shapes = group_by_input_shapes
+        # key -> slot
+        self._slots = {}
+        # slot -> (name, node_id, input_shapes, is_async, is_remote)
+        self._info = []
+        self._count = array.array('q')
+        self._cpu_time_total = array.array('d')
+        self._cuda_time_total = array.array('d')
+        self._self_cpu_time_total = array.array('d')
+        self._cpu_memory_usage = array.array('q')
+        self._cuda_memory_usage = array.array('q')
+        self._self_cpu_memory_usage = array.array('q')
+        self._self_cuda_memory_usage = array.array('q')
+        # range key -> [cpu time, cpu memory, cuda memory] of its direct children
+        self._children = {}
+
+    def add(self, r, name):
+        input_shapes = None
+        node_id = r.end.node_id()
+        if self.group_by_input_shapes:
+            input_shapes = r.start.shapes()
+            key = (name, str(input_shapes), node_id)
+        else:
+            key = (name, node_id)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self._info)
+            self._info.append((name, node_id, input_shapes, r.is_async, r.end.is_remote()))
+            for column in (self._count, self._cpu_memory_usage, self._cuda_memory_usage,
+                           self._self_cpu_memory_usage, self._self_cuda_memory_usage):
+                column.append(0)
+            for column in (self._cpu_time_total, self._cuda_time_total,
+                           self._self_cpu_time_total):
+                column.append(0.)
+
+        cpu_time = r.cpu_end - r.cpu_start
+        self._count[slot] += 1
+        self._cpu_time_total[slot] += cpu_time
+        if r.cuda_start is not None:
+            self._cuda_time_total[slot] += r.cuda_end - r.cuda_start
+        self._cpu_memory_usage[slot] += r.cpu_memory_usage
+        self._cuda_memory_usage[slot] += r.cuda_memory_usage
+
+        # Note: async events don't have children, and are not used when
+        # computing 'self' metrics of other events (see FunctionEvent)
+        children = self._children.pop(r.key, None)
+        if r.is_async:
+            return
+        if children is None:
+            children = (0., 0, 0)
+        self._self_cpu_time_total[slot] += cpu_time - children[0]
+        self._self_cpu_memory_usage[slot] += r.cpu_memory_usage - children[1]
+        self._self_cuda_memory_usage[slot] += r.cuda_memory_usage - children[2]
+        if r.parent_key is not None:
+            siblings = self._children.get(r.parent_key)
+            if siblings is None:
+                self._children[r.parent_key] = [cpu_time, r.cpu_memory_usage, r.cuda_memory_usage]
+            else:
+                siblings[0] += cpu_time
+                siblings[1] += r.cpu_memory_usage
+                siblings[2] += r.cuda_memory_usage
+
+    def end_batch(self):
+        # Ranges still open at the end of a batch of records are dropped by
+        # the parser, so are the totals of their children.
+        self._children.clear()
+
+    def averages(self):
+        """Returns a list with a FunctionEventAvg per key."""
+        result = []
+        for slot, (name, node_id, input_shapes, is_async, is_remote) in enumerate(self._info):
+            avg = FunctionEventAvg()
+            avg.key = name
+            avg.node_id = node_id
+            avg.input_shapes = input_shapes
+            avg.is_async = is_async
+            avg.is_remote = is_remote
+            avg.count = self._count[slot]
+            avg.cpu_time_total = self._cpu_time_total[slot]
+            avg.cuda_time_total = self._cuda_time_total[slot]
+            avg.self_cpu_time_total = self._self_cpu_time_total[slot]
+            avg.cpu_memory_usage = self._cpu_memory_usage[slot]
+            avg.cuda_memory_usage = self._cuda_memory_usage[slot]
+            avg.self_cpu_memory_usage = self._self_cpu_memory_usage[slot]
+            avg.self_cuda_memory_usage = self._self_cuda_memory_usage[slot]
+            result.append(avg)
+        return result
+
+
+class _EventRing(object):
+    """Bounded buffer of the last ``capacity`` ranges produced by a
+    ``_RecordParser``, stored column-wise in preallocated arrays."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._next = 0
+        # interned raw names and input shapes
+        self._names = {}
+        self._shapes = {}
+        self._id = array.array('q', [0]) * capacity
+        self._node_id = array.array('q', [0]) * capacity
+        self._name = array.array('q', [0]) * capacity
+        self._thread = array.array('q', [0]) * capacity
+        self._input_shapes = array.array('q', [0]) * capacity
+        self._cpu_start = array.array('d', [0.]) * capacity
+        self._cpu_end = array.array('d', [0.]) * capacity
+        # cuda start is NaN for ranges without a kernel
+        self._cuda_start = array.array('d', [0.]) * capacity
+        self._cuda_end = array.array('d', [0.]) * capacity
+        self._device = array.array('q', [0]) * capacity
+        self._cpu_memory_usage = array.array('q', [0]) * capacity
+        self._cuda_memory_usage = array.array('q', [0]) * capacity
+        self._is_async = array.array('b', [0]) * capacity
+        self._is_remote = array.array('b', [0]) * capacity
+
+    def __len__(self):
+        return min(self._next, self.capacity)
+
+    @staticmethod
+    def _intern(table, value):
+        index = table.get(value)
+        if index is None:
+            index = table[value] = len(table)
+        return index
+
+    def add(self, r):
+        i = self._next % self.capacity
+        self._next += 1
+        self._id[i] = r.end.handle()
+        self._node_id[i] = r.end.node_id()
+        self._name[i] = self._intern(self._names, r.start.name())
+        self._thread[i] = r.start.thread_id()
+        self._input_shapes[i] = self._intern(
+            self._shapes, tuple(tuple(shape) for shape in r.start.shapes()))
+        self._cpu_start[i] = r.cpu_start
+        self._cpu_end[i] = r.cpu_end
+        if r.cuda_start is None:
+            self._cuda_start[i] = float('nan')
+        else:
+            self._cuda_start[i] = r.cuda_start
+            self._cuda_end[i] = r.cuda_end
+            self._device[i] = r.start.device()
+        self._cpu_memory_usage[i] = r.cpu_memory_usage
+        self._cuda_memory_usage[i] = r.cuda_memory_usage
+        self._is_async[i] = r.is_async
+        self._is_remote[i] = r.end.is_remote()
+
+    def events(self, string_table):
+        """Returns the buffered ranges as a list of FunctionEvent, sorted the
+        same way as by parse_cpu_trace."""
+        names = [None] * len(self._names)
+        for name, index in self._names.items():
+            names[index] = name
+        shapes = [None] * len(self._shapes)
+        for shape, index in self._shapes.items():
+            shapes[index] = [list(dims) for dims in shape]
+        functions = []
+        for n in range(max(0, self._next - self.capacity), self._next):
+            i = n % self.capacity
+            name = names[self._name[i]]
+            fe = FunctionEvent(
+                id=self._id[i],
+                node_id=self._node_id[i],
+                name=string_table[name],
+                thread=self._thread[i],
+                cpu_start=self._cpu_start[i],
+                cpu_end=self._cpu_end[i],
+                input_shapes=shapes[self._input_shapes[i]],
+                cpu_memory_usage=self._cpu_memory_usage[i],
+                cuda_memory_usage=self._cuda_memory_usage[i],
+                is_async=bool(self._is_async[i]),
+                is_remote=bool(self._is_remote[i]),
+            )
+            if not math.isnan(self._cuda_start[i]):
+                fe.append_kernel(name, self._device[i], self._cuda_start[i], self._cuda_end[i])
+            functions.append(fe)
+        functions.sort(key=lambda evt: [evt.cpu_interval.start, -evt.cpu_interval.end])
+        return functions
+
+
 ################################################################################
 # CUDA checkpoints
 
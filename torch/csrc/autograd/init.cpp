@@ -7,6 +7,58 @@
 #include <torch/csrc/autograd/profiler.h>
 #include <torch/csrc/autograd/python_function.h>
 #include <torch/csrc/autograd/function.h>
+#include <torch/csrc/autograd/saved_variable.h>
+
+namespace {
+
+// Data of a saved variable packed by a Python function: the object it
+// returned, and the function that unpacks it.
+struct PySavedVariablePacked : torch::autograd::SavedVariablePacked {
+  PySavedVariablePacked(py::function unpack_fn, py::object packed)
+    : unpack_fn_(std::move(unpack_fn)), packed_(std::move(packed)) {}
+
+  ~PySavedVariablePacked() override {
+    pybind11::gil_scoped_acquire gil;
+    packed_ = py::object();
+    unpack_fn_ = py::function();
+  }
+
+  at::Tensor unpack() override {
+    pybind11::gil_scoped_acquire gil;
+    return unpack_fn_(packed_).cast<at::Tensor>();
+  }
+
+  py::function unpack_fn_;
+  py::object packed_;
+};
+
+struct PySavedVariableHooks : torch::autograd::SavedVariableHooks {
+  PySavedVariableHooks(py::function pack_fn, py::function unpack_fn)
+    : pack_fn_(std::move(pack_fn)), unpack_fn_(std::move(unpack_fn)) {}
+
+  ~PySavedVariableHooks() override {
+    pybind11::gil_scoped_acquire gil;
+    pack_fn_ = py::function();
+    unpack_fn_ = py::function();
+  }
+
+  std::shared_ptr<torch::autograd::SavedVariablePacked> pack(
+      const torch::autograd::Variable& variable) override {
+    pybind11::gil_scoped_acquire gil;
+    // Whatever the hook computes is not part of the graph.
+    at::AutoGradMode no_grad(false);
+    py::object packed = pack_fn_(variable);
+    if (packed.is_none()) {
+      return nullptr;
+    }
+    return std::make_shared<PySavedVariablePacked>(unpack_fn_, std::move(packed));
+  }
+
+  py::function pack_fn_;
+  py::function unpack_fn_;
+};
+
+} // namespace
 
 PyObject* THPAutograd_initExtension(PyObject* _unused, PyObject *unused) {
   using namespace torch::autograd::profiler;
@@ -37,7 +89,8 @@ PyObject* THPAutograd_initExtension(PyObject* _unused, PyObject *unused) {
       .value("NVTX", ProfilerState::NVTX);
 
   py::class_<ProfilerConfig>(m, "ProfilerConfig")
-      .def(py::init<ProfilerState, bool, bool>());
+      .def(py::init<ProfilerState, bool, bool>())
+      .def(py::init<ProfilerState, bool, bool, int64_t>());
 
   py::class_<Event>(m, "ProfilerEvent")
       .def("kind", &Event::kind)
@@ -60,6 +113,13 @@ PyObject* THPAutograd_initExtension(PyObject* _unused, PyObject *unused) {
   m.def("_enable_record_function", [](bool enable) {
     at::enableRecordFunction(enable);
   });
+  m.def("_set_saved_tensors_hooks", [](py::function pack, py::function unpack) {
+    torch::autograd::set_saved_variable_hooks(
+        std::make_shared<PySavedVariableHooks>(std::move(pack), std::move(unpack)));
+  });
+  m.def("_reset_saved_tensors_hooks", []() {
+    torch::autograd::set_saved_variable_hooks(nullptr);
+  });
 
   Py_RETURN_TRUE;
 }
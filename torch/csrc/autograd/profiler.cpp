@@ -344,7 +344,7 @@ ProfilerThreadLocalState* getProfilerTLSState() {
 void pushProfilingCallbacks() {
   auto state_ptr = getProfilerTLSState();
   TORCH_INTERNAL_ASSERT(state_ptr, "Expected profiler state set");
-  auto handle = at::addThreadLocalCallback(at::RecordFunctionCallback(
+  auto callback = at::RecordFunctionCallback(
       [](const at::RecordFunction& fn) {
         auto state_ptr = getProfilerTLSState();
         if (!state_ptr || state_ptr->config().state == ProfilerState::Disabled) {
@@ -381,7 +381,17 @@ void pushProfilingCallbacks() {
         state_ptr->popRange(fn.getStartCallbacksThreadId(), fn.handle());
       })
     .needsInputs(state_ptr->config().report_input_shapes)
-    .needsIds(true));
+    .needsIds(true);
+  if (state_ptr->config().sample_every > 1) {
+    callback.setShouldRun([](const at::RecordFunctionCallback&) {
+      // start and end callbacks are sampled as a pair, so that skipping
+      // ranges never produces unmatched push or pop events
+      thread_local int64_t count = 0;
+      auto state_ptr = getProfilerTLSState();
+      return state_ptr && count++ % state_ptr->config().sample_every == 0;
+    });
+  }
+  auto handle = at::addThreadLocalCallback(std::move(callback));
   state_ptr->setCallbackHandle(handle);
 }
 
@@ -105,14 +105,18 @@ struct TORCH_API ProfilerConfig {
   ProfilerConfig(
       ProfilerState state,
       bool report_input_shapes,
-      bool profile_memory)
+      bool profile_memory,
+      int64_t sample_every = 1)
       : state(state),
         report_input_shapes(report_input_shapes),
-        profile_memory(profile_memory) {}
+        profile_memory(profile_memory),
+        sample_every(sample_every) {}
   ~ProfilerConfig();
   ProfilerState state;
   bool report_input_shapes;
   bool profile_memory;
+  // record one range out of every sample_every ranges of each thread
+  int64_t sample_every;
 
   // Returns IValues corresponding to ProfilerConfig struct, to be used for
   // serialization.
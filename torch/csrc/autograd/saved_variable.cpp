@@ -14,6 +14,18 @@
 
 namespace torch { namespace autograd {
 
+namespace {
+thread_local std::shared_ptr<SavedVariableHooks> saved_variable_hooks;
+} // namespace
+
+void set_saved_variable_hooks(std::shared_ptr<SavedVariableHooks> hooks) {
+  saved_variable_hooks = std::move(hooks);
+}
+
+std::shared_ptr<SavedVariableHooks> get_saved_variable_hooks() {
+  return saved_variable_hooks;
+}
+
 SavedVariable::SavedVariable(const Variable& variable, bool is_output, bool is_inplace_view) {
   if (variable.defined()) {
     was_default_constructed_ = false;
@@ -33,11 +45,17 @@ SavedVariable::SavedVariable(const Variable& variable, bool is_output, bool is_i
     }
     version_counter_ = impl::version_counter(variable);
     saved_version_ = version_counter_.current_version();
+    if (saved_variable_hooks) {
+      packed_ = saved_variable_hooks->pack(variable);
+      if (packed_) {
+        data_.reset();
+      }
+    }
   }
 }
 
 Variable SavedVariable::unpack(std::shared_ptr<Node> saved_for) const {
-  if (!data_.defined()) {
+  if (!data_.defined() && !packed_) {
     if (!was_default_constructed_) {
       throw std::runtime_error(ERR_BACKWARD_TWICE);
     }
@@ -54,11 +72,16 @@ Variable SavedVariable::unpack(std::shared_ptr<Node> saved_for) const {
     grad_fn = std::move(saved_for);
   }
 
+  // Packed data is only unpacked once it is known to be valid.
+  auto data = packed_ ? at::Tensor() : data_;
   if (saved_version_ != version_counter_.current_version()) {
+    if (packed_) {
+      data = packed_->unpack();
+    }
     std::stringstream message;
     message << "one of the variables needed for gradient computation has been "
-        "modified by an inplace operation: [" << data_.toString() << " "
-        << data_.sizes() << "]";
+        "modified by an inplace operation: [" << data.toString() << " "
+        << data.sizes() << "]";
     if (grad_fn) {
         message << ", which is output " << output_nr_
             << " of " << grad_fn->name() << ",";
@@ -81,11 +104,15 @@ Variable SavedVariable::unpack(std::shared_ptr<Node> saved_for) const {
   // NB: saved views are unpacked as normal Variables (not views) even though
   // they still share the same storage. This works only because we never call
   // in-place functions on unpacked variables.
+  if (packed_) {
+    data = packed_->unpack().tensor_data();
+  }
+
   Variable var;
   if (grad_fn) {
-    var = make_variable(data_, Edge(std::move(grad_fn), output_nr_));
+    var = make_variable(data, Edge(std::move(grad_fn), output_nr_));
   } else {
-    var = make_variable(data_, requires_grad_);
+    var = make_variable(data, requires_grad_);
   }
   impl::set_version_counter(var, saved_version_);
 
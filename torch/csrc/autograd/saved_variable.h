@@ -14,6 +14,30 @@ struct Node;
 
 TORCH_API extern const char* ERR_BACKWARD_TWICE;
 
+/// The data of a saved variable, in the representation returned by
+/// `SavedVariableHooks::pack`.
+struct TORCH_API SavedVariablePacked {
+  virtual ~SavedVariablePacked() = default;
+  /// Returns the data of the saved variable.
+  virtual at::Tensor unpack() = 0;
+};
+
+/// Hooks called when a variable is saved for backward, which can replace its
+/// data by another representation (e.g. compressed, or offloaded) until it is
+/// needed by backward. They are set per thread.
+struct TORCH_API SavedVariableHooks {
+  virtual ~SavedVariableHooks() = default;
+  /// Packs the data of a variable being saved, or returns nullptr to save it
+  /// as is. The packed data must not hold a reference to the variable, which
+  /// may be an output of the node saving it.
+  virtual std::shared_ptr<SavedVariablePacked> pack(const Variable& variable) = 0;
+};
+
+/// Sets the hooks called when a variable is saved in the current thread, or
+/// removes them if `hooks` is nullptr.
+TORCH_API void set_saved_variable_hooks(std::shared_ptr<SavedVariableHooks> hooks);
+TORCH_API std::shared_ptr<SavedVariableHooks> get_saved_variable_hooks();
+
 /// A snapshot of a variable at a certain version. A `SavedVariable` stores
 /// enough information to reconstruct a variable from a certain point in time.
 class TORCH_API SavedVariable {
@@ -29,6 +53,7 @@ class TORCH_API SavedVariable {
   Variable unpack(std::shared_ptr<Node> saved_for = nullptr) const;
 
   void reset_data() {
+    packed_.reset();
     return data_.reset();
   }
 
@@ -39,6 +64,10 @@ class TORCH_API SavedVariable {
  private:
   at::Tensor data_;
 
+  // The data packed by SavedVariableHooks, if any, in which case data_ is
+  // undefined.
+  std::shared_ptr<SavedVariablePacked> packed_;
+
   // The gradient function associated with this node. If has_grad_fn
   // is false, then this is a leaf node. Note that the grad_fn is not saved if
   // it would create a circular reference. In that case, the grad_fn must be
@@ -13,4 +13,28 @@ void broadcast_coalesced(
     at::TensorList tensors,
     size_t buffer_size);
 
+// Handle on the reduction of a bucket kicked off by a communication hook.
+class CommHookWork {
+ public:
+  virtual ~CommHookWork() {}
+
+  // Waits for the reduction to complete, and returns the reduced flattened
+  // gradients of the bucket. They may be returned in the input tensor.
+  virtual at::Tensor wait() = 0;
+};
+
+// A communication hook replaces the allreduce that the Reducer uses to reduce
+// the flattened gradients of a dense bucket, e.g. to compress them.
+class CommHookInterface {
+ public:
+  virtual ~CommHookInterface() {}
+
+  // Kicks off the reduction of the bucket at index `bucket_index`. The
+  // gradients in `bucket` are already divided by the size of the process
+  // group, so the reduction should sum them across processes.
+  virtual std::shared_ptr<CommHookWork> runHook(
+      size_t bucket_index,
+      at::Tensor& bucket) = 0;
+};
+
 } // namespace c10d
@@ -106,6 +106,52 @@ class PythonStore : public ::c10d::Store {
   }
 };
 
+// Result of a PythonCommHook: a Python object whose `wait()` method returns
+// the reduced bucket.
+class PythonCommHookWork : public ::c10d::CommHookWork {
+ public:
+  explicit PythonCommHookWork(py::object work) : work_(std::move(work)) {}
+
+  ~PythonCommHookWork() override {
+    pybind11::gil_scoped_acquire gil;
+    work_ = py::none();
+  }
+
+  at::Tensor wait() override {
+    pybind11::gil_scoped_acquire gil;
+    return work_.attr("wait")().cast<at::Tensor>();
+  }
+
+ private:
+  py::object work_;
+};
+
+// PythonCommHook runs a communication hook written in Python, called as
+// `hook(state, bucket_index, bucket)`.
+class PythonCommHook : public ::c10d::CommHookInterface {
+ public:
+  PythonCommHook(py::object state, py::object hook)
+      : state_(std::move(state)), hook_(std::move(hook)) {}
+
+  ~PythonCommHook() override {
+    pybind11::gil_scoped_acquire gil;
+    state_ = py::none();
+    hook_ = py::none();
+  }
+
+  std::shared_ptr<::c10d::CommHookWork> runHook(
+      size_t bucket_index,
+      at::Tensor& bucket) override {
+    pybind11::gil_scoped_acquire gil;
+    py::object work = hook_(state_, bucket_index, bucket);
+    return std::make_shared<PythonCommHookWork>(std::move(work));
+  }
+
+ private:
+  py::object state_;
+  py::object hook_;
+};
+
 PyObject* c10d_init(PyObject* _unused) {
   C10_LOG_API_USAGE_ONCE("c10d.python.import");
   auto c10d_module = THPObjectPtr(PyImport_ImportModule("torch.distributed"));
@@ -115,6 +161,13 @@ PyObject* c10d_init(PyObject* _unused) {
 
   auto module = py::handle(c10d_module).cast<py::module>();
 
+  py::class_<::c10d::BucketStats>(module, "_BucketStats")
+      .def_readonly("variable_indices", &::c10d::BucketStats::variable_indices)
+      .def_readonly("bytes", &::c10d::BucketStats::bytes)
+      .def_readonly("ready_time", &::c10d::BucketStats::ready_time)
+      .def_readonly("finish_time", &::c10d::BucketStats::finish_time)
+      .def_readonly("wait_time", &::c10d::BucketStats::wait_time);
+
   shared_ptr_class_<::c10d::Reducer>(module, "Reducer")
       .def(
           py::init<
@@ -142,7 +195,30 @@ PyObject* c10d_init(PyObject* _unused) {
           [](::c10d::Reducer& reducer, const torch::autograd::Variable& output)
               -> void { reducer.prepare_for_backward({output}); },
           py::call_guard<py::gil_scoped_release>())
-      .def("get_backward_stats", &::c10d::Reducer::get_backward_stats);
+      .def("get_backward_stats", &::c10d::Reducer::get_backward_stats)
+      .def(
+          "get_bucket_stats",
+          &::c10d::Reducer::get_bucket_stats,
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "has_finalized_backward",
+          &::c10d::Reducer::has_finalized_backward,
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "rebuild_buckets",
+          &::c10d::Reducer::rebuild_buckets,
+          py::arg("bucket_bytes_cap"),
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "register_comm_hook",
+          [](::c10d::Reducer& reducer, py::object state, py::object hook) {
+            auto comm_hook = std::unique_ptr<::c10d::CommHookInterface>(
+                new PythonCommHook(std::move(state), std::move(hook)));
+            py::gil_scoped_release release;
+            reducer.register_comm_hook(std::move(comm_hook));
+          },
+          py::arg("state"),
+          py::arg("hook"));
 
   py::enum_<::c10d::ReduceOp>(module, "ReduceOp", R"(
 An enum-like class for available reduction operations: ``SUM``, ``PRODUCT``,
@@ -1,6 +1,8 @@
 #include <torch/csrc/distributed/c10d/reducer.h>
 
+#include <algorithm>
 #include <functional>
+#include <numeric>
 
 #include <c10/core/DeviceGuard.h>
 #include <c10/core/StreamGuard.h>
@@ -35,6 +37,7 @@ Reducer::Reducer(
       expect_sparse_gradients_(std::move(expect_sparse_gradients)),
       expect_autograd_hooks_(false),
       require_finalize_(false),
+      has_finalized_backward_(false),
       next_bucket_(0),
       has_marked_unused_parameters_(false),
       local_used_maps_reduced_(false),
@@ -540,10 +543,33 @@ void Reducer::mark_bucket_ready(size_t bucket_index) {
       //
       tensors.push_back(replica.contents);
     }
-    bucket.work = process_group_->allreduce(tensors);
+    bucket.ready_time = current_time_in_nanos() - backward_stats_base_;
+    if (comm_hook_ != nullptr && !bucket.expect_sparse_gradient) {
+      // register_comm_hook makes sure there is a single replica.
+      bucket.comm_hook_work = comm_hook_->runHook(next_bucket_, tensors[0]);
+    } else {
+      bucket.work = process_group_->allreduce(tensors);
+    }
   }
 }
 
+void Reducer::register_comm_hook(
+    std::unique_ptr<CommHookInterface> comm_hook) {
+  std::lock_guard<std::mutex> lock(mutex_);
+  TORCH_CHECK(
+      comm_hook_ == nullptr,
+      "register_comm_hook can only be called once.");
+  TORCH_CHECK(
+      replicas_.size() == 1,
+      "Communication hooks are only supported with a single model replica "
+      "per process, i.e. single-process single-device mode.");
+  TORCH_CHECK(
+      !expect_autograd_hooks_,
+      "register_comm_hook cannot be called between a forward pass and its "
+      "backward pass.");
+  comm_hook_ = std::move(comm_hook);
+}
+
 void Reducer::initialize_buckets(
     std::vector<std::vector<size_t>> bucket_indices) {
   std::lock_guard<std::mutex> lock(mutex_);
@@ -745,6 +771,7 @@ void Reducer::prepare_for_backward(
 
   // Reset accounting.
   expect_autograd_hooks_ = true;
+  has_finalized_backward_ = false;
   next_bucket_ = 0;
   backward_stats_base_ = current_time_in_nanos();
   for (auto& bucket : buckets_) {
@@ -874,14 +901,28 @@ void Reducer::finalize_backward() {
   // No longer require call to finalize after this function returns.
   TORCH_INTERNAL_ASSERT(require_finalize_);
   require_finalize_ = false;
+  has_finalized_backward_ = true;
 
   // Check that all buckets were completed and had their work kicked off.
   TORCH_INTERNAL_ASSERT(next_bucket_ == buckets_.size());
 
   // Wait for asynchronous reduction to complete and unflatten contents.
   for (auto& bucket : buckets_) {
-    TORCH_INTERNAL_ASSERT(bucket.work);
-    bucket.work->wait();
+    const auto wait_start = current_time_in_nanos();
+    if (bucket.comm_hook_work) {
+      auto result = bucket.comm_hook_work->wait();
+      bucket.comm_hook_work.reset();
+      auto& contents = bucket.replicas[0].contents;
+      if (!result.is_same(contents)) {
+        contents.copy_(result);
+      }
+    } else {
+      TORCH_INTERNAL_ASSERT(bucket.work);
+      bucket.work->wait();
+    }
+    const auto wait_end = current_time_in_nanos();
+    bucket.wait_time = wait_end - wait_start;
+    bucket.finish_time = wait_end - backward_stats_base_;
     if (!bucket.expect_sparse_gradient) {
       // We don't need to finalize the sparse bucket since the sparse grad and
       // the bucket essentially point to the same storage. As a result, once
@@ -1002,6 +1043,66 @@ void Reducer::sync_bucket_indices(
   }
 }
 
+std::vector<BucketStats> Reducer::get_bucket_stats() {
+  std::lock_guard<std::mutex> lock(mutex_);
+  std::vector<BucketStats> result;
+  result.reserve(buckets_.size());
+  for (const auto& bucket : buckets_) {
+    const auto& replica = bucket.replicas[0];
+    BucketStats stats;
+    stats.variable_indices = bucket.variable_indices;
+    // Sparse buckets hold a single variable, and no lengths.
+    const size_t numel = bucket.expect_sparse_gradient
+        ? replica.variables[0].numel()
+        : std::accumulate(
+              replica.lengths.begin(), replica.lengths.end(), size_t(0));
+    stats.bytes = numel * replica.variables[0].element_size();
+    stats.ready_time = bucket.ready_time;
+    stats.finish_time = bucket.finish_time;
+    stats.wait_time = bucket.wait_time;
+    result.push_back(std::move(stats));
+  }
+  return result;
+}
+
+void Reducer::rebuild_buckets(int64_t bucket_bytes_cap) {
+  std::vector<std::vector<size_t>> bucket_indices;
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    TORCH_CHECK(
+        !expect_autograd_hooks_,
+        "rebuild_buckets cannot be called between a forward pass and its "
+        "backward pass.");
+    bucket_bytes_cap_ = bucket_bytes_cap;
+
+    // Order the variables by the time their gradients were ready.
+    const auto& ready_times = backward_stats_[0];
+    std::vector<int64_t> indices(ready_times.size());
+    std::iota(indices.begin(), indices.end(), 0);
+    std::stable_sort(
+        indices.begin(), indices.end(), [&](int64_t a, int64_t b) {
+          return ready_times[a] < ready_times[b];
+        });
+    std::vector<at::Tensor> tensors;
+    tensors.reserve(indices.size());
+    for (const auto index : indices) {
+      tensors.push_back(replicas_[0][index]);
+    }
+    std::vector<size_t> bucket_size_limits;
+    bucket_size_limits.push_back(kDefaultFirstBucketBytes);
+    bucket_size_limits.push_back(bucket_bytes_cap_);
+    bucket_indices = compute_bucket_assignment_by_size(
+        tensors, bucket_size_limits, expect_sparse_gradients_[0], indices);
+    sync_bucket_indices(bucket_indices);
+
+    // This replaces the rebuild after the first iteration.
+    has_rebuilt_bucket_ = true;
+    rebuilt_params_.clear();
+    rebuilt_param_indices_.clear();
+  }
+  initialize_buckets(std::move(bucket_indices));
+}
+
 std::vector<std::vector<size_t>> Reducer::rebuildBuckets() {
   TORCH_INTERNAL_ASSERT(
       rebuilt_params_.size() == rebuilt_param_indices_.size(),
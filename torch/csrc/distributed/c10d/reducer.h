@@ -9,6 +9,7 @@
 
 #include <c10d/ProcessGroup.hpp>
 #include <torch/csrc/autograd/function.h>
+#include <torch/csrc/distributed/c10d/comm.h>
 #include <torch/csrc/autograd/variable.h>
 #include <torch/csrc/distributed/autograd/context/context.h>
 
@@ -17,6 +18,22 @@ namespace c10d {
 constexpr int kDefaultFirstBucketBytes = int(1024 * 1024);
 constexpr int kDefaultBucketBytesCap = int(25 * 1024 * 1024);
 
+// Timing of the reduction of a bucket in an iteration. Times are in
+// nanoseconds, relative to the call to `prepare_for_backward`.
+struct BucketStats {
+  // Indices of the variables in the bucket.
+  std::vector<size_t> variable_indices;
+  // Size of the bucket in bytes.
+  int64_t bytes;
+  // Time at which the reduction was kicked off.
+  int64_t ready_time;
+  // Time at which the reduction was complete at the end of the backward pass.
+  int64_t finish_time;
+  // How long the end of the backward pass waited for the reduction, i.e. the
+  // part of the reduction that didn't overlap with the backward pass.
+  int64_t wait_time;
+};
+
 class Reducer {
  public:
   // The constructor takes a list of variables for every model replica.
@@ -52,6 +69,28 @@ class Reducer {
     return backward_stats_;
   }
 
+  // Returns the timing of the reduction of every bucket in the last
+  // iteration, in the order the buckets are reduced.
+  std::vector<BucketStats> get_bucket_stats();
+
+  // Returns whether the backward pass following the last call to
+  // `prepare_for_backward` has finished reducing the gradients, i.e. whether
+  // an iteration completed and `rebuild_buckets` can be called.
+  bool has_finalized_backward() {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return has_finalized_backward_;
+  }
+
+  // Rebuilds the buckets with the size cap `bucket_bytes_cap`, filling them
+  // in the order the gradients were ready in the last iteration of rank 0.
+  // Must be called by every process, between iterations.
+  void rebuild_buckets(int64_t bucket_bytes_cap);
+
+  // Replaces the allreduce of the dense buckets by the communication hook
+  // `comm_hook`. Only one hook can be registered, and only with a single
+  // model replica.
+  void register_comm_hook(std::unique_ptr<CommHookInterface> comm_hook);
+
  protected:
   // Forward declaration.
   struct Bucket;
@@ -75,8 +114,11 @@ class Reducer {
 
   bool expect_autograd_hooks_;
   bool require_finalize_;
+  bool has_finalized_backward_;
   size_t next_bucket_;
 
+  std::unique_ptr<CommHookInterface> comm_hook_;
+
   bool has_marked_unused_parameters_;
   std::vector<VariableIndex> unused_parameters_;
   // Locally used parameter maps indicating if parameters are used locally
@@ -195,6 +237,15 @@ class Reducer {
     // Keep work handle around when this set of buckets is being reduced.
     std::shared_ptr<c10d::ProcessGroup::Work> work;
 
+    // Handle on the reduction, instead of `work`, when it was kicked off by a
+    // communication hook.
+    std::shared_ptr<CommHookWork> comm_hook_work;
+
+    // Timing of the reduction in the last iteration, see BucketStats.
+    int64_t ready_time = 0;
+    int64_t finish_time = 0;
+    int64_t wait_time = 0;
+
     // If this bucket should expect a single sparse gradient.
     // Implies: replicas[i].variables.size() == 1.
     bool expect_sparse_gradient = false;
@@ -226,7 +277,7 @@ class Reducer {
   bool has_rebuilt_bucket_;
   std::vector<at::Tensor> rebuilt_params_;
   std::vector<int64_t> rebuilt_param_indices_;
-  const int64_t bucket_bytes_cap_;
+  int64_t bucket_bytes_cap_;
 
   struct RpcContext {
     using ContextPtr = torch::distributed::autograd::ContextPtr;
@@ -669,12 +669,25 @@ void initJITBindings(PyObject* module) {
       .def_property_readonly(
           "fallback", [](GraphExecutorState& s) { return s.fallback; });
 
+  // Records are written with the GIL released, so that other Python threads
+  // (e.g., a training loop while a checkpoint is saved in the background) can
+  // run meanwhile. Writers to a Python buffer re-acquire it to call `write()`.
   py::class_<PyTorchStreamWriter>(m, "PyTorchFileWriter")
       .def(py::init<std::string>())
       .def(py::init([](const py::object& buffer) {
         auto writer_func = [=](const void* data, size_t size) {
-          auto bytes = py::bytes(reinterpret_cast<const char*>(data), size);
-          buffer.attr("write")(std::move(bytes));
+          pybind11::gil_scoped_acquire gil;
+          // Hand a view of the data to `write()` rather than copying it into
+          // a `bytes` object, which would double the memory used by large
+          // records.
+          THPObjectPtr memview(PyMemoryView_FromMemory(
+              reinterpret_cast<char*>(const_cast<void*>(data)),
+              size,
+              PyBUF_READ));
+          if (!memview) {
+            throw python_error();
+          }
+          buffer.attr("write")(py::handle(memview.get()));
           return size;
         };
         return std::make_unique<PyTorchStreamWriter>(std::move(writer_func));
@@ -685,8 +698,12 @@ void initJITBindings(PyObject* module) {
           [](PyTorchStreamWriter& self,
              const std::string& name,
              const char* data,
-             size_t size) { return self.writeRecord(name, data, size); })
-      .def("write_end_of_file", &PyTorchStreamWriter::writeEndOfFile)
+             size_t size) { return self.writeRecord(name, data, size); },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "write_end_of_file",
+          &PyTorchStreamWriter::writeEndOfFile,
+          py::call_guard<py::gil_scoped_release>())
       .def(
           "write_record",
           [](PyTorchStreamWriter& self,
@@ -695,7 +712,8 @@ void initJITBindings(PyObject* module) {
              size_t size) {
             return self.writeRecord(
                 name, reinterpret_cast<const char*>(data), size);
-          });
+          },
+          py::call_guard<py::gil_scoped_release>());
 
   py::enum_<MobileOptimizerType>(m, "MobileOptimizerType")
       .value("CONV_BN_FUSION", MobileOptimizerType::CONV_BN_FUSION)
@@ -805,6 +823,11 @@ void initJITBindings(PyObject* module) {
                     at::CPU(scalar_type).typeMeta());
             return at::Tensor(std::move(ptr));
           })
+      .def(
+          "get_record_offset",
+          [](PyTorchStreamReader& self, const std::string& key) {
+            return self.getRecordOffset(key);
+          })
       .def("get_all_records", [](PyTorchStreamReader& self) {
         return self.getAllRecords();
       });
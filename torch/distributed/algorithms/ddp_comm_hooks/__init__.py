@@ -0,0 +1,15 @@
+"""
+:mod:`torch.distributed.algorithms.ddp_comm_hooks` contains communication hooks
+for :meth:`torch.nn.parallel.DistributedDataParallel.register_comm_hook`, which
+reduce the gradient buckets with less data sent over the network than the
+default allreduce:
+
+* :func:`~default_hooks.fp16_compress_hook` sends the gradients in half precision.
+* :func:`~powerSGD_hook.powerSGD_hook` sends a low-rank approximation of the
+  gradients (PowerSGD), with error feedback.
+* :func:`~topk_hook.topk_hook` only sends the largest gradients, with error
+  feedback.
+"""
+from .default_hooks import allreduce_hook, fp16_compress_hook  # noqa: F401
+from .powerSGD_hook import PowerSGDState, powerSGD_hook  # noqa: F401
+from .topk_hook import TopKState, topk_hook  # noqa: F401
@@ -0,0 +1,118 @@
+r"""
+Compares the communication hooks of :mod:`torch.distributed.algorithms.ddp_comm_hooks`
+on CPU over the gloo backend: bytes sent per process and per step, and step
+time of a :class:`~torch.nn.parallel.DistributedDataParallel` MLP.
+
+Usage::
+
+    python -m torch.distributed.algorithms.ddp_comm_hooks.benchmark \
+        --world-size 4 --hidden 2048 --layers 4 --steps 20
+"""
+import argparse
+import os
+import time
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+
+from torch.distributed.algorithms.ddp_comm_hooks import (
+    PowerSGDState, TopKState, allreduce_hook, fp16_compress_hook,
+    powerSGD_hook, topk_hook,
+)
+
+
+def _hooks(args):
+    return [
+        ('default', None, None),
+        ('allreduce', lambda: None, allreduce_hook),
+        ('fp16', lambda: None, fp16_compress_hook),
+        ('powerSGD', lambda: PowerSGDState(
+            None, matrix_approximation_rank=args.rank, start_powerSGD_iter=0), powerSGD_hook),
+        ('topk', lambda: TopKState(None, compress_ratio=args.compress_ratio), topk_hook),
+    ]
+
+
+class _ByteCounter(object):
+    r"""Counts the bytes passed to the collectives used by the hooks."""
+
+    def __init__(self):
+        self.bytes = 0
+        self._all_reduce = dist.all_reduce
+        self._all_gather = dist.all_gather
+
+    def __enter__(self):
+        def all_reduce(tensor, *args, **kwargs):
+            self.bytes += tensor.numel() * tensor.element_size()
+            return self._all_reduce(tensor, *args, **kwargs)
+
+        def all_gather(tensor_list, tensor, *args, **kwargs):
+            self.bytes += tensor.numel() * tensor.element_size()
+            return self._all_gather(tensor_list, tensor, *args, **kwargs)
+
+        dist.all_reduce = all_reduce
+        dist.all_gather = all_gather
+        return self
+
+    def __exit__(self, *args):
+        dist.all_reduce = self._all_reduce
+        dist.all_gather = self._all_gather
+
+
+def _mlp(hidden, num_layers):
+    layers = []
+    for _ in range(num_layers):
+        layers += [nn.Linear(hidden, hidden), nn.ReLU()]
+    return nn.Sequential(*layers)
+
+
+def _run(rank, args):
+    os.environ['MASTER_ADDR'] = '127.0.0.1'
+    os.environ['MASTER_PORT'] = str(args.port)
+    dist.init_process_group('gloo', rank=rank, world_size=args.world_size)
+    inputs = torch.randn(args.batch_size, args.hidden)
+
+    for name, make_state, hook in _hooks(args):
+        torch.manual_seed(0)
+        module = _mlp(args.hidden, args.layers)
+        param_bytes = sum(p.numel() * p.element_size() for p in module.parameters())
+        model = nn.parallel.DistributedDataParallel(module)
+        if hook is not None:
+            model.register_comm_hook(make_state(), hook)
+        for _ in range(args.warmup):
+            model(inputs).sum().backward()
+        dist.barrier()
+        with _ByteCounter() as counter:
+            start = time.time()
+            for _ in range(args.steps):
+                model(inputs).sum().backward()
+            elapsed = time.time() - start
+        sent = counter.bytes if hook is not None else param_bytes * args.steps
+        if rank == 0:
+            print('{:>10}  {:>12.2f} MB/step  {:>10.2f} ms/step'.format(
+                name, sent / args.steps / 1e6, elapsed / args.steps * 1e3))
+
+    dist.destroy_process_group()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--world-size', type=int, default=2)
+    parser.add_argument('--hidden', type=int, default=1024)
+    parser.add_argument('--layers', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--rank', type=int, default=4,
+                        help='matrix approximation rank of PowerSGD')
+    parser.add_argument('--compress-ratio', type=float, default=0.01,
+                        help='fraction of the gradients sent by top-k')
+    parser.add_argument('--port', type=int, default=29501)
+    args = parser.parse_args()
+    print('{:>10}  {:>18}  {:>16}'.format('hook', 'sent per process', 'step time'))
+    mp.spawn(_run, args=(args,), nprocs=args.world_size)
+
+
+if __name__ == '__main__':
+    main()
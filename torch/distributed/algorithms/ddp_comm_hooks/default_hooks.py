@@ -0,0 +1,61 @@
+import torch
+import torch.distributed as dist
+
+
+class _Pending(object):
+    r"""Result of a communication hook: waits for the collective ``work`` and
+    returns the result of ``then()``."""
+
+    def __init__(self, work, then):
+        self.work = work
+        self.then = then
+
+    def wait(self):
+        if self.work is not None:
+            self.work.wait()
+        return self.then()
+
+
+def _group(process_group):
+    return process_group if process_group is not None else dist.group.WORLD
+
+
+def allreduce_hook(process_group, bucket_index, bucket):
+    r"""
+    Allreduces the bucket as is, like DDP does without a communication hook.
+    Mostly useful as a baseline, or as a template for other hooks.
+
+    Arguments:
+        process_group (ProcessGroup): the process group to reduce the bucket
+            in, the default one if ``None``
+        bucket_index (int): index of the bucket
+        bucket (Tensor): flattened gradients of the bucket
+
+    Example::
+
+        >>> ddp_model.register_comm_hook(process_group, allreduce_hook)
+    """
+    work = dist.all_reduce(bucket, group=_group(process_group), async_op=True)
+    return _Pending(work, lambda: bucket)
+
+
+def fp16_compress_hook(process_group, bucket_index, bucket):
+    r"""
+    Casts the bucket to ``torch.float16`` and allreduces it, which halves the
+    data sent for ``float32`` gradients. The gradients are already divided by
+    the world size, so the sum doesn't overflow unless the averaged gradients
+    do.
+
+    Arguments:
+        process_group (ProcessGroup): the process group to reduce the bucket
+            in, the default one if ``None``
+        bucket_index (int): index of the bucket
+        bucket (Tensor): flattened gradients of the bucket
+
+    Example::
+
+        >>> ddp_model.register_comm_hook(process_group, fp16_compress_hook)
+    """
+    compressed = bucket.to(torch.float16)
+    work = dist.all_reduce(compressed, group=_group(process_group), async_op=True)
+    return _Pending(work, lambda: bucket.copy_(compressed))
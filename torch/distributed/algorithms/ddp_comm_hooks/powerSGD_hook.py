@@ -0,0 +1,130 @@
+import math
+
+import torch
+import torch.distributed as dist
+
+from .default_hooks import _Pending, _group
+
+
+def _orthogonalize(matrix, epsilon=1e-8):
+    r"""Orthonormalizes the columns of ``matrix`` in place (Gram-Schmidt)."""
+    num_cols = matrix.size(1)
+    for i in range(num_cols):
+        col = matrix[:, i:i + 1]
+        col.div_(torch.norm(col) + epsilon)
+        if i + 1 < num_cols:
+            rest = matrix[:, i + 1:]
+            rest.sub_(torch.sum(col * rest, dim=0) * col)
+
+
+class PowerSGDState(object):
+    r"""
+    State of :func:`powerSGD_hook`, which keeps per-bucket buffers across
+    iterations.
+
+    Arguments:
+        process_group (ProcessGroup): the process group to reduce the buckets
+            in, the default one if ``None``
+        matrix_approximation_rank (int): rank of the approximation of the
+            gradients. Higher ranks are more accurate, but send more data.
+            Default: 1
+        start_powerSGD_iter (int): number of iterations for which the buckets
+            are allreduced as is before compressing them, since the gradients
+            vary a lot early in training. Default: 10
+        use_error_feedback (bool): if ``True``, the approximation error of a
+            bucket is added to it at the next iteration, which is needed for
+            convergence in most cases. Default: ``True``
+        warm_start (bool): if ``True``, the right factor of the previous
+            iteration is used to start the power iteration. Default: ``True``
+        random_seed (int): seed of the initial right factors, which must be the
+            same on every process. Default: 0
+    """
+
+    def __init__(self, process_group, matrix_approximation_rank=1,
+                 start_powerSGD_iter=10, use_error_feedback=True,
+                 warm_start=True, random_seed=0):
+        self.process_group = process_group
+        self.matrix_approximation_rank = matrix_approximation_rank
+        self.start_powerSGD_iter = start_powerSGD_iter
+        self.use_error_feedback = use_error_feedback
+        self.warm_start = warm_start
+        self.generator = torch.Generator()
+        self.generator.manual_seed(random_seed)
+        self.iter = 0
+        self.error_dict = {}
+        self.q_dict = {}
+
+    def _matrix_shape(self, numel):
+        # The bucket is compressed as a roughly square matrix, zero padded.
+        cols = int(math.ceil(math.sqrt(numel)))
+        rows = int(math.ceil(numel / float(cols)))
+        return rows, cols
+
+    def _q(self, bucket_index, cols, bucket):
+        q = self.q_dict.get(bucket_index)
+        # Buckets may be rebuilt after the first iteration, changing sizes.
+        if q is None or q.size(0) != cols or not self.warm_start:
+            q = torch.randn(cols, self.matrix_approximation_rank,
+                            generator=self.generator)
+            q = q.to(device=bucket.device, dtype=bucket.dtype)
+            self.q_dict[bucket_index] = q
+        return q
+
+
+def powerSGD_hook(state, bucket_index, bucket):
+    r"""
+    Sends a low-rank approximation of the bucket, computed with one step of
+    power iteration as in PowerSGD (Vogels et al., 2019): the bucket is viewed
+    as an ``n x m`` matrix ``M`` and approximated by ``P Q^T``, where ``P``
+    (``n x r``) and ``Q`` (``m x r``) are allreduced instead of ``M``, which
+    sends ``r (n + m)`` elements instead of ``n m``. The approximation error
+    is kept and added to the bucket at the next iteration.
+
+    The allreduce of ``P`` overlaps with the backward pass, while the one of
+    ``Q``, which depends on it, happens when DDP waits for the bucket. Buckets
+    too small to be compressed are allreduced as is.
+
+    Arguments:
+        state (PowerSGDState): state of the hook
+        bucket_index (int): index of the bucket
+        bucket (Tensor): flattened gradients of the bucket
+
+    Example::
+
+        >>> state = PowerSGDState(process_group=None, matrix_approximation_rank=1)
+        >>> ddp_model.register_comm_hook(state, powerSGD_hook)
+    """
+    group = _group(state.process_group)
+    if bucket_index == 0:
+        state.iter += 1
+    numel = bucket.numel()
+    rows, cols = state._matrix_shape(numel)
+    rank = state.matrix_approximation_rank
+    if state.iter <= state.start_powerSGD_iter or rank * (rows + cols) >= numel:
+        work = dist.all_reduce(bucket, group=group, async_op=True)
+        return _Pending(work, lambda: bucket)
+
+    matrix = bucket.new_zeros(rows * cols)
+    matrix[:numel].copy_(bucket)
+    if state.use_error_feedback:
+        error = state.error_dict.get(bucket_index)
+        if error is not None and error.numel() == numel:
+            matrix[:numel].add_(error)
+    matrix = matrix.view(rows, cols)
+
+    q = state._q(bucket_index, cols, bucket)
+    p = torch.mm(matrix, q)
+    work = dist.all_reduce(p, group=group, async_op=True)
+
+    def decompress():
+        _orthogonalize(p)
+        local_q = torch.mm(matrix.t(), p)
+        if state.use_error_feedback:
+            error = matrix.view(-1)[:numel] - torch.mm(p, local_q.t()).view(-1)[:numel]
+            state.error_dict[bucket_index] = error
+        dist.all_reduce(local_q, group=group)
+        state.q_dict[bucket_index] = local_q
+        approximation = torch.mm(p, local_q.t())
+        return bucket.copy_(approximation.view(-1)[:numel])
+
+    return _Pending(work, decompress)
@@ -0,0 +1,80 @@
+import torch
+import torch.distributed as dist
+
+from .default_hooks import _Pending, _group
+
+
+class TopKState(object):
+    r"""
+    State of :func:`topk_hook`, which keeps the per-bucket error feedback
+    across iterations.
+
+    Arguments:
+        process_group (ProcessGroup): the process group to reduce the buckets
+            in, the default one if ``None``
+        compress_ratio (float): fraction of the gradients of each bucket that
+            are sent. Default: 0.01
+        use_error_feedback (bool): if ``True``, the gradients that were not sent
+            are added to the bucket at the next iteration, which is needed for
+            convergence in most cases. Default: ``True``
+    """
+
+    def __init__(self, process_group, compress_ratio=0.01, use_error_feedback=True):
+        if not 0 < compress_ratio <= 1:
+            raise ValueError("Invalid compress_ratio: {}".format(compress_ratio))
+        self.process_group = process_group
+        self.compress_ratio = compress_ratio
+        self.use_error_feedback = use_error_feedback
+        self.error_dict = {}
+
+
+def topk_hook(state, bucket_index, bucket):
+    r"""
+    Sends only the ``k`` gradients of the bucket with the largest magnitude,
+    as values and ``int32`` indices, which are all-gathered and summed by every
+    process. With ``compress_ratio=c``, a process sends ``2 c`` times the data
+    of the bucket. The gradients that were not sent are kept and added to the
+    bucket at the next iteration.
+
+    Arguments:
+        state (TopKState): state of the hook
+        bucket_index (int): index of the bucket
+        bucket (Tensor): flattened gradients of the bucket
+
+    Example::
+
+        >>> state = TopKState(process_group=None, compress_ratio=0.01)
+        >>> ddp_model.register_comm_hook(state, topk_hook)
+    """
+    group = _group(state.process_group)
+    numel = bucket.numel()
+    k = max(1, int(numel * state.compress_ratio))
+    if 2 * k >= numel:
+        work = dist.all_reduce(bucket, group=group, async_op=True)
+        return _Pending(work, lambda: bucket)
+
+    if state.use_error_feedback:
+        error = state.error_dict.get(bucket_index)
+        if error is not None and error.numel() == numel:
+            bucket.add_(error)
+    _, indices = bucket.abs().topk(k, sorted=False)
+    values = bucket[indices]
+    if state.use_error_feedback:
+        error = bucket.clone()
+        error[indices] = 0
+        state.error_dict[bucket_index] = error
+    indices = indices.int()
+
+    world_size = dist.get_world_size(group)
+    all_values = [torch.empty_like(values) for _ in range(world_size)]
+    all_indices = [torch.empty_like(indices) for _ in range(world_size)]
+    values_work = dist.all_gather(all_values, values, group=group, async_op=True)
+    indices_work = dist.all_gather(all_indices, indices, group=group, async_op=True)
+
+    def decompress():
+        indices_work.wait()
+        bucket.zero_()
+        bucket.index_add_(0, torch.cat(all_indices).long(), torch.cat(all_values))
+        return bucket
+
+    return _Pending(values_work, decompress)
@@ -17,6 +17,58 @@ from .parallel_apply import parallel_apply
 from torch.cuda._utils import _get_device_index
 
 
+class _BucketCapTuner(object):
+    r"""Tries bucket size caps one after the other, for a few iterations each,
+    and keeps the one with which the reduction of the gradients completes the
+    earliest after the start of the backward pass, i.e. the one with the best
+    overlap of communication and computation."""
+
+    candidate_caps_mb = (1, 4, 16, 64)
+
+    def __init__(self, reducer, process_group, parameters, bucket_bytes_cap,
+                 iterations=5):
+        self.reducer = reducer
+        self.process_group = process_group
+        self.device = parameters[0].device
+        self.iterations = iterations
+        total_bytes = sum(p.numel() * p.element_size() for p in parameters)
+        caps = sorted(set([bucket_bytes_cap] +
+                          [int(mb * 1024 * 1024) for mb in self.candidate_caps_mb]))
+        # caps that fit all the parameters in a single bucket are equivalent
+        self.caps = [cap for cap in caps if cap < total_bytes] + \
+            [cap for cap in caps if cap >= total_bytes][:1]
+        self.times = [0.] * len(self.caps)
+        self.candidate = -1
+        self.iteration = 0
+
+    def step(self):
+        r"""Records the timing of the last iteration, and moves on to the next
+        cap if needed. Must be called by every process, after the backward pass
+        of an iteration finished reducing the gradients and before the next
+        ``prepare_for_backward``.
+        Returns the best cap once it is known, and ``None`` until then."""
+        # The first iteration with new buckets isn't timed, since it allocates
+        # them, and the one before the first candidate runs with the buckets
+        # built from the parameters order.
+        if self.candidate >= 0 and self.iteration > 0:
+            stats = self.reducer.get_bucket_stats()
+            self.times[self.candidate] += max(s.finish_time for s in stats)
+        self.iteration += 1
+        if self.candidate >= 0 and self.iteration < self.iterations:
+            return None
+        self.candidate += 1
+        self.iteration = 0
+        if self.candidate < len(self.caps):
+            self.reducer.rebuild_buckets(self.caps[self.candidate])
+            return None
+        # Every process must pick the same cap.
+        times = torch.tensor(self.times, dtype=torch.float64, device=self.device)
+        dist.all_reduce(times, op=dist.ReduceOp.MAX, group=self.process_group)
+        best_cap = self.caps[int(times.argmin())]
+        self.reducer.rebuild_buckets(best_cap)
+        return best_cap
+
+
 def _find_tensors(obj):
     r"""
     Recursively find all tensors contained in the specified object.
@@ -248,6 +300,15 @@ class DistributedDataParallel(Module):
                          are getting different gradients, which should not
                          happen if DistributedDataParallel is correctly used.
                          (default: ``False``)
+        auto_tune_bucket_cap (bool): when set to ``True``, the bucket size cap
+                         is tuned during the first iterations: a few bucket
+                         caps are each used for a few iterations, and the one
+                         with which the gradients are reduced the earliest
+                         after the start of the backward pass, as measured by
+                         :meth:`get_bucket_stats`, is kept. In any case, the
+                         buckets are rebuilt after the first iteration, in the
+                         order the gradients were ready.
+                         (default: ``False``)
 
     Attributes:
         module (Module): the module to be parallelized
@@ -262,7 +323,8 @@ class DistributedDataParallel(Module):
                  process_group=None,
                  bucket_cap_mb=25,
                  find_unused_parameters=False,
-                 check_reduction=False):
+                 check_reduction=False,
+                 auto_tune_bucket_cap=False):
 
         super(DistributedDataParallel, self).__init__()
 
@@ -324,6 +386,7 @@ class DistributedDataParallel(Module):
 
         # reduction bucket size
         self.bucket_bytes_cap = int(bucket_cap_mb * 1024 * 1024)
+        self.auto_tune_bucket_cap = auto_tune_bucket_cap
 
         # Sync params and buffers
         module_states = list(self.module.state_dict().values())
@@ -445,6 +508,11 @@ class DistributedDataParallel(Module):
             expect_sparse_gradient,
             self.bucket_bytes_cap)
 
+        self._bucket_cap_tuner = None
+        if self.auto_tune_bucket_cap:
+            self._bucket_cap_tuner = _BucketCapTuner(
+                self.reducer, self.process_group, parameters[0], self.bucket_bytes_cap)
+
         # passing a handle to torch.nn.SyncBatchNorm layer
         self._passing_sync_batchnorm_handle(self._module_copies)
 
@@ -453,6 +521,7 @@ class DistributedDataParallel(Module):
         attrs = copy.copy(self.__dict__)
         del attrs['process_group']
         del attrs['reducer']
+        del attrs['_bucket_cap_tuner']
         return attrs
 
     def __setstate__(self, state):
@@ -461,6 +530,7 @@ class DistributedDataParallel(Module):
         super(DistributedDataParallel, self).__setstate__(state)
         self.__dict__.setdefault('require_forward_param_sync', True)
         self.__dict__.setdefault('require_backward_grad_sync', True)
+        self.__dict__.setdefault('auto_tune_bucket_cap', False)
         self._ddp_init_helper()
 
     def _check_default_group(self):
@@ -501,6 +571,63 @@ class DistributedDataParallel(Module):
         finally:
             self.require_backward_grad_sync = old_require_backward_grad_sync
 
+    def get_bucket_stats(self):
+        r"""
+        Returns the timing of the gradient reduction of every bucket in the
+        last iteration, in the order the buckets are reduced, as a list of
+        dicts with the following keys (times are in nanoseconds, relative to
+        the end of the forward pass):
+
+        * ``variable_indices``: indices of the parameters in the bucket
+        * ``bytes``: size of the bucket
+        * ``ready_time``: time at which the reduction was kicked off
+        * ``finish_time``: time at which the reduction was complete at the end
+          of the backward pass
+        * ``wait_time``: how long the end of the backward pass waited for the
+          reduction, i.e. the time of the reduction that didn't overlap with
+          the backward pass
+        """
+        return [dict(variable_indices=s.variable_indices, bytes=s.bytes,
+                     ready_time=s.ready_time, finish_time=s.finish_time,
+                     wait_time=s.wait_time)
+                for s in self.reducer.get_bucket_stats()]
+
+    def register_comm_hook(self, state, hook):
+        r"""
+        Registers a communication hook, which replaces the allreduce that DDP
+        uses to average the gradients of each bucket, e.g. to compress them
+        before they are sent. Built-in hooks are in
+        :mod:`torch.distributed.algorithms.ddp_comm_hooks`.
+
+        The hook is called as ``hook(state, bucket_index, bucket)`` as soon as
+        a bucket is ready, where ``bucket`` is the 1-D tensor of the flattened
+        gradients of the bucket, already divided by the world size, and
+        ``state`` is passed through as is (e.g. the process group and any
+        buffers kept across iterations). It must kick off the reduction (e.g.
+        with ``async_op=True`` collectives) and return an object whose
+        ``wait()`` method returns the sum of the buckets of all the processes,
+        as a tensor of the same size. ``wait()`` is called at the end of the
+        backward pass, before the gradients are written back.
+
+        Arguments:
+            state (object): state passed to the hook
+            hook (callable): communication hook
+
+        .. warning::
+            A hook can only be registered once, with a single device per
+            process. Buckets of sparse gradients are still allreduced. The
+            hook is not kept when pickling the module.
+
+        Example::
+
+            >>> from torch.distributed.algorithms.ddp_comm_hooks import default_hooks
+            >>> ddp = torch.nn.parallel.DistributedDataParallel(model)
+            >>> ddp.register_comm_hook(None, default_hooks.fp16_compress_hook)
+        """
+        if not callable(hook):
+            raise TypeError("hook should be callable, but got {}".format(type(hook).__name__))
+        self.reducer.register_comm_hook(state, hook)
+
     def forward(self, *inputs, **kwargs):
         if self.require_forward_param_sync:
             self._sync_params()
@@ -517,6 +644,14 @@ class DistributedDataParallel(Module):
 
         if torch.is_grad_enabled() and self.require_backward_grad_sync:
             self.require_forward_param_sync = True
+            # Only iterations whose backward pass reduced the gradients are
+            # timed, and buckets can't be rebuilt before that backward pass.
+            if self._bucket_cap_tuner is not None and \
+                    self.reducer.has_finalized_backward():
+                best_cap = self._bucket_cap_tuner.step()
+                if best_cap is not None:
+                    self.bucket_bytes_cap = best_cap
+                    self._bucket_cap_tuner = None
             # We'll return the output object verbatim since it is a freeform
             # object. We need to find any tensors in this object, though,
             # because we need to figure out which parameters were used during
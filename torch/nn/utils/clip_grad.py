@@ -1,40 +1,95 @@
 import warnings
 import torch
 from torch._six import inf
+from torch._utils import _flat_view_of_dense_tensors
 
 
-def clip_grad_norm_(parameters, max_norm, norm_type=2):
+def _grad_groups(grads):
+    r"""Groups :attr:`grads` by device and dtype, and returns for each group the
+    tensors to compute the norm of and scale: a single flat view of the group's
+    gradients if they are laid out back to back in memory (e.g. with the
+    ``multi_tensor`` optimizers), or the gradients themselves otherwise."""
+    groups = {}
+    for g in grads:
+        groups.setdefault((g.device, g.dtype), []).append(g)
+    result = []
+    for group in groups.values():
+        flat = None
+        if len(group) > 1 and not any(g.is_sparse for g in group):
+            flat = _flat_view_of_dense_tensors(group)
+        result.append([flat] if flat is not None else group)
+    return result
+
+
+def _combine_norms(norms, norm_type):
+    if len(norms) == 1:
+        return norms[0]
+    norms = torch.stack(norms)
+    if norm_type == inf:
+        return norms.max()
+    elif norm_type == -inf:
+        return norms.min()
+    elif norm_type == 0:
+        return norms.sum()
+    return torch.norm(norms, norm_type)
+
+
+def clip_grad_norm_(parameters, max_norm, norm_type=2, error_if_nonfinite=False):
     r"""Clips gradient norm of an iterable of parameters.
 
     The norm is computed over all gradients together, as if they were
     concatenated into a single vector. Gradients are modified in-place.
 
+    Gradients that are laid out back to back in memory (e.g. the ones of the
+    optimizers with ``multi_tensor=True``) have their norm computed and are
+    scaled with a single op. The gradients are always scaled, by a factor
+    clamped to 1, so that clipping never waits on the device to decide whether
+    to scale them.
+
     Arguments:
         parameters (Iterable[Tensor] or Tensor): an iterable of Tensors or a
             single Tensor that will have gradients normalized
         max_norm (float or int): max norm of the gradients
         norm_type (float or int): type of the used p-norm. Can be ``'inf'`` for
             infinity norm.
+        error_if_nonfinite (bool): if ``True``, an error is raised if the total
+            norm of the gradients is ``nan``, ``inf`` or ``-inf``. This needs
+            to synchronize with the device; ``torch.isfinite`` of the returned
+            norm gives the same information without waiting.
+            Default: ``False``
 
     Returns:
         Total norm of the parameters (viewed as a single vector).
+
+    .. note::
+        If the total norm is not finite, the gradients end up non-finite
+        (or zero, for an infinite norm of finite gradients).
     """
     if isinstance(parameters, torch.Tensor):
         parameters = [parameters]
-    parameters = list(filter(lambda p: p.grad is not None, parameters))
+    grads = [p.grad.detach() for p in parameters if p.grad is not None]
     max_norm = float(max_norm)
     norm_type = float(norm_type)
-    if len(parameters) == 0:
+    if len(grads) == 0:
         return torch.tensor(0.)
-    device = parameters[0].grad.device
-    if norm_type == inf:
-        total_norm = max(p.grad.detach().abs().max().to(device) for p in parameters)
-    else:
-        total_norm = torch.norm(torch.stack([torch.norm(p.grad.detach(), norm_type).to(device) for p in parameters]), norm_type)
-    clip_coef = max_norm / (total_norm + 1e-6)
-    if clip_coef < 1:
-        for p in parameters:
-            p.grad.detach().mul_(clip_coef.to(p.grad.device))
+    device = grads[0].device
+    groups = _grad_groups(grads)
+    dtype = grads[0].dtype
+    for group in groups:
+        dtype = torch.promote_types(dtype, group[0].dtype)
+    with torch.no_grad():
+        norms = [_combine_norms([torch.norm(g, norm_type) for g in group], norm_type)
+                 for group in groups]
+        total_norm = _combine_norms([n.to(device=device, dtype=dtype) for n in norms], norm_type)
+        if error_if_nonfinite and not torch.isfinite(total_norm):
+            raise RuntimeError(
+                'The total norm of order {} for gradients from `parameters` is '
+                'non-finite, so it cannot be clipped.'.format(norm_type))
+        clip_coef = (max_norm / (total_norm + 1e-6)).clamp(max=1.0)
+        for group in groups:
+            coef = clip_coef.to(device=group[0].device, dtype=group[0].dtype)
+            for g in group:
+                g.mul_(coef)
     return total_norm
 
 
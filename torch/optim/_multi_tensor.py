@@ -0,0 +1,86 @@
+r"""Helpers for the multi-tensor path of the optimizers (``multi_tensor=True``),
+which applies each stage of an update to all the parameters of a group at once.
+
+The parameters of the group, their gradients and each of their state buffers
+are made views into a flat contiguous buffer (one per kind), so that an update
+stage is a single op over the flat buffer, while the per-parameter tensors seen
+by the rest of the code (modules, autograd, ``state_dict``) stay valid. Since
+the update ops are elementwise, the results are identical to the ones of the
+per-parameter loop.
+
+The views are checked at every step, and rebuilt if something replaced one of
+them (e.g. setting ``p.grad``, ``load_state_dict`` or moving a module).
+"""
+
+import torch
+from torch._utils import _flat_view_of_dense_tensors as _flat_view
+
+
+def supported(params):
+    r"""Whether the multi-tensor path can update :attr:`params`: they all have
+    a dense gradient, and they are contiguous tensors of the same type."""
+    if len(params) == 0:
+        return False
+    first = params[0]
+    dtype, device = first.dtype, first.device
+    for p in params:
+        grad = p.grad
+        if grad is None or grad.is_sparse or not p.is_contiguous() or \
+                p.dtype != dtype or p.device != device:
+            return False
+    # a parameter listed twice can't be a view of two chunks of a buffer
+    return len(set(map(id, params))) == len(params)
+
+
+def views(flat, tensors):
+    r"""Returns views of the flat buffer :attr:`flat` shaped like each of
+    :attr:`tensors`, laid out back to back."""
+    storage = flat.storage()
+    offset = flat.storage_offset()
+    result = []
+    for t in tensors:
+        # set_ rather than a view op, so that the views are plain tensors for
+        # autograd (e.g. `p.grad.detach_()` works on them)
+        result.append(flat.new_empty(0).set_(storage, offset, t.size()))
+        offset += t.numel()
+    return result
+
+
+def _flatten(tensors):
+    r"""Copies :attr:`tensors` into a new flat buffer, and returns it along with
+    views of it shaped like each of them."""
+    flat = torch.cat([t.reshape(-1) for t in tensors])
+    return flat, views(flat, tensors)
+
+
+def flat_params(params):
+    r"""Returns a flat buffer of which the parameters :attr:`params` are views."""
+    flat = _flat_view(params)
+    if flat is None:
+        flat, chunks = _flatten(params)
+        for p, view in zip(params, chunks):
+            p.data = view
+    return flat
+
+
+def flat_grads(params):
+    r"""Returns a flat buffer of which the gradients of :attr:`params` are views."""
+    grads = [p.grad for p in params]
+    flat = _flat_view(grads)
+    if flat is None:
+        flat, chunks = _flatten(grads)
+        for p, view in zip(params, chunks):
+            p.grad = view
+    return flat
+
+
+def flat_state(states, key):
+    r"""Returns a flat buffer of which the ``key`` entries of the parameter
+    states :attr:`states` are views."""
+    buffers = [state[key] for state in states]
+    flat = _flat_view(buffers)
+    if flat is None:
+        flat, chunks = _flatten(buffers)
+        for state, view in zip(states, chunks):
+            state[key] = view
+    return flat
@@ -1,6 +1,7 @@
 import math
 import torch
 from .optimizer import Optimizer
+from . import _multi_tensor
 
 
 class Adam(Optimizer):
@@ -20,6 +21,10 @@ class Adam(Optimizer):
         amsgrad (boolean, optional): whether to use the AMSGrad variant of this
             algorithm from the paper `On the Convergence of Adam and Beyond`_
             (default: False)
+        multi_tensor (boolean, optional): whether to apply each stage of the
+            update to all the parameters of a group at once, which keeps the
+            parameters, gradients and state of the group in flat buffers
+            (default: False)
 
     .. _Adam\: A Method for Stochastic Optimization:
         https://arxiv.org/abs/1412.6980
@@ -28,7 +33,7 @@ class Adam(Optimizer):
     """
 
     def __init__(self, params, lr=1e-3, betas=(0.9, 0.999), eps=1e-8,
-                 weight_decay=0, amsgrad=False):
+                 weight_decay=0, amsgrad=False, multi_tensor=False):
         if not 0.0 <= lr:
             raise ValueError("Invalid learning rate: {}".format(lr))
         if not 0.0 <= eps:
@@ -40,13 +45,15 @@ class Adam(Optimizer):
         if not 0.0 <= weight_decay:
             raise ValueError("Invalid weight_decay value: {}".format(weight_decay))
         defaults = dict(lr=lr, betas=betas, eps=eps,
-                        weight_decay=weight_decay, amsgrad=amsgrad)
+                        weight_decay=weight_decay, amsgrad=amsgrad,
+                        multi_tensor=multi_tensor)
         super(Adam, self).__init__(params, defaults)
 
     def __setstate__(self, state):
         super(Adam, self).__setstate__(state)
         for group in self.param_groups:
             group.setdefault('amsgrad', False)
+            group.setdefault('multi_tensor', False)
 
     @torch.no_grad()
     def step(self, closure=None):
@@ -62,6 +69,8 @@ class Adam(Optimizer):
                 loss = closure()
 
         for group in self.param_groups:
+            if group['multi_tensor'] and self._multi_tensor_step(group):
+                continue
             for p in group['params']:
                 if p.grad is None:
                     continue
@@ -111,3 +120,51 @@ class Adam(Optimizer):
                 p.addcdiv_(exp_avg, denom, value=-step_size)
 
         return loss
+
+    def _multi_tensor_step(self, group):
+        # Falls back to the per-parameter loop (by returning False) unless all
+        # the parameters of the group are updated, with the same step count.
+        params = group['params']
+        if not _multi_tensor.supported(params):
+            return False
+        states = [self.state[p] for p in params]
+        if len(set(state.get('step', 0) for state in states)) != 1:
+            return False
+        amsgrad = group['amsgrad']
+
+        for p, state in zip(params, states):
+            # State initialization
+            if len(state) == 0:
+                state['step'] = 0
+                state['exp_avg'] = torch.zeros_like(p, memory_format=torch.preserve_format)
+                state['exp_avg_sq'] = torch.zeros_like(p, memory_format=torch.preserve_format)
+                if amsgrad:
+                    state['max_exp_avg_sq'] = torch.zeros_like(p, memory_format=torch.preserve_format)
+            state['step'] += 1
+
+        param = _multi_tensor.flat_params(params)
+        grad = _multi_tensor.flat_grads(params)
+        exp_avg = _multi_tensor.flat_state(states, 'exp_avg')
+        exp_avg_sq = _multi_tensor.flat_state(states, 'exp_avg_sq')
+        beta1, beta2 = group['betas']
+
+        step = states[0]['step']
+        bias_correction1 = 1 - beta1 ** step
+        bias_correction2 = 1 - beta2 ** step
+
+        if group['weight_decay'] != 0:
+            grad = grad.add(param, alpha=group['weight_decay'])
+
+        exp_avg.mul_(beta1).add_(grad, alpha=1 - beta1)
+        exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+        if amsgrad:
+            max_exp_avg_sq = _multi_tensor.flat_state(states, 'max_exp_avg_sq')
+            torch.max(max_exp_avg_sq, exp_avg_sq, out=max_exp_avg_sq)
+            denom = (max_exp_avg_sq.sqrt() / math.sqrt(bias_correction2)).add_(group['eps'])
+        else:
+            denom = (exp_avg_sq.sqrt() / math.sqrt(bias_correction2)).add_(group['eps'])
+
+        step_size = group['lr'] / bias_correction1
+
+        param.addcdiv_(exp_avg, denom, value=-step_size)
+        return True
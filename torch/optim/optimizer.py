@@ -5,6 +5,8 @@ import torch
 from copy import deepcopy
 from itertools import chain
 
+from . import _multi_tensor
+
 
 class _RequiredParameter(object):
     """Singleton class representing a required parameter for an Optimizer."""
@@ -166,6 +168,15 @@ class Optimizer(object):
     def zero_grad(self):
         r"""Clears the gradients of all optimized :class:`torch.Tensor` s."""
         for group in self.param_groups:
+            if group.get('multi_tensor', False):
+                # the gradients may all be views into a single flat buffer
+                grads = [p.grad for p in group['params'] if p.grad is not None]
+                flat = _multi_tensor._flat_view(grads) if len(grads) > 0 else None
+                if flat is not None:
+                    for grad in grads:
+                        grad.detach_()
+                    flat.zero_()
+                    continue
             for p in group['params']:
                 if p.grad is not None:
                     p.grad.detach_()
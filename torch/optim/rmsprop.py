@@ -1,5 +1,6 @@
 import torch
 from .optimizer import Optimizer
+from . import _multi_tensor
 
 
 class RMSprop(Optimizer):
@@ -28,10 +29,15 @@ class RMSprop(Optimizer):
         centered (bool, optional) : if ``True``, compute the centered RMSProp,
             the gradient is normalized by an estimation of its variance
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
+        multi_tensor (bool, optional): whether to apply each stage of the
+            update to all the parameters of a group at once, which keeps the
+            parameters, gradients and state of the group in flat buffers
+            (default: False)
 
     """
 
-    def __init__(self, params, lr=1e-2, alpha=0.99, eps=1e-8, weight_decay=0, momentum=0, centered=False):
+    def __init__(self, params, lr=1e-2, alpha=0.99, eps=1e-8, weight_decay=0, momentum=0, centered=False,
+                 multi_tensor=False):
         if not 0.0 <= lr:
             raise ValueError("Invalid learning rate: {}".format(lr))
         if not 0.0 <= eps:
@@ -43,7 +49,8 @@ class RMSprop(Optimizer):
         if not 0.0 <= alpha:
             raise ValueError("Invalid alpha value: {}".format(alpha))
 
-        defaults = dict(lr=lr, momentum=momentum, alpha=alpha, eps=eps, centered=centered, weight_decay=weight_decay)
+        defaults = dict(lr=lr, momentum=momentum, alpha=alpha, eps=eps, centered=centered, weight_decay=weight_decay,
+                        multi_tensor=multi_tensor)
         super(RMSprop, self).__init__(params, defaults)
 
     def __setstate__(self, state):
@@ -51,6 +58,7 @@ class RMSprop(Optimizer):
         for group in self.param_groups:
             group.setdefault('momentum', 0)
             group.setdefault('centered', False)
+            group.setdefault('multi_tensor', False)
 
     @torch.no_grad()
     def step(self, closure=None):
@@ -66,6 +74,8 @@ class RMSprop(Optimizer):
                 loss = closure()
 
         for group in self.param_groups:
+            if group['multi_tensor'] and self._multi_tensor_step(group):
+                continue
             for p in group['params']:
                 if p.grad is None:
                     continue
@@ -108,3 +118,46 @@ class RMSprop(Optimizer):
                     p.addcdiv_(grad, avg, value=-group['lr'])
 
         return loss
+
+    def _multi_tensor_step(self, group):
+        # Falls back to the per-parameter loop (by returning False) unless all
+        # the parameters of the group are updated.
+        params = group['params']
+        if not _multi_tensor.supported(params):
+            return False
+        states = [self.state[p] for p in params]
+        for p, state in zip(params, states):
+            # State initialization
+            if len(state) == 0:
+                state['step'] = 0
+                state['square_avg'] = torch.zeros_like(p, memory_format=torch.preserve_format)
+                if group['momentum'] > 0:
+                    state['momentum_buffer'] = torch.zeros_like(p, memory_format=torch.preserve_format)
+                if group['centered']:
+                    state['grad_avg'] = torch.zeros_like(p, memory_format=torch.preserve_format)
+            state['step'] += 1
+
+        param = _multi_tensor.flat_params(params)
+        grad = _multi_tensor.flat_grads(params)
+        square_avg = _multi_tensor.flat_state(states, 'square_avg')
+        alpha = group['alpha']
+
+        if group['weight_decay'] != 0:
+            grad = grad.add(param, alpha=group['weight_decay'])
+
+        square_avg.mul_(alpha).addcmul_(grad, grad, value=1 - alpha)
+
+        if group['centered']:
+            grad_avg = _multi_tensor.flat_state(states, 'grad_avg')
+            grad_avg.mul_(alpha).add_(grad, alpha=1 - alpha)
+            avg = square_avg.addcmul(grad_avg, grad_avg, value=-1).sqrt_().add_(group['eps'])
+        else:
+            avg = square_avg.sqrt().add_(group['eps'])
+
+        if group['momentum'] > 0:
+            buf = _multi_tensor.flat_state(states, 'momentum_buffer')
+            buf.mul_(group['momentum']).addcdiv_(grad, avg)
+            param.add_(buf, alpha=-group['lr'])
+        else:
+            param.addcdiv_(grad, avg, value=-group['lr'])
+        return True
@@ -1,5 +1,6 @@
 import torch
 from .optimizer import Optimizer, required
+from . import _multi_tensor
 
 
 class SGD(Optimizer):
@@ -16,6 +17,10 @@ class SGD(Optimizer):
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
         dampening (float, optional): dampening for momentum (default: 0)
         nesterov (bool, optional): enables Nesterov momentum (default: False)
+        multi_tensor (bool, optional): whether to apply each stage of the
+            update to all the parameters of a group at once, which keeps the
+            parameters, gradients and state of the group in flat buffers
+            (default: False)
 
     Example:
         >>> optimizer = torch.optim.SGD(model.parameters(), lr=0.1, momentum=0.9)
@@ -53,7 +58,7 @@ class SGD(Optimizer):
     """
 
     def __init__(self, params, lr=required, momentum=0, dampening=0,
-                 weight_decay=0, nesterov=False):
+                 weight_decay=0, nesterov=False, multi_tensor=False):
         if lr is not required and lr < 0.0:
             raise ValueError("Invalid learning rate: {}".format(lr))
         if momentum < 0.0:
@@ -62,7 +67,8 @@ class SGD(Optimizer):
             raise ValueError("Invalid weight_decay value: {}".format(weight_decay))
 
         defaults = dict(lr=lr, momentum=momentum, dampening=dampening,
-                        weight_decay=weight_decay, nesterov=nesterov)
+                        weight_decay=weight_decay, nesterov=nesterov,
+                        multi_tensor=multi_tensor)
         if nesterov and (momentum <= 0 or dampening != 0):
             raise ValueError("Nesterov momentum requires a momentum and zero dampening")
         super(SGD, self).__init__(params, defaults)
@@ -71,6 +77,7 @@ class SGD(Optimizer):
         super(SGD, self).__setstate__(state)
         for group in self.param_groups:
             group.setdefault('nesterov', False)
+            group.setdefault('multi_tensor', False)
 
     @torch.no_grad()
     def step(self, closure=None):
@@ -86,6 +93,8 @@ class SGD(Optimizer):
                 loss = closure()
 
         for group in self.param_groups:
+            if group['multi_tensor'] and self._multi_tensor_step(group):
+                continue
             weight_decay = group['weight_decay']
             momentum = group['momentum']
             dampening = group['dampening']
@@ -112,3 +121,40 @@ class SGD(Optimizer):
                 p.add_(d_p, alpha=-group['lr'])
 
         return loss
+
+    def _multi_tensor_step(self, group):
+        # Falls back to the per-parameter loop (by returning False) unless all
+        # the parameters of the group are updated, and either all or none of
+        # them have a momentum buffer.
+        params = group['params']
+        if not _multi_tensor.supported(params):
+            return False
+        weight_decay = group['weight_decay']
+        momentum = group['momentum']
+        dampening = group['dampening']
+        nesterov = group['nesterov']
+        if momentum != 0:
+            states = [self.state[p] for p in params]
+            has_buf = set('momentum_buffer' in state for state in states)
+            if len(has_buf) != 1:
+                return False
+
+        param = _multi_tensor.flat_params(params)
+        d_p = _multi_tensor.flat_grads(params)
+        if weight_decay != 0:
+            d_p = d_p.add(param, alpha=weight_decay)
+        if momentum != 0:
+            if not has_buf.pop():
+                buf = torch.clone(d_p).detach()
+                for state, view in zip(states, _multi_tensor.views(buf, params)):
+                    state['momentum_buffer'] = view
+            else:
+                buf = _multi_tensor.flat_state(states, 'momentum_buffer')
+                buf.mul_(momentum).add_(d_p, alpha=1 - dampening)
+            if nesterov:
+                d_p = d_p.add(buf, alpha=momentum)
+            else:
+                d_p = buf
+
+        param.add_(d_p, alpha=-group['lr'])
+        return True
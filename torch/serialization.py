@@ -8,6 +8,11 @@ import torch
 import tarfile
 import tempfile
 import warnings
+import functools
+import itertools
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing, contextmanager
 from ._utils import _import_dotted_name
 from ._six import string_classes as _string_classes
@@ -327,7 +332,8 @@ def _check_dill_version(pickle_module):
                 pickle_module.__version__
             ))
 
-def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL, _use_new_zipfile_serialization=True):
+def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL, _use_new_zipfile_serialization=True,
+         *, num_threads=1):
     """Saves an object to a disk file.
 
     See also: :ref:`recommend-saving-models`
@@ -338,6 +344,9 @@ def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL, _use_ne
            os.PathLike object containing a file name
         pickle_module: module used for pickling metadata and objects
         pickle_protocol: can be specified to override the default protocol
+        num_threads: number of threads used to copy non-CPU storages to the
+           CPU while previous storages are written. Only used by the
+           zipfile-based format. (default: ``1``)
 
     .. note::
         A common PyTorch convention is to save tensors using .pt file extension.
@@ -348,6 +357,11 @@ def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL, _use_ne
         load files in the old format. If for any reason you want ``torch.save``
         to use the old format, pass the kwarg ``_use_new_zipfile_serialization=False``.
 
+    .. note::
+        With the zipfile-based format, storages are streamed to :attr:`f` one at a
+        time, and the GIL is released while they are written. See
+        :func:`async_save` to save a checkpoint without blocking the calling thread.
+
     Example:
         >>> # Save to file
         >>> x = torch.tensor([0, 1, 2, 3, 4])
@@ -358,14 +372,73 @@ def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL, _use_ne
     """
     _check_dill_version(pickle_module)
 
+    if _use_new_zipfile_serialization and _is_path(f):
+        # Let the zip writer write to the file directly, instead of through
+        # the `write()` method of a Python file object.
+        with _open_zipfile_writer(f) as opened_zipfile:
+            _save(obj, opened_zipfile, pickle_module, pickle_protocol, num_threads)
+            return
+
     with _open_file_like(f, 'wb') as opened_file:
         if _use_new_zipfile_serialization:
             with _open_zipfile_writer(opened_file) as opened_zipfile:
-                _save(obj, opened_zipfile, pickle_module, pickle_protocol)
+                _save(obj, opened_zipfile, pickle_module, pickle_protocol, num_threads)
                 return
         _legacy_save(obj, opened_file, pickle_module, pickle_protocol)
 
 
+def async_save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL, num_threads=1):
+    """Saves an object to a disk file in the background, like :func:`save`
+    with the zipfile-based format.
+
+    :attr:`obj` is pickled, and the storages of its tensors are copied to the
+    CPU, before this function returns. Hence, :attr:`obj` can be modified
+    right away (e.g., by the next optimizer step), at the cost of holding a
+    copy of its storages in CPU memory until they are written.
+
+    Args:
+        obj: saved object
+        f: a file-like object (has to implement write and flush) or a string or
+           os.PathLike object containing a file name. A file-like object must
+           not be used until the save completes.
+        pickle_module: module used for pickling metadata and objects
+        pickle_protocol: can be specified to override the default protocol
+        num_threads: see :func:`save`
+
+    Returns:
+        A :class:`concurrent.futures.Future` completed once the file is written,
+        which raises any error that happened while writing it.
+
+    Example:
+        >>> future = torch.serialization.async_save(model.state_dict(), 'checkpoint.pt')
+        >>> # ... keep training ...
+        >>> future.result()  # wait for the checkpoint to be written
+    """
+    _check_dill_version(pickle_module)
+
+    data_value, serialized_storages = _pickle_storages(obj, pickle_module, pickle_protocol)
+    # Snapshot the storages, which may be modified as soon as we return.
+    snapshot = {}
+    for key, storage in serialized_storages.items():
+        snapshot[key] = storage.clone() if storage.device.type == 'cpu' else storage.cpu()
+    del serialized_storages
+
+    def write():
+        if _is_path(f):
+            with _open_zipfile_writer(f) as opened_zipfile:
+                _write_records(opened_zipfile, data_value, snapshot, num_threads)
+        else:
+            with _open_file_like(f, 'wb') as opened_file:
+                with _open_zipfile_writer(opened_file) as opened_zipfile:
+                    _write_records(opened_zipfile, data_value, snapshot, num_threads)
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(write)
+    # The worker thread exits once `write` is done
+    executor.shutdown(wait=False)
+    return future
+
+
 def _legacy_save(obj, f, pickle_module, pickle_protocol):
     import torch.nn as nn
     serialized_container_types = {}
@@ -437,7 +510,14 @@ def _legacy_save(obj, f, pickle_module, pickle_protocol):
         serialized_storages[key]._write_file(f, _should_read_directly(f), True)
 
 
-def _save(obj, zip_file, pickle_module, pickle_protocol):
+def _save(obj, zip_file, pickle_module, pickle_protocol, num_threads=1):
+    data_value, serialized_storages = _pickle_storages(obj, pickle_module, pickle_protocol)
+    _write_records(zip_file, data_value, serialized_storages, num_threads)
+
+
+def _pickle_storages(obj, pickle_module, pickle_protocol):
+    # Returns the pickle data for `obj`, and a dict of the storages it
+    # references, keyed by their name in the `data/` records.
     serialized_storages = {}
 
     def persistent_id(obj):
@@ -464,26 +544,44 @@ def _save(obj, zip_file, pickle_module, pickle_protocol):
     pickler = pickle_module.Pickler(data_buf, protocol=pickle_protocol)
     pickler.persistent_id = persistent_id
     pickler.dump(obj)
-    data_value = data_buf.getvalue()
-    zip_file.write_record('data.pkl', data_value, len(data_value))
+    return data_buf.getvalue(), serialized_storages
 
-    # Write each tensor to a file named tensor/the_tensor_key in the zip archive
-    for key in sorted(serialized_storages.keys()):
-        name = 'data/{}'.format(key)
-        storage = serialized_storages[key]
-        if storage.device.type == 'cpu':
-            # If it's on the CPU we can directly copy it into the zip file
-            num_bytes = storage.size() * storage.element_size()
-            zip_file.write_record(name, storage.data_ptr(), num_bytes)
-        else:
-            # Copy to a buffer, then serialize that
-            buf = io.BytesIO()
-            storage._write_file(buf, _should_read_directly(buf))
-            buf_value = buf.getvalue()
-            zip_file.write_record(name, buf_value, len(buf_value))
 
+def _write_records(zip_file, data_value, serialized_storages, num_threads=1):
+    zip_file.write_record('data.pkl', data_value, len(data_value))
 
-def load(f, map_location=None, pickle_module=pickle, **pickle_load_args):
+    def cpu_storage(key):
+        storage = serialized_storages[key]
+        return storage if storage.device.type == 'cpu' else storage.cpu()
+
+    def write_storage(key, storage):
+        # Write each tensor to a file named tensor/the_tensor_key in the zip
+        # archive, directly from the memory of its (CPU) storage
+        num_bytes = storage.size() * storage.element_size()
+        zip_file.write_record('data/{}'.format(key), storage.data_ptr(), num_bytes)
+
+    keys = sorted(serialized_storages.keys())
+    if num_threads <= 1:
+        for key in keys:
+            write_storage(key, cpu_storage(key))
+        return
+
+    # Records have to be written sequentially, so the threads copy the next
+    # storages to the CPU while the current one is written. Only a bounded
+    # number of copies are in flight to bound the extra CPU memory.
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        pending = deque()
+        keys_iter = iter(keys)
+        for key in itertools.islice(keys_iter, 2 * num_threads):
+            pending.append((key, executor.submit(cpu_storage, key)))
+        while pending:
+            key, storage_future = pending.popleft()
+            write_storage(key, storage_future.result())
+            for next_key in itertools.islice(keys_iter, 1):
+                pending.append((next_key, executor.submit(cpu_storage, next_key)))
+
+
+def load(f, map_location=None, pickle_module=pickle, *, mmap=False, **pickle_load_args):
     """Loads an object saved with :func:`torch.save` from a file.
 
     :func:`torch.load` uses Python's unpickling facilities but treats storages,
@@ -522,6 +620,10 @@ def load(f, map_location=None, pickle_module=pickle, **pickle_load_args):
             locations
         pickle_module: module used for unpickling metadata and objects (has to
             match the :attr:`pickle_module` used to serialize file)
+        mmap: if ``True``, the storages are not read into memory, but memory-mapped
+            from the file instead, and their pages are only read from disk when
+            accessed. Only supported when :attr:`f` is a file name of a file saved
+            in the zipfile-based format. (default: ``False``)
         pickle_load_args: (Python 3 only) optional keyword arguments passed over to
             :func:`pickle_module.load` and :func:`pickle_module.Unpickler`, e.g.,
             :attr:`errors=...`.
@@ -546,6 +648,11 @@ def load(f, map_location=None, pickle_module=pickle, **pickle_load_args):
         to strings using ``latin1`` encoding, and :attr:`encoding='bytes'` keeps them
         as byte arrays which can be decoded later with ``byte_array.decode(...)``.
 
+    .. note::
+        With ``mmap=True``, the file is mapped privately (copy-on-write): loading is
+        almost instant, processes mapping the same file share its pages through the
+        OS page cache, and modifying a loaded CPU tensor never changes the file.
+
     Example:
         >>> torch.load('tensors.pt')
         # Load all tensors onto the CPU
@@ -562,9 +669,14 @@ def load(f, map_location=None, pickle_module=pickle, **pickle_load_args):
         >>> torch.load(buffer)
         # Load a module with 'ascii' encoding for unpickling
         >>> torch.load('module.pt', encoding='ascii')
+        # Memory-map the tensors from the file instead of reading them
+        >>> torch.load('tensors.pt', mmap=True)
     """
     _check_dill_version(pickle_module)
 
+    if mmap and not _is_path(f):
+        raise ValueError("torch.load: mmap=True requires f to be a file name, but got {}".format(type(f)))
+
     if 'encoding' not in pickle_load_args.keys():
         pickle_load_args['encoding'] = 'utf-8'
 
@@ -581,7 +693,12 @@ def load(f, map_location=None, pickle_module=pickle, **pickle_load_args):
                                   " silence this warning)", UserWarning)
                     opened_file.seek(orig_position)
                     return torch.jit.load(opened_file)
-                return _load(opened_zipfile, map_location, pickle_module, **pickle_load_args)
+                mmap_file = str(f) if mmap else None
+                return _load(opened_zipfile, map_location, pickle_module, mmap_file, **pickle_load_args)
+        if mmap:
+            raise RuntimeError("torch.load: mmap=True is only supported for files saved with the "
+                               "zipfile-based format, i.e., with `torch.save(..., "
+                               "_use_new_zipfile_serialization=True)`")
         return _legacy_load(opened_file, map_location, pickle_module, **pickle_load_args)
 
 
@@ -810,18 +927,51 @@ def _get_restore_location(map_location):
     return restore_location
 
 
-def _load(zip_file, map_location, pickle_module, **pickle_load_args):
+def _zip_storage_loader(zip_file, map_location, mmap_file=None):
+    # Returns a function loading (once) the storage of a given key from the
+    # `data/` records of `zip_file`.
     restore_location = _get_restore_location(map_location)
 
     loaded_storages = {}
+    # map: storage type => storage of that type mapping the whole `mmap_file`
+    mapped_storages = {}
+
+    def map_record(data_type, size, name):
+        # Records are stored uncompressed, at offsets aligned to 64 bytes, so a
+        # record of any type can be sliced out of a mapping of the whole file
+        # as a storage of that type, without copying.
+        if data_type not in mapped_storages:
+            element_size = data_type().element_size()
+            mapped_storages[data_type] = data_type.from_file(
+                mmap_file, False, os.path.getsize(mmap_file) // element_size)
+        mapped = mapped_storages[data_type]
+        offset = zip_file.get_record_offset(name)
+        assert offset % mapped.element_size() == 0, \
+            "Record '{}' is not aligned in the file, it cannot be memory-mapped".format(name)
+        offset //= mapped.element_size()
+        return mapped[offset:offset + size]
 
     def load_tensor(data_type, size, key, location):
         name = 'data/{}'.format(key)
-        dtype = data_type(0).dtype
 
-        storage = zip_file.get_storage_from_record(name, size, dtype).storage()
+        if mmap_file is not None:
+            storage = map_record(data_type, size, name)
+        else:
+            dtype = data_type(0).dtype
+            storage = zip_file.get_storage_from_record(name, size, dtype).storage()
         loaded_storages[key] = restore_location(storage, location)
 
+    def load_storage(data_type, size, key, location):
+        if key not in loaded_storages:
+            load_tensor(data_type, size, key, location)
+        return loaded_storages[key]
+
+    return load_storage
+
+
+def _load(zip_file, map_location, pickle_module, mmap_file=None, **pickle_load_args):
+    load_storage = _zip_storage_loader(zip_file, map_location, mmap_file)
+
     def persistent_load(saved_id):
         assert isinstance(saved_id, tuple)
         typename = _maybe_decode_ascii(saved_id[0])
@@ -830,10 +980,7 @@ def _load(zip_file, map_location, pickle_module, **pickle_load_args):
         assert typename == 'storage', \
             "Unknown typename for persistent_load, expected 'storage' but got '{}'".format(typename)
         data_type, key, location, size = data
-        if key not in loaded_storages:
-            load_tensor(data_type, size, key, _maybe_decode_ascii(location))
-        storage = loaded_storages[key]
-        return storage
+        return load_storage(data_type, size, key, _maybe_decode_ascii(location))
 
     # Load the data (which may in turn use `persistent_load` to load tensors)
     data_file = io.BytesIO(zip_file.get_record('data.pkl'))
@@ -844,6 +991,186 @@ def _load(zip_file, map_location, pickle_module, **pickle_load_args):
     return result
 
 
+class _LazyStorage(object):
+    # Placeholder for a storage that is only read from its record when
+    # materialized.
+    def __init__(self, load_storage, data_type, size, key, location):
+        self.load_storage = load_storage
+        self.args = (data_type, size, key, location)
+
+    def materialize(self):
+        return self.load_storage(*self.args)
+
+
+class _LazyCall(object):
+    # Placeholder for a `torch._utils._rebuild_*` call whose arguments (e.g.,
+    # storages) are only materialized when needed.
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def materialize(self):
+        return self.fn(*_materialize(self.args))
+
+
+def _materialize(obj):
+    if isinstance(obj, (_LazyStorage, _LazyCall)):
+        return obj.materialize()
+    elif isinstance(obj, dict):
+        return type(obj)((k, _materialize(v)) for k, v in obj.items())
+    elif isinstance(obj, tuple) and hasattr(obj, '_fields'):  # namedtuple
+        return type(obj)(*(_materialize(v) for v in obj))
+    elif isinstance(obj, (list, tuple)):
+        return type(obj)(_materialize(v) for v in obj)
+    return obj
+
+
+class LazyStateDict(Mapping):
+    r"""A read-only mapping over a dictionary saved with :func:`torch.save`,
+    e.g. a :meth:`~torch.nn.Module.state_dict`, whose tensors are only read
+    from the file when first accessed. See :func:`lazy_load`.
+
+    Only the keys starting with :attr:`prefix` are exposed, with the prefix
+    stripped. A :class:`LazyStateDict` can be passed to
+    :meth:`~torch.nn.Module.load_state_dict`, which only reads the tensors of
+    the keys it loads.
+    """
+
+    def __init__(self, data, prefix='', cache=None, metadata=None):
+        self._data = data
+        self._prefix = prefix
+        # Materialized values, shared with the mappings derived from this one
+        self._cache = {} if cache is None else cache
+        if metadata is None:
+            metadata = getattr(data, '_metadata', None)
+            if metadata is not None and prefix:
+                # `_metadata` is keyed by module prefix, without the trailing dot
+                root_metadata = metadata.get(prefix[:-1])
+                metadata = type(metadata)(
+                    (k[len(prefix):], v) for k, v in metadata.items() if k.startswith(prefix))
+                if root_metadata is not None:
+                    metadata[''] = root_metadata
+        if metadata is not None:
+            self._metadata = metadata
+
+    def _full_key(self, key):
+        return self._prefix + key if self._prefix else key
+
+    def __getitem__(self, key):
+        full_key = self._full_key(key)
+        if full_key not in self._data:
+            raise KeyError(key)
+        if full_key not in self._cache:
+            self._cache[full_key] = _materialize(self._data[full_key])
+        return self._cache[full_key]
+
+    def __iter__(self):
+        for key in self._data:
+            if not self._prefix:
+                yield key
+            elif isinstance(key, str) and key.startswith(self._prefix):
+                yield key[len(self._prefix):]
+
+    def __len__(self):
+        if not self._prefix:
+            return len(self._data)
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        return self._full_key(key) in self._data
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, list(self))
+
+    def copy(self):
+        return LazyStateDict(self._data, self._prefix, self._cache, getattr(self, '_metadata', None))
+
+    def with_prefix(self, prefix):
+        r"""Returns a :class:`LazyStateDict` of the keys of this one starting
+        with :attr:`prefix`, with the prefix stripped."""
+        return LazyStateDict(self._data, self._prefix + prefix, self._cache)
+
+
+def lazy_load(f, map_location=None, pickle_module=pickle, prefix='', *, mmap=False, **pickle_load_args):
+    r"""Loads a dictionary saved with :func:`torch.save` as a
+    :class:`LazyStateDict`, whose tensors are only read from the file when
+    first accessed.
+
+    Only the structure of the dictionary is unpickled upfront, so loading a
+    few tensors of a large checkpoint only reads the bytes of those tensors.
+    The file has to be in the zipfile-based format, and stay readable as long
+    as the returned mapping is used.
+
+    Args:
+        f: a file-like object (has to implement :meth:`read`, :meth`readline`, :meth`tell`, and :meth`seek`),
+            or a string or os.PathLike object containing a file name
+        map_location: same as in :func:`torch.load`
+        pickle_module: same as in :func:`torch.load`
+        prefix: if not empty, only the keys starting with :attr:`prefix` are
+            exposed, with the prefix stripped
+        mmap: same as in :func:`torch.load`
+        pickle_load_args: same as in :func:`torch.load`
+
+    Example:
+        >>> state_dict = torch.serialization.lazy_load('model.pt')
+        >>> state_dict['fc.weight']  # only reads this tensor
+        # Only reads the tensors of `model.encoder`
+        >>> model.encoder.load_state_dict(torch.serialization.lazy_load('model.pt', prefix='encoder.'))
+    """
+    _check_dill_version(pickle_module)
+
+    if 'encoding' not in pickle_load_args.keys():
+        pickle_load_args['encoding'] = 'utf-8'
+
+    if _is_path(f):
+        with open(f, 'rb') as opened_file:
+            is_zipfile = _is_zipfile(opened_file)
+        name_or_buffer = str(f)
+    else:
+        if mmap:
+            raise ValueError("lazy_load: mmap=True requires f to be a file name, but got {}".format(type(f)))
+        _check_seekable(f)
+        is_zipfile = _is_zipfile(f)
+        name_or_buffer = f
+    if not is_zipfile:
+        raise RuntimeError("lazy_load is only supported for files saved with the zipfile-based "
+                           "format, i.e., with `torch.save(..., _use_new_zipfile_serialization=True)`")
+
+    # The reader is kept alive by `load_storage`, which the returned mapping
+    # references through its lazy values.
+    zip_file = torch._C.PyTorchFileReader(name_or_buffer)
+    load_storage = _zip_storage_loader(zip_file, map_location, str(f) if mmap else None)
+
+    def persistent_load(saved_id):
+        assert isinstance(saved_id, tuple)
+        typename = _maybe_decode_ascii(saved_id[0])
+        data = saved_id[1:]
+
+        assert typename == 'storage', \
+            "Unknown typename for persistent_load, expected 'storage' but got '{}'".format(typename)
+        data_type, key, location, size = data
+        return _LazyStorage(load_storage, data_type, size, key, _maybe_decode_ascii(location))
+
+    class LazyUnpickler(pickle_module.Unpickler):
+        def find_class(self, mod_name, name):
+            fn = super(LazyUnpickler, self).find_class(mod_name, name)
+            # The `_rebuild_*` functions are the ones that consume storages
+            # (or tensors built from them), so defer them until materialized.
+            if mod_name == 'torch._utils' and name.startswith('_rebuild_'):
+                return functools.partial(_LazyCall, fn)
+            return fn
+
+    data_file = io.BytesIO(zip_file.get_record('data.pkl'))
+    unpickler = LazyUnpickler(data_file, **pickle_load_args)
+    unpickler.persistent_load = persistent_load
+    result = unpickler.load()
+
+    if not isinstance(result, Mapping):
+        raise RuntimeError("lazy_load expects a dictionary to be saved in the file, but got {}. "
+                           "Use torch.load instead.".format(type(result)))
+    return LazyStateDict(result, prefix)
+
+
 def _is_torchscript_zip(zip_file):
     for file_name in zip_file.get_all_records():
         parts = file_name.split(os.sep)
@@ -1,4 +1,6 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
+import collections
+import time
 import torch
 import warnings
 
@@ -226,3 +228,213 @@ def checkpoint_sequential(functions, segments, input, **kwargs):
         input = checkpoint(run_function(start, end, functions), input,
                            preserve_rng_state=preserve)
     return run_function(end + 1, len(functions) - 1, functions)(input)
+
+
+ModuleProfile = collections.namedtuple(
+    'ModuleProfile', ['activation_bytes', 'output_bytes', 'forward_time'])
+ModuleProfile.__doc__ = r"""Cost of a module of a sequential model on a sample
+input: the memory it keeps allocated until backward (its output and the
+tensors it saves for backward) when run with gradients, in bytes, the size of
+its output, in bytes, and the time of its forward pass, in seconds."""
+
+CheckpointPlan = collections.namedtuple(
+    'CheckpointPlan', ['checkpointed', 'memory_bytes', 'recompute_time', 'profiles'])
+CheckpointPlan.__doc__ = r"""Plan returned by :func:`plan_checkpoint_sequential`:
+whether each module is checkpointed, the estimated peak memory of activations
+kept for backward, in bytes, the estimated forward time spent recomputing
+checkpointed modules, in seconds, and the :class:`ModuleProfile` of each
+module."""
+
+
+def _tensors_bytes(obj):
+    if isinstance(obj, torch.Tensor):
+        return obj.numel() * obj.element_size()
+    if isinstance(obj, (tuple, list)):
+        return sum(_tensors_bytes(o) for o in obj)
+    return 0
+
+
+def _synchronize(input):
+    if isinstance(input, torch.Tensor) and input.is_cuda:
+        torch.cuda.synchronize(input.device)
+
+
+def _detach_sample(tensor):
+    # Only floating point tensors can require grad, e.g. not the token ids
+    # taken by an embedding.
+    tensor = tensor.detach()
+    if tensor.is_floating_point():
+        tensor.requires_grad_()
+    return tensor
+
+
+def _save_buffers(function):
+    if not isinstance(function, torch.nn.Module):
+        return []
+    return [(buf, buf.clone()) for buf in function.buffers()]
+
+
+def _restore_buffers(saved):
+    with torch.no_grad():
+        for buf, value in saved:
+            buf.copy_(value)
+
+
+def profile_sequential(functions, input):
+    r"""Profiles each module of a sequential model on a sample input.
+
+    Every module is run with gradients twice: once under the autograd profiler
+    with ``profile_memory=True``, to measure the memory it keeps allocated, and
+    once to time its forward pass. The buffers of the modules (e.g. the running
+    stats of batch norm) and the random number generator states are restored
+    afterwards, so profiling doesn't change the model.
+
+    Args:
+        functions: A :class:`torch.nn.Sequential` or the list of modules or
+            functions (comprising the model) to run sequentially.
+        input: A sample Tensor input to :attr:`functions`
+
+    Returns:
+        A list with the :class:`ModuleProfile` of each module.
+    """
+    if isinstance(functions, torch.nn.Sequential):
+        functions = list(functions.children())
+    profiles = []
+    devices = [input.get_device()] if input.is_cuda else []
+    with torch.random.fork_rng(devices=devices), torch.enable_grad():
+        input = _detach_sample(input)
+        for function in functions:
+            buffers = _save_buffers(function)
+            with torch.autograd.profiler.profile(profile_memory=True) as prof:
+                output = function(input)
+            total = prof.total_average()
+            output_bytes = _tensors_bytes(output)
+            # The memory still allocated after the forward pass is the output
+            # and whatever the module saved for backward.
+            activation_bytes = max(
+                total.self_cpu_memory_usage + total.self_cuda_memory_usage, output_bytes)
+            del output
+            _restore_buffers(buffers)
+
+            _synchronize(input)
+            start = time.perf_counter()
+            output = function(input)
+            _synchronize(input)
+            forward_time = time.perf_counter() - start
+            _restore_buffers(buffers)
+
+            profiles.append(ModuleProfile(activation_bytes, output_bytes, forward_time))
+            input = _detach_sample(output)
+    return profiles
+
+
+def _plan_memory(profiles, checkpointed):
+    # A module that isn't checkpointed keeps its activations, and a
+    # checkpointed one only its output (the input of the next module).
+    # Recomputing a checkpointed module in backward temporarily takes its
+    # activations back.
+    memory = 0
+    recompute_peak = 0
+    for profile, ckpt in zip(profiles, checkpointed):
+        if ckpt:
+            memory += profile.output_bytes
+            recompute_peak = max(recompute_peak, profile.activation_bytes - profile.output_bytes)
+        else:
+            memory += profile.activation_bytes
+    return memory + recompute_peak
+
+
+def plan_checkpoint_sequential(functions, input, memory_budget):
+    r"""Chooses which modules of a sequential model to checkpoint so that the
+    activations kept for backward fit in :attr:`memory_budget`, with as little
+    recomputation as possible.
+
+    The modules are profiled on the sample :attr:`input` with
+    :func:`profile_sequential`. Modules are then checkpointed greedily, the
+    ones that free the most memory per second of recomputation first, until
+    the estimated peak memory of activations fits in the budget, and the
+    checkpointed modules that are not needed anymore to fit it are dropped,
+    the slowest first. The estimate accounts for the activations of a
+    checkpointed module being recomputed in backward. Use
+    :func:`checkpoint_sequential_plan` to run the model with the plan.
+
+    Args:
+        functions: A :class:`torch.nn.Sequential` or the list of modules or
+            functions (comprising the model) to run sequentially.
+        input: A sample Tensor input to :attr:`functions`, with the size of the
+            inputs the plan will be used with.
+        memory_budget (int): memory available for activations, in bytes.
+
+    Returns:
+        A :class:`CheckpointPlan`. If the budget can't be met, a warning is
+        raised and every module whose activations are larger than its output
+        is checkpointed.
+
+    Example:
+        >>> plan = plan_checkpoint_sequential(model, sample_input, 2 * 1024 ** 3)
+        >>> output = checkpoint_sequential_plan(model, plan, input_var)
+    """
+    profiles = profile_sequential(functions, input)
+    n = len(profiles)
+    checkpointed = [False] * n
+
+    def savings(i):
+        return profiles[i].activation_bytes - profiles[i].output_bytes
+
+    candidates = sorted((i for i in range(n) if savings(i) > 0),
+                        key=lambda i: profiles[i].forward_time / savings(i))
+    for i in candidates:
+        if _plan_memory(profiles, checkpointed) <= memory_budget:
+            break
+        checkpointed[i] = True
+    memory = _plan_memory(profiles, checkpointed)
+    if memory > memory_budget:
+        # Every module that frees memory is checkpointed, checkpointing the
+        # others would only add recomputation.
+        warnings.warn("Activations don't fit in the memory budget of {} bytes even when "
+                      "checkpointing every module that frees memory, estimated peak is "
+                      "{} bytes.".format(memory_budget, memory))
+    else:
+        for i in sorted(candidates, key=lambda i: -profiles[i].forward_time):
+            if checkpointed[i]:
+                checkpointed[i] = False
+                if _plan_memory(profiles, checkpointed) > memory_budget:
+                    checkpointed[i] = True
+
+    recompute_time = sum(p.forward_time for p, ckpt in zip(profiles, checkpointed) if ckpt)
+    return CheckpointPlan(tuple(checkpointed), _plan_memory(profiles, checkpointed),
+                          recompute_time, profiles)
+
+
+def checkpoint_sequential_plan(functions, plan, input, **kwargs):
+    r"""Runs a sequential model, checkpointing the modules chosen by a
+    :class:`CheckpointPlan` from :func:`plan_checkpoint_sequential`.
+
+    See :func:`~torch.utils.checkpoint.checkpoint` on how checkpointing works.
+
+    Args:
+        functions: A :class:`torch.nn.Sequential` or the list of modules or
+            functions (comprising the model) to run sequentially.
+        plan (CheckpointPlan): which modules to checkpoint
+        input: A Tensor that is input to :attr:`functions`
+        preserve_rng_state(bool, optional, default=True):  Omit stashing and restoring
+            the RNG state during each checkpoint.
+
+    Returns:
+        Output of running :attr:`functions` sequentially on :attr:`*inputs`
+    """
+    preserve = kwargs.pop('preserve_rng_state', True)
+    if kwargs:
+        raise ValueError("Unexpected keyword arguments: " + ",".join(arg for arg in kwargs))
+
+    if isinstance(functions, torch.nn.Sequential):
+        functions = list(functions.children())
+    if len(functions) != len(plan.checkpointed):
+        raise ValueError("The plan is for {} modules, but got {} modules"
+                         .format(len(plan.checkpointed), len(functions)))
+    for function, ckpt in zip(functions, plan.checkpointed):
+        if ckpt:
+            input = checkpoint(function, input, preserve_rng_state=preserve)
+        else:
+            input = function(input)
+    return input
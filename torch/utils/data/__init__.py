@@ -1,4 +1,5 @@
-from .sampler import Sampler, SequentialSampler, RandomSampler, SubsetRandomSampler, WeightedRandomSampler, BatchSampler
-from .distributed import DistributedSampler
+from .sampler import Sampler, SequentialSampler, RandomSampler, SubsetRandomSampler, WeightedRandomSampler, BatchSampler, \
+    BucketBatchSampler
+from .distributed import DistributedSampler, DistributedBucketBatchSampler
 from .dataset import Dataset, IterableDataset, TensorDataset, ConcatDataset, ChainDataset, Subset, random_split
 from .dataloader import DataLoader, _DatasetKind, get_worker_info
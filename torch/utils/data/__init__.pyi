@@ -1,6 +1,8 @@
 from .sampler import Sampler as Sampler, SequentialSampler as SequentialSampler, RandomSampler as RandomSampler, \
-    SubsetRandomSampler as SubsetRandomSampler, WeightedRandomSampler as WeightedRandomSampler, BatchSampler as BatchSampler
-from .distributed import DistributedSampler as DistributedSampler
+    SubsetRandomSampler as SubsetRandomSampler, WeightedRandomSampler as WeightedRandomSampler, BatchSampler as BatchSampler, \
+    BucketBatchSampler as BucketBatchSampler
+from .distributed import DistributedSampler as DistributedSampler, \
+    DistributedBucketBatchSampler as DistributedBucketBatchSampler
 from .dataset import Dataset as Dataset, TensorDataset as TensorDataset, ConcatDataset as ConcatDataset, \
     Subset as Subset, random_split as random_split, IterableDataset as IterableDataset, \
     ChainDataset as ChainDataset
@@ -50,7 +50,12 @@ def default_collate(batch):
             # If we're in a background process, concatenate directly into a
             # shared memory tensor to avoid an extra copy
             numel = sum([x.numel() for x in batch])
-            storage = elem.storage()._new_shared(numel)
+            arena = torch.utils.data._utils.worker._shared_memory_arena
+            if arena is not None:
+                # Reuse a buffer released by the main process if possible
+                storage = arena.new_shared(elem.storage(), numel)
+            else:
+                storage = elem.storage()._new_shared(numel)
             out = elem.new(storage)
         return torch.stack(batch, 0, out=out)
     elif elem_type.__module__ == 'numpy' and elem_type.__name__ != 'str_' \
@@ -3,6 +3,8 @@ data from an iterable-style or map-style dataset. This logic is shared in both
 single- and multi-processing data loading.
 """
 
+from ..dataset import _getitems
+
 
 class _BaseDatasetFetcher(object):
     def __init__(self, dataset, auto_collation, collate_fn, drop_last):
@@ -41,7 +43,9 @@ class _MapDatasetFetcher(_BaseDatasetFetcher):
 
     def fetch(self, possibly_batched_index):
         if self.auto_collation:
-            data = [self.dataset[idx] for idx in possibly_batched_index]
+            # Datasets may provide a batched `__getitems__` that fetches all
+            # samples of a batch at once (e.g., with one indexing op).
+            data = _getitems(self.dataset, possibly_batched_index)
         else:
             data = self.dataset[possibly_batched_index]
         return self.collate_fn(data)
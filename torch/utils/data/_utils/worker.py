@@ -55,6 +55,7 @@ else:
             return not self.manager_dead
 
 _worker_info = None
+_shared_memory_arena = None
 
 
 class WorkerInfo(object):
@@ -111,9 +112,77 @@ r"""Dummy class used to signal the end of an IterableDataset"""
 _IterableDatasetStopIteration = namedtuple('_IterableDatasetStopIteration', ['worker_id'])
 
 
+class _ResumeIteration(object):
+    r"""Dummy class used to resume the fetching when worker reuse is enabled"""
+    pass
+
+
+r"""Message sent by the main process to signal that it no longer holds the
+batches of the given (epoch, task idx) keys, so that the shared memory
+buffers they were collated into can be reused"""
+_ReleaseSharedMemory = namedtuple('_ReleaseSharedMemory', ['keys'])
+
+
+class _SharedMemoryArena(object):
+    r"""A pool of shared memory storages that :func:`default_collate` stacks
+    batches into in a worker process.
+
+    Each storage handed out while fetching a task is recorded under the
+    ``(epoch, task idx)`` key of that task, and goes back to the free list
+    once the main process sends a :class:`_ReleaseSharedMemory` for that key.
+    At most :attr:`max_slots` storages are recycled; past that, storages are
+    allocated (and freed) per batch as usual.
+    """
+
+    def __init__(self, max_slots):
+        self.max_slots = max_slots
+        self.num_slots = 0
+        self.epoch = 0
+        self._free = []
+        self._used = {}
+        self._current = None
+
+    def begin_task(self, idx):
+        self._current = []
+        self._used[(self.epoch, idx)] = self._current
+
+    def end_task(self):
+        self._current = None
+
+    def release(self, keys):
+        for key in keys:
+            self._free.extend(self._used.pop(key, ()))
+
+    def new_shared(self, storage, numel):
+        r"""Returns a shared storage of the same type as :attr:`storage`, and
+        with at least :attr:`numel` elements."""
+        if self._current is None:
+            # not collating inside of a task, e.g., in `worker_init_fn`
+            return storage._new_shared(numel)
+        best = None
+        for i, s in enumerate(self._free):
+            if type(s) is type(storage) and s.size() >= numel and \
+                    (best is None or s.size() < self._free[best].size()):
+                best = i
+        if best is not None:
+            shared = self._free.pop(best)
+        else:
+            if self.num_slots >= self.max_slots:
+                if not self._free:
+                    # All slots are held by the main process.
+                    return storage._new_shared(numel)
+                # Evict a free storage that can't fit this batch.
+                self._free.pop(0)
+                self.num_slots -= 1
+            shared = storage._new_shared(numel)
+            self.num_slots += 1
+        self._current.append(shared)
+        return shared
+
+
 def _worker_loop(dataset_kind, dataset, index_queue, data_queue, done_event,
                  auto_collation, collate_fn, drop_last, seed, init_fn, worker_id,
-                 num_workers):
+                 num_workers, shared_memory_arena_size=0):
     # See NOTE [ Data Loader Multiprocessing Shutdown Logic ] for details on the
     # logic of this function.
 
@@ -133,6 +202,10 @@ def _worker_loop(dataset_kind, dataset, index_queue, data_queue, done_event,
         _worker_info = WorkerInfo(id=worker_id, num_workers=num_workers,
                                   seed=seed, dataset=dataset)
 
+        global _shared_memory_arena
+        if shared_memory_arena_size > 0:
+            _shared_memory_arena = _SharedMemoryArena(shared_memory_arena_size)
+
         from torch.utils.data import _DatasetKind
 
         init_exception = None
@@ -167,7 +240,21 @@ def _worker_loop(dataset_kind, dataset, index_queue, data_queue, done_event,
                 r = index_queue.get(timeout=MP_STATUS_CHECK_INTERVAL)
             except queue.Empty:
                 continue
-            if r is None:
+            if isinstance(r, _ResumeIteration):
+                # Acknowledge the main process
+                data_queue.put((r, None))
+                iteration_end = False
+                # Recreate the fetcher for worker-reuse policy
+                fetcher = _DatasetKind.create_fetcher(
+                    dataset_kind, dataset, auto_collation, collate_fn, drop_last)
+                if _shared_memory_arena is not None:
+                    _shared_memory_arena.epoch += 1
+                continue
+            elif isinstance(r, _ReleaseSharedMemory):
+                if _shared_memory_arena is not None:
+                    _shared_memory_arena.release(r.keys)
+                continue
+            elif r is None:
                 # Received the final signal
                 assert done_event.is_set() or iteration_end
                 break
@@ -181,6 +268,8 @@ def _worker_loop(dataset_kind, dataset, index_queue, data_queue, done_event,
                 data = init_exception
                 init_exception = None
             else:
+                if _shared_memory_arena is not None:
+                    _shared_memory_arena.begin_task(idx)
                 try:
                     data = fetcher.fetch(index)
                 except Exception as e:
@@ -196,6 +285,9 @@ def _worker_loop(dataset_kind, dataset, index_queue, data_queue, done_event,
                         # See NOTE [ Python Traceback Reference Cycle Problem ]
                         data = ExceptionWrapper(
                             where="in DataLoader worker process {}".format(worker_id))
+                finally:
+                    if _shared_memory_arena is not None:
+                        _shared_memory_arena.end_task()
             data_queue.put((idx, data))
             del data, idx, index, r  # save memory
     except KeyboardInterrupt:
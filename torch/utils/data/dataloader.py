@@ -8,12 +8,14 @@ in `./_utils/worker.py`.
 import threading
 import itertools
 import warnings
+import time
 
 import multiprocessing as python_multiprocessing
 import torch
 import torch.multiprocessing as multiprocessing
 from torch._utils import ExceptionWrapper
-from torch._six import queue, string_classes
+from torch._six import queue, string_classes, container_abcs
+from torch.multiprocessing.reductions import StorageWeakRef
 
 from . import IterableDataset, Sampler, SequentialSampler, RandomSampler, BatchSampler
 from . import _utils
@@ -100,6 +102,25 @@ class DataLoader(object):
         worker_init_fn (callable, optional): If not ``None``, this will be called on each
             worker subprocess with the worker id (an int in ``[0, num_workers - 1]``) as
             input, after seeding and before data loading. (default: ``None``)
+        prefetch_factor (int, optional, keyword-only arg): Number of batches loaded
+            in advance by each worker. ``2`` means there will be a total of
+            2 * num_workers batches prefetched across all workers. (default: ``2``)
+        adaptive_prefetch (bool, optional, keyword-only arg): If ``True``, the number
+            of batches loaded in advance by each worker starts at :attr:`prefetch_factor`
+            and is then adjusted during iteration: it grows when the consumer spends a
+            significant time waiting for workers, and shrinks when data is always
+            ready ahead of time. (default: ``False``)
+        shared_memory_arena_size (int, optional, keyword-only arg): If positive, each
+            worker keeps up to this many shared memory buffers that
+            :func:`~torch.utils.data.default_collate` stacks batches into, and reuses
+            them once the main process no longer references the batches they hold,
+            instead of allocating new shared memory for every batch. Each tensor
+            field of a batch uses one buffer, so this should be at least the number
+            of tensor fields times the number of batches alive at once per worker.
+            Not supported with :attr:`pin_memory`. (default: ``0``)
+        persistent_workers (bool, optional): If ``True``, the data loader will not shutdown
+            the worker processes after a dataset has been consumed once. This allows to
+            maintain the workers `Dataset` instances alive. (default: ``False``)
 
 
     .. warning:: If the ``spawn`` start method is used, :attr:`worker_init_fn`
@@ -132,7 +153,8 @@ class DataLoader(object):
                  batch_sampler=None, num_workers=0, collate_fn=None,
                  pin_memory=False, drop_last=False, timeout=0,
                  worker_init_fn=None, multiprocessing_context=None,
-                 generator=None):
+                 generator=None, persistent_workers=False, *, prefetch_factor=2,
+                 adaptive_prefetch=False, shared_memory_arena_size=0):
         torch._C._log_api_usage_once("python.data_loader")
 
         if num_workers < 0:
@@ -142,8 +164,31 @@ class DataLoader(object):
         if timeout < 0:
             raise ValueError('timeout option should be non-negative')
 
+        if num_workers == 0 and prefetch_factor != 2:
+            raise ValueError('prefetch_factor option could only be specified in multiprocessing. '
+                             'let num_workers > 0 to enable multiprocessing.')
+        if prefetch_factor <= 0:
+            raise ValueError('prefetch_factor option should be positive')
+        if num_workers == 0 and adaptive_prefetch:
+            raise ValueError('adaptive_prefetch option needs num_workers > 0')
+
+        if persistent_workers and num_workers == 0:
+            raise ValueError('persistent_workers option needs num_workers > 0')
+
+        if shared_memory_arena_size < 0:
+            raise ValueError('shared_memory_arena_size option should be non-negative')
+        if shared_memory_arena_size > 0:
+            if num_workers == 0:
+                raise ValueError('shared_memory_arena_size option needs num_workers > 0')
+            if pin_memory:
+                raise ValueError('shared_memory_arena_size option is mutually exclusive '
+                                 'with pin_memory')
+
         self.dataset = dataset
         self.num_workers = num_workers
+        self.prefetch_factor = prefetch_factor
+        self.adaptive_prefetch = adaptive_prefetch
+        self.shared_memory_arena_size = shared_memory_arena_size
         self.pin_memory = pin_memory
         self.timeout = timeout
         self.worker_init_fn = worker_init_fn
@@ -242,9 +287,13 @@ class DataLoader(object):
                 collate_fn = _utils.collate.default_convert
 
         self.collate_fn = collate_fn
+        self.persistent_workers = persistent_workers
+
         self.__initialized = True
         self._IterableDataset_len_called = None  # See NOTE [ IterableDataset and __len__ ]
 
+        self._iterator = None
+
     @property
     def multiprocessing_context(self):
         return self.__multiprocessing_context
@@ -284,12 +333,27 @@ class DataLoader(object):
 
         super(DataLoader, self).__setattr__(attr, val)
 
-    def __iter__(self):
+    def _get_iterator(self):
         if self.num_workers == 0:
             return _SingleProcessDataLoaderIter(self)
         else:
             return _MultiProcessingDataLoaderIter(self)
 
+    def __iter__(self):
+        # When using a single worker the returned iterator should be
+        # created everytime to avoid reseting its state.
+        # However, in the case of a multiple workers iterator with
+        # `persistent_workers=True`, the iterator is only created once in the
+        # lifetime of the DataLoader object so that workers can be reused.
+        if self.persistent_workers and self.num_workers > 0:
+            if self._iterator is None:
+                self._iterator = self._get_iterator()
+            else:
+                self._iterator._reset(self)
+            return self._iterator
+        else:
+            return self._get_iterator()
+
     @property
     def _auto_collation(self):
         return self.batch_sampler is not None
@@ -334,6 +398,24 @@ class DataLoader(object):
             return len(self._index_sampler)
 
 
+def _shared_storages(data):
+    r"""Yields the shared memory storages of the tensors in :attr:`data`."""
+    if isinstance(data, torch.Tensor):
+        storage = data.storage()
+        if storage.is_shared():
+            yield storage
+    elif isinstance(data, string_classes):
+        return
+    elif isinstance(data, container_abcs.Mapping):
+        for v in data.values():
+            for storage in _shared_storages(v):
+                yield storage
+    elif isinstance(data, container_abcs.Sequence):
+        for v in data:
+            for storage in _shared_storages(v):
+                yield storage
+
+
 class _BaseDataLoaderIter(object):
     def __init__(self, loader):
         self._dataset = loader.dataset
@@ -348,11 +430,17 @@ class _BaseDataLoaderIter(object):
         self._collate_fn = loader.collate_fn
         self._sampler_iter = iter(self._index_sampler)
         self._base_seed = torch.empty((), dtype=torch.int64).random_(generator=loader.generator).item()
+        self._persistent_workers = loader.persistent_workers
         self._num_yielded = 0
 
     def __iter__(self):
         return self
 
+    def _reset(self, loader, first_iter=False):
+        self._sampler_iter = iter(self._index_sampler)
+        self._num_yielded = 0
+        self._IterableDataset_len_called = loader._IterableDataset_len_called
+
     def _next_index(self):
         return next(self._sampler_iter)  # may raise StopIteration
 
@@ -687,10 +775,35 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
     #     processing indices already in `index_queue` if we are already shutting
     #     down.
 
+    # Parameters of the adaptive prefetching. See `_adapt_prefetch_factor`.
+    _ADAPTIVE_PREFETCH_MAX_FACTOR = 16
+    _ADAPTIVE_PREFETCH_GROW_THRESHOLD = 0.1
+    _ADAPTIVE_PREFETCH_SHRINK_THRESHOLD = 0.01
+    _ADAPTIVE_PREFETCH_SHRINK_ROUNDS = 4
+
     def __init__(self, loader):
         super(_MultiProcessingDataLoaderIter, self).__init__(loader)
 
         assert self._num_workers > 0
+        assert loader.prefetch_factor > 0
+
+        # Number of tasks outstanding per worker. This is constant unless
+        # `_adaptive_prefetch` is set, in which case it is kept across epochs
+        # when using persistent workers.
+        self._prefetch_factor = loader.prefetch_factor
+        self._adaptive_prefetch = loader.adaptive_prefetch
+        if self._adaptive_prefetch:
+            self._max_prefetch_factor = max(self._prefetch_factor, self._ADAPTIVE_PREFETCH_MAX_FACTOR)
+            self._wait_time = 0.  # time spent by the consumer waiting for data in this round
+            self._latency_time = 0.  # total latency of the tasks received in this round
+            self._num_latency = 0  # number of the tasks received in this round
+            self._round_batches = 0  # number of batches yielded in this round
+            self._idle_rounds = 0  # number of consecutive rounds without significant waiting
+
+        # See NOTE [ Shared Memory Arena ]
+        self._shared_memory_arena_size = loader.shared_memory_arena_size
+        self._epoch = 0  # number of `_reset`s, used to key batches across epochs
+        self._shared_memory_batches = []  # list of (worker_id, (epoch, task idx), [StorageWeakRef])
 
         if loader.multiprocessing_context is None:
             multiprocessing_context = multiprocessing
@@ -698,17 +811,9 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
             multiprocessing_context = loader.multiprocessing_context
 
         self._worker_init_fn = loader.worker_init_fn
-        self._worker_queue_idx_cycle = itertools.cycle(range(self._num_workers))
         self._worker_result_queue = multiprocessing_context.Queue()
         self._worker_pids_set = False
         self._shutdown = False
-        self._send_idx = 0  # idx of the next task to be sent to workers
-        self._rcvd_idx = 0  # idx of the next task to be returned in __next__
-        # information about data not yet yielded, i.e., tasks w/ indices in range [rcvd_idx, send_idx).
-        # map: task idx => - (worker_id,)        if data isn't fetched (outstanding)
-        #                  \ (worker_id, data)   if data is already fetched (out-of-order)
-        self._task_info = {}
-        self._tasks_outstanding = 0  # always equal to count(v for v in task_info.values() if len(v) == 1)
         self._workers_done_event = multiprocessing_context.Event()
 
         self._index_queues = []
@@ -726,7 +831,8 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
                 args=(self._dataset_kind, self._dataset, index_queue,
                       self._worker_result_queue, self._workers_done_event,
                       self._auto_collation, self._collate_fn, self._drop_last,
-                      self._base_seed + i, self._worker_init_fn, i, self._num_workers))
+                      self._base_seed + i, self._worker_init_fn, i, self._num_workers,
+                      self._shared_memory_arena_size))
             w.daemon = True
             # NB: Process.start() actually take some time as it needs to
             #     start a process and pass the arguments over via a pipe.
@@ -758,9 +864,54 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
         _utils.signal_handling._set_worker_pids(id(self), tuple(w.pid for w in self._workers))
         _utils.signal_handling._set_SIGCHLD_handler()
         self._worker_pids_set = True
-
+        self._reset(loader, first_iter=True)
+
+    def _reset(self, loader, first_iter=False):
+        super(_MultiProcessingDataLoaderIter, self)._reset(loader, first_iter)
+        if not first_iter and self._shared_memory_arena_size > 0:
+            # Tasks of the previous epoch that were never yielded, whose
+            # shared memory can be reused once they are dropped below.
+            stale_keys = [[] for _ in range(self._num_workers)]
+            for idx, info in self._task_info.items():
+                stale_keys[info[0]].append((self._epoch, idx))
+        self._worker_queue_idx_cycle = itertools.cycle(range(self._num_workers))
+        self._send_idx = 0  # idx of the next task to be sent to workers
+        self._rcvd_idx = 0  # idx of the next task to be returned in __next__
+        # information about data not yet yielded, i.e., tasks w/ indices in range [rcvd_idx, send_idx).
+        # map: task idx => - (worker_id,)        if data isn't fetched (outstanding)
+        #                  \ (worker_id, data)   if data is already fetched (out-of-order)
+        self._task_info = {}
+        self._tasks_outstanding = 0  # always equal to count(v for v in task_info.values() if len(v) == 1)
+        # A list of booleans representing whether each worker still has work to
+        # do, i.e., not having exhausted its iterable dataset object. It always
+        # contains all `True`s if not using an iterable-style dataset
+        # (i.e., if kind != Iterable).
+        # Note that this indicates that a worker still has work to do *for this epoch*.
+        # It does not mean that a worker is dead. In case of `_persistent_workers`,
+        # the worker will be reset to available in the next epoch.
+        self._workers_status = [True for i in range(self._num_workers)]
+        if self._adaptive_prefetch:
+            self._task_send_time = {}  # map: task idx => time it was sent to a worker
+        # We resume the prefetching in case it was enabled
+        if not first_iter:
+            # Ask every persistent worker to start a new epoch, and drop any
+            # stale result of the previous one (e.g., if it was not fully
+            # consumed) until all workers have acknowledged.
+            for idx in range(self._num_workers):
+                self._index_queues[idx].put(_utils.worker._ResumeIteration())
+            resume_iteration_cnt = self._num_workers
+            while resume_iteration_cnt > 0:
+                return_idx, return_data = self._get_data()
+                if isinstance(return_idx, _utils.worker._ResumeIteration):
+                    assert return_data is None
+                    resume_iteration_cnt -= 1
+            if self._shared_memory_arena_size > 0:
+                for worker_id, keys in enumerate(stale_keys):
+                    if keys:
+                        self._index_queues[worker_id].put(_utils.worker._ReleaseSharedMemory(keys))
+                self._epoch += 1
         # prime the prefetch loop
-        for _ in range(2 * self._num_workers):
+        for _ in range(self._prefetch_factor * self._num_workers):
             self._try_put_index()
 
     def _try_get_data(self, timeout=_utils.MP_STATUS_CHECK_INTERVAL):
@@ -960,24 +1111,39 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
                 self._rcvd_idx += 1
             else:
                 # no valid `self._rcvd_idx` is found (i.e., didn't break)
-                self._shutdown_workers()
+                if not self._persistent_workers:
+                    self._shutdown_workers()
                 raise StopIteration
 
             # Now `self._rcvd_idx` is the batch index we want to fetch
 
             # Check if the next sample has already been generated
             if len(self._task_info[self._rcvd_idx]) == 2:
-                data = self._task_info.pop(self._rcvd_idx)[1]
+                worker_id, data = self._task_info.pop(self._rcvd_idx)
+                if self._shared_memory_arena_size > 0:
+                    self._track_shared_memory(worker_id, data)
                 return self._process_data(data)
 
             assert not self._shutdown and self._tasks_outstanding > 0
-            idx, data = self._get_data()
+            if self._adaptive_prefetch:
+                start = time.time()
+                idx, data = self._get_data()
+                now = time.time()
+                self._wait_time += now - start
+                self._latency_time += now - self._task_send_time.pop(idx)
+                self._num_latency += 1
+            else:
+                idx, data = self._get_data()
             self._tasks_outstanding -= 1
 
             if self._dataset_kind == _DatasetKind.Iterable:
                 # Check for _IterableDatasetStopIteration
                 if isinstance(data, _utils.worker._IterableDatasetStopIteration):
-                    self._shutdown_worker(data.worker_id)
+                    if self._persistent_workers:
+                        # Keep the worker alive, it is only done for this epoch.
+                        self._workers_status[data.worker_id] = False
+                    else:
+                        self._shutdown_worker(data.worker_id)
                     self._try_put_index()
                     continue
 
@@ -985,11 +1151,18 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
                 # store out-of-order samples
                 self._task_info[idx] += (data,)
             else:
-                del self._task_info[idx]
+                worker_id = self._task_info.pop(idx)[0]
+                if self._shared_memory_arena_size > 0:
+                    self._track_shared_memory(worker_id, data)
                 return self._process_data(data)
 
     def _try_put_index(self):
-        assert self._tasks_outstanding < 2 * self._num_workers
+        max_tasks = self._prefetch_factor * self._num_workers
+        if self._adaptive_prefetch and self._tasks_outstanding >= max_tasks:
+            # The prefetch window has just shrunk, let the outstanding tasks
+            # drain first.
+            return
+        assert self._tasks_outstanding < max_tasks
         try:
             index = self._next_index()
         except StopIteration:
@@ -1004,22 +1177,95 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
 
         self._index_queues[worker_queue_idx].put((self._send_idx, index))
         self._task_info[self._send_idx] = (worker_queue_idx,)
+        if self._adaptive_prefetch:
+            self._task_send_time[self._send_idx] = time.time()
         self._tasks_outstanding += 1
         self._send_idx += 1
 
     def _process_data(self, data):
         self._rcvd_idx += 1
-        self._try_put_index()
+        if self._adaptive_prefetch:
+            self._adapt_prefetch_factor()
+            # Top up the (possibly resized) prefetch window.
+            for _ in range(self._prefetch_factor * self._num_workers - self._tasks_outstanding):
+                self._try_put_index()
+        else:
+            self._try_put_index()
         if isinstance(data, ExceptionWrapper):
             data.reraise()
         return data
 
+    # NOTE [ Shared Memory Arena ]
+    #
+    # With `shared_memory_arena_size > 0`, each worker keeps a pool of shared
+    # memory storages that `default_collate` stacks batches into (see
+    # `_SharedMemoryArena` in `_utils/worker.py`), so that we don't create a
+    # new shared memory segment for every batch.
+    #
+    # A storage can only be reused after the main process dropped every
+    # reference to it, which the worker cannot observe. Instead, the main
+    # process keeps weak references to the shared storages of each batch it
+    # yields, keyed by `(epoch, task idx)`. Once all of them expired, it sends
+    # a `_ReleaseSharedMemory` message with that key over the index queue of
+    # the worker that produced the batch, which moves the storages back to its
+    # free list. Since each worker processes its index queue in order, the
+    # release of a stale task (e.g., when a persistent worker is reset while
+    # the previous epoch was not fully consumed) is always processed after
+    # that task.
+
+    def _track_shared_memory(self, worker_id, data):
+        refs = [StorageWeakRef(storage) for storage in _shared_storages(data)]
+        self._shared_memory_batches.append((worker_id, (self._epoch, self._rcvd_idx), refs))
+        released_keys = [[] for _ in range(self._num_workers)]
+        alive_batches = []
+        for batch in self._shared_memory_batches:
+            if all(ref.expired() for ref in batch[2]):
+                released_keys[batch[0]].append(batch[1])
+            else:
+                alive_batches.append(batch)
+        self._shared_memory_batches = alive_batches
+        for worker_id, keys in enumerate(released_keys):
+            if keys:
+                self._index_queues[worker_id].put(_utils.worker._ReleaseSharedMemory(keys))
+
+    def _adapt_prefetch_factor(self):
+        # Called once per yielded batch when `_adaptive_prefetch` is set. Every
+        # round of `num_workers` batches, compares the mean time the consumer
+        # spent waiting for a batch with the mean latency of a task (from
+        # sending its indices to receiving its data):
+        #   - If the consumer waited for a significant fraction of the latency,
+        #     workers are not far enough ahead, so the prefetch window grows.
+        #   - If the consumer barely waited for several rounds in a row, the
+        #     window is larger than needed and only holds (shared) memory, so
+        #     it shrinks.
+        self._round_batches += 1
+        if self._round_batches < self._num_workers or self._num_latency == 0:
+            return
+        mean_wait = self._wait_time / self._round_batches
+        mean_latency = self._latency_time / self._num_latency
+        if mean_wait > self._ADAPTIVE_PREFETCH_GROW_THRESHOLD * mean_latency:
+            self._prefetch_factor = min(self._prefetch_factor + 1, self._max_prefetch_factor)
+            self._idle_rounds = 0
+        elif mean_wait < self._ADAPTIVE_PREFETCH_SHRINK_THRESHOLD * mean_latency:
+            self._idle_rounds += 1
+            if self._idle_rounds >= self._ADAPTIVE_PREFETCH_SHRINK_ROUNDS:
+                self._prefetch_factor = max(self._prefetch_factor - 1, 1)
+                self._idle_rounds = 0
+        else:
+            self._idle_rounds = 0
+        self._wait_time = 0.
+        self._latency_time = 0.
+        self._num_latency = 0
+        self._round_batches = 0
+
     def _shutdown_worker(self, worker_id):
         # Mark a worker as having finished its work and dead, e.g., due to
         # exhausting an `IterableDataset`. This should be used only when this
         # `_MultiProcessingDataLoaderIter` is going to continue running.
 
-        assert self._workers_status[worker_id]
+        # With `_persistent_workers`, a worker may only be paused for the
+        # current epoch, and still needs to be signaled on shutdown.
+        assert self._workers_status[worker_id] or self._persistent_workers
 
         # Signal termination to that specific worker.
         q = self._index_queues[worker_id]
@@ -1069,7 +1315,9 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
                     # Get number of workers from `len(self._workers)` instead of
                     # `self._num_workers` in case we error before starting all
                     # workers.
-                    if self._workers_status[worker_id]:
+                    # If we are using `_workers_status` with persistent workers,
+                    # we have to shut the worker down because it is only paused.
+                    if self._persistent_workers or self._workers_status[worker_id]:
                         self._shutdown_worker(worker_id)
                 for w in self._workers:
                     w.join(timeout=_utils.MP_STATUS_CHECK_INTERVAL)
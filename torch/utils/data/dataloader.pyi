@@ -21,16 +21,24 @@ class DataLoader(Generic[T_co]):
     pin_memory: bool
     drop_last: bool
     timeout: float
+    prefetch_factor: int
+    adaptive_prefetch: bool
+    shared_memory_arena_size: int
+    persistent_workers: bool
 
     @overload
     def __init__(self, dataset: Dataset[T_co], batch_size: int=..., shuffle: bool=...,
                  sampler: Optional[Sampler[int]]=..., num_workers: int=..., collate_fn: _collate_fn_t=...,
                  pin_memory: bool=..., drop_last: bool=..., timeout: float=...,
-                 worker_init_fn: _worker_init_fn_t=...) -> None: ...
+                 worker_init_fn: _worker_init_fn_t=..., persistent_workers: bool=..., *,
+                 prefetch_factor: int=..., adaptive_prefetch: bool=...,
+                 shared_memory_arena_size: int=...) -> None: ...
     @overload
     def __init__(self, dataset: Dataset[T_co], batch_sampler: Optional[Sampler[Sequence[int]]]=...,
                  num_workers: int=..., collate_fn: _collate_fn_t=..., pin_memory: bool=..., timeout: float=...,
-                 worker_init_fn: _worker_init_fn_t=...) -> None: ...
+                 worker_init_fn: _worker_init_fn_t=..., persistent_workers: bool=..., *,
+                 prefetch_factor: int=..., adaptive_prefetch: bool=...,
+                 shared_memory_arena_size: int=...) -> None: ...
 
     def __len__(self) -> int: ...
     # We quote '_BaseDataLoaderIter' since it isn't defined yet and the definition can't be moved up
@@ -1,6 +1,7 @@
 import bisect
 import warnings
 
+import torch
 from torch._utils import _accumulate
 from torch import randperm, default_generator
 
@@ -13,7 +14,12 @@ class Dataset(object):
     data sample for a given key. Subclasses could also optionally overwrite
     :meth:`__len__`, which is expected to return the size of the dataset by many
     :class:`~torch.utils.data.Sampler` implementations and the default options
-    of :class:`~torch.utils.data.DataLoader`.
+    of :class:`~torch.utils.data.DataLoader`. Subclasses could also optionally
+    implement :meth:`__getitems__`, which takes a list of keys and returns the
+    list of corresponding samples, to speed up batched samples loading. It is
+    only used if the class defining it also defines :meth:`__getitem__`, so a
+    subclass overwriting :meth:`__getitem__` alone still has it called for
+    each sample.
 
     .. note::
       :class:`~torch.utils.data.DataLoader` by default constructs a index
@@ -161,6 +167,12 @@ class TensorDataset(Dataset):
     def __getitem__(self, index):
         return tuple(tensor[index] for tensor in self.tensors)
 
+    def __getitems__(self, indices):
+        # Gather the whole batch with a single indexing op per tensor, and
+        # split it into per-sample views afterwards.
+        index = torch.as_tensor(indices, dtype=torch.long)
+        return list(zip(*(tensor[index].unbind(0) for tensor in self.tensors)))
+
     def __len__(self):
         return self.tensors[0].size(0)
 
@@ -206,6 +218,29 @@ class ConcatDataset(Dataset):
             sample_idx = idx - self.cumulative_sizes[dataset_idx - 1]
         return self.datasets[dataset_idx][sample_idx]
 
+    def __getitems__(self, indices):
+        # Group the indices by the dataset they fall into, so that each
+        # dataset gets a single batched request, and scatter the results back
+        # to their original positions.
+        groups = {}
+        for pos, idx in enumerate(indices):
+            if idx < 0:
+                if -idx > len(self):
+                    raise ValueError("absolute value of index should not exceed dataset length")
+                idx = len(self) + idx
+            dataset_idx = bisect.bisect_right(self.cumulative_sizes, idx)
+            if dataset_idx > 0:
+                idx = idx - self.cumulative_sizes[dataset_idx - 1]
+            positions, sample_indices = groups.setdefault(dataset_idx, ([], []))
+            positions.append(pos)
+            sample_indices.append(idx)
+        data = [None] * len(indices)
+        for dataset_idx, (positions, sample_indices) in groups.items():
+            samples = _getitems(self.datasets[dataset_idx], sample_indices)
+            for pos, sample in zip(positions, samples):
+                data[pos] = sample
+        return data
+
     @property
     def cummulative_sizes(self):
         warnings.warn("cummulative_sizes attribute is renamed to "
@@ -256,10 +291,28 @@ class Subset(Dataset):
     def __getitem__(self, idx):
         return self.dataset[self.indices[idx]]
 
+    def __getitems__(self, indices):
+        return _getitems(self.dataset, [self.indices[idx] for idx in indices])
+
     def __len__(self):
         return len(self.indices)
 
 
+def _getitems(dataset, indices):
+    r"""Fetches the samples at :attr:`indices` from :attr:`dataset`, using its
+    batched :meth:`__getitems__` if it has one that matches its
+    :meth:`__getitem__`."""
+    cls = type(dataset)
+    for base in cls.__mro__:
+        if '__getitems__' in vars(base):
+            # A subclass overriding `__getitem__` alone (e.g. to transform the
+            # samples) must not be bypassed by the `__getitems__` it inherits.
+            if vars(base).get('__getitem__') is cls.__getitem__:
+                return dataset.__getitems__(indices)
+            break
+    return [dataset[idx] for idx in indices]
+
+
 def random_split(dataset, lengths, generator=default_generator):
     r"""
     Randomly split a dataset into non-overlapping new datasets of given lengths.
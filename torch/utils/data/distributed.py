@@ -1,9 +1,55 @@
 import math
 import torch
 from . import Sampler
+from .sampler import _bucket_batches, _check_bucket_args, _default_bucket_size
 import torch.distributed as dist
 
 
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x):
+    # splitmix64 finalizer: a bijection of 64 bit integers that spreads every
+    # bit of the input over the output
+    x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & _MASK64
+    return x ^ (x >> 31)
+
+
+class _FeistelPermutation(object):
+    r"""A pseudorandom permutation of ``range(n)`` keyed by :attr:`seed`, of
+    which any element is computed in O(1) memory.
+
+    A balanced Feistel network is a bijection of ``range(4 ** half_bits)``
+    whatever its round function, and values that fall outside ``range(n)``
+    are mapped again until they don't ("cycle walking"), which takes fewer
+    than 4 rounds on average since ``4 ** half_bits < 4 * n``.
+    """
+
+    num_rounds = 4
+
+    def __init__(self, n, seed):
+        self.n = n
+        self.half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        key = _mix64(seed & _MASK64)
+        self.keys = [_mix64((key + i * 0x9e3779b97f4a7c15) & _MASK64)
+                     for i in range(self.num_rounds)]
+
+    def _round_trip(self, x):
+        bits, mask = self.half_bits, self.half_mask
+        left, right = x >> bits, x & mask
+        for key in self.keys:
+            left, right = right, left ^ (_mix64(right ^ key) & mask)
+        return (left << bits) | right
+
+    def __getitem__(self, i):
+        x = self._round_trip(i)
+        while x >= self.n:
+            x = self._round_trip(x)
+        return x
+
+
 class DistributedSampler(Sampler):
     r"""Sampler that restricts data loading to a subset of the dataset.
 
@@ -29,6 +75,13 @@ class DistributedSampler(Sampler):
         seed (int, optional): random seed used to shuffle the sampler if
             :attr:`shuffle=True`. This number should be identical across all
             processes in the distributed group. Default: ``0``.
+        lazy (bool, optional): if ``True``, the shuffled indices are computed
+            on the fly from a pseudorandom bijection of the dataset indices
+            keyed by :attr:`seed` and the epoch, instead of taking the ones of
+            the process from a permutation of the whole dataset, so that
+            memory does not grow with the size of the dataset. The order of
+            the indices differs from the one with ``lazy=False``. Default:
+            ``False``.
 
     .. warning::
         In distributed mode, calling the :meth`set_epoch(epoch) <set_epoch>` method at
@@ -47,7 +100,7 @@ class DistributedSampler(Sampler):
         ...     train(loader)
     """
 
-    def __init__(self, dataset, num_replicas=None, rank=None, shuffle=True, seed=0):
+    def __init__(self, dataset, num_replicas=None, rank=None, shuffle=True, seed=0, lazy=False):
         if num_replicas is None:
             if not dist.is_available():
                 raise RuntimeError("Requires distributed package to be available")
@@ -64,29 +117,144 @@ class DistributedSampler(Sampler):
         self.total_size = self.num_samples * self.num_replicas
         self.shuffle = shuffle
         self.seed = seed
+        self.lazy = lazy
 
     def __iter__(self):
+        n = len(self.dataset)
+        # positions of the samples of this process in the order of the
+        # epoch, the ones past the end being extra samples taken from its
+        # start to make it evenly divisible
+        positions = range(self.rank, self.total_size, self.num_replicas)
+        assert len(positions) == self.num_samples
+
+        if not self.shuffle:
+            return (i % n for i in positions)
+
+        if self.lazy:
+            # the seed and the epoch are mixed so that consecutive values of
+            # either give unrelated permutations
+            permutation = _FeistelPermutation(n, _mix64(self.seed & _MASK64) ^ self.epoch)
+            return (permutation[i % n] for i in positions)
+
+        # deterministically shuffle based on epoch and seed
+        g = torch.Generator()
+        g.manual_seed(self.seed + self.epoch)
+        indices = torch.randperm(n, generator=g)
+        return iter(indices[torch.arange(self.rank, self.total_size, self.num_replicas) % n].tolist())
+
+    def __len__(self):
+        return self.num_samples
+
+    def set_epoch(self, epoch):
+        r"""
+        Sets the epoch for this sampler. When :attr:`shuffle=True`, this ensures all replicas
+        use a different random ordering for each epoch. Otherwise, the next iteration of this
+        sampler will yield the same ordering.
+
+        Arguments:
+            epoch (int): Epoch number.
+        """
+        self.epoch = epoch
+
+
+class DistributedBucketBatchSampler(Sampler):
+    r"""Distributed version of :class:`~torch.utils.data.BucketBatchSampler`,
+    which yields mini-batches of indices of samples of similar lengths.
+
+    Every process builds the same batches from :attr:`seed` and the epoch, and
+    takes every :attr:`num_replicas`-th of them, starting at :attr:`rank`.
+    Batches are repeated so that every process gets the same number of them
+    (or dropped, if :attr:`drop_last` is ``True``), since processes that run
+    different numbers of steps would hang in collective calls.
+
+    Arguments:
+        lengths (sequence of int or Tensor): length of each sample of the dataset
+        batch_size (int, optional): maximum number of samples in a batch
+        max_tokens (int, optional): maximum number of tokens in a padded batch.
+            At least one of :attr:`batch_size` and :attr:`max_tokens` must be
+            given.
+        bucket_size (int, optional): number of samples that are sorted together.
+            Default: ``100 * batch_size`` if :attr:`batch_size` is given, and
+            ``4096`` otherwise.
+        num_replicas (int, optional): Number of processes participating in
+            distributed training. By default, it is retrieved from the current
+            distributed group.
+        rank (int, optional): Rank of the current process within :attr:`num_replicas`.
+            By default, it is retrieved from the current distributed group.
+        shuffle (bool, optional): If ``True`` (default), the samples and the
+            batches are shuffled.
+        seed (int, optional): random seed used to shuffle the sampler if
+            :attr:`shuffle=True`. This number should be identical across all
+            processes in the distributed group. Default: ``0``.
+        drop_last (bool, optional): if ``True``, the last batch of each bucket
+            is dropped if it has fewer than :attr:`batch_size` samples, and the
+            batches that can't be evenly split between processes are dropped.
+            Default: ``False``.
+
+    .. warning::
+        As with :class:`DistributedSampler`, :meth:`set_epoch` must be called at
+        the beginning of each epoch to get a different shuffling.
+    """
+
+    def __init__(self, lengths, batch_size=None, max_tokens=None, bucket_size=None,
+                 num_replicas=None, rank=None, shuffle=True, seed=0, drop_last=False):
+        _check_bucket_args(batch_size, max_tokens, drop_last)
+        if num_replicas is None:
+            if not dist.is_available():
+                raise RuntimeError("Requires distributed package to be available")
+            num_replicas = dist.get_world_size()
+        if rank is None:
+            if not dist.is_available():
+                raise RuntimeError("Requires distributed package to be available")
+            rank = dist.get_rank()
+        self.lengths = torch.as_tensor(lengths, dtype=torch.int64).tolist()
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.bucket_size = _default_bucket_size(bucket_size, batch_size)
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+        self.shuffle = shuffle
+        self.seed = seed
+        self.drop_last = drop_last
+        # (epoch, batches of this process) of the last epoch computed
+        self._cache = None
+
+    def _batches(self):
+        if self._cache is not None and self._cache[0] == self.epoch:
+            return self._cache[1]
+        n = len(self.lengths)
         if self.shuffle:
             # deterministically shuffle based on epoch and seed
             g = torch.Generator()
             g.manual_seed(self.seed + self.epoch)
-            indices = torch.randperm(len(self.dataset), generator=g).tolist()
+            indices = torch.randperm(n, generator=g).tolist()
         else:
-            indices = list(range(len(self.dataset)))
-
+            indices = list(range(n))
+        batches = _bucket_batches(self.lengths, indices, self.batch_size, self.max_tokens,
+                                  self.bucket_size, self.drop_last)
+        if self.shuffle:
+            order = torch.randperm(len(batches), generator=g).tolist()
+            batches = [batches[i] for i in order]
 
-        # add extra samples to make it evenly divisible
-        indices += indices[:(self.total_size - len(indices))]
-        assert len(indices) == self.total_size
+        if self.drop_last:
+            total_size = len(batches) - len(batches) % self.num_replicas
+            batches = batches[:total_size]
+        else:
+            # add extra batches to make it evenly divisible
+            total_size = int(math.ceil(len(batches) * 1.0 / self.num_replicas)) * self.num_replicas
+            while len(batches) < total_size:
+                batches += batches[:(total_size - len(batches))]
 
-        # subsample
-        indices = indices[self.rank:self.total_size:self.num_replicas]
-        assert len(indices) == self.num_samples
+        batches = batches[self.rank:total_size:self.num_replicas]
+        self._cache = (self.epoch, batches)
+        return batches
 
-        return iter(indices)
+    def __iter__(self):
+        return iter(self._batches())
 
     def __len__(self):
-        return self.num_samples
+        return len(self._batches())
 
     def set_epoch(self, epoch):
         r"""
@@ -1,9 +1,18 @@
-from typing import TypeVar, Optional, Iterator
+from typing import TypeVar, Optional, Iterator, List, Sequence, Union
 from . import Sampler, Dataset
+from ... import Tensor
 
 T_co = TypeVar('T_co', covariant=True)
 class DistributedSampler(Sampler[T_co]):
-    def __init__(self, dataset: Dataset, num_replicas: Optional[int]=..., rank: Optional[int]=..., shuffle: bool=...): ...
+    def __init__(self, dataset: Dataset, num_replicas: Optional[int]=..., rank: Optional[int]=..., shuffle: bool=..., seed: int=..., lazy: bool=...) -> None: ...
     def __iter__(self) -> Iterator[T_co]: ...
     def __len__(self) -> int: ...
     def set_epoch(self, epoch: int) -> None: ...
+
+class DistributedBucketBatchSampler(Sampler[List[int]]):
+    def __init__(self, lengths: Union[Sequence[int], Tensor], batch_size: Optional[int]=..., max_tokens: Optional[int]=...,
+                 bucket_size: Optional[int]=..., num_replicas: Optional[int]=..., rank: Optional[int]=...,
+                 shuffle: bool=..., seed: int=..., drop_last: bool=...) -> None: ...
+    def __iter__(self) -> Iterator[List[int]]: ...
+    def __len__(self) -> int: ...
+    def set_epoch(self, epoch: int) -> None: ...
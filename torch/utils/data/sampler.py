@@ -218,3 +218,124 @@ class BatchSampler(Sampler):
             return len(self.sampler) // self.batch_size
         else:
             return (len(self.sampler) + self.batch_size - 1) // self.batch_size
+
+
+def _bucket_batches(lengths, indices, batch_size, max_tokens, bucket_size, drop_last):
+    r"""Splits :attr:`indices` into buckets of :attr:`bucket_size` consecutive
+    indices, sorts each bucket by length, and cuts it into batches of at most
+    :attr:`batch_size` samples and :attr:`max_tokens` tokens once padded."""
+    batches = []
+    for start in range(0, len(indices), bucket_size):
+        # sorted is stable, so samples of the same length stay in the order of
+        # indices (e.g. shuffled)
+        bucket = sorted(indices[start:start + bucket_size], key=lengths.__getitem__)
+        batch = []
+        for idx in bucket:
+            # Lengths are sorted, so a new sample is the longest of its batch.
+            if len(batch) > 0 and (
+                    (batch_size is not None and len(batch) == batch_size) or
+                    (max_tokens is not None and (len(batch) + 1) * lengths[idx] > max_tokens)):
+                batches.append(batch)
+                batch = []
+            batch.append(idx)
+        if len(batch) > 0 and not (drop_last and batch_size is not None and len(batch) < batch_size):
+            batches.append(batch)
+    return batches
+
+
+class BucketBatchSampler(Sampler):
+    r"""Yields mini-batches of indices of samples of similar lengths, to reduce
+    the padding needed to batch variable-length sequences (e.g. with
+    :func:`~torch.nn.utils.rnn.pad_sequence`).
+
+    The indices are shuffled, split into buckets of :attr:`bucket_size`
+    indices, and each bucket is sorted by length and cut into batches. The
+    order of the batches is then shuffled. Batches hold at most
+    :attr:`batch_size` samples and/or at most :attr:`max_tokens` tokens once
+    padded to their longest sample, i.e. ``len(batch) * max_length``. A
+    sample longer than :attr:`max_tokens` is in a batch of its own.
+
+    Arguments:
+        lengths (sequence of int or Tensor): length of each sample of the dataset
+        batch_size (int, optional): maximum number of samples in a batch
+        max_tokens (int, optional): maximum number of tokens in a padded batch.
+            At least one of :attr:`batch_size` and :attr:`max_tokens` must be
+            given.
+        bucket_size (int, optional): number of samples that are sorted together.
+            Larger buckets give less padding, but less random batches.
+            Default: ``100 * batch_size`` if :attr:`batch_size` is given, and
+            ``4096`` otherwise.
+        shuffle (bool): if ``False``, the buckets are made of consecutive
+            indices, and the batches are yielded in order. Default: ``True``
+        drop_last (bool): if ``True``, the last batch of each bucket is dropped
+            if it has fewer than :attr:`batch_size` samples. Default: ``False``
+        generator (Generator): Generator used in shuffling.
+
+    Example:
+        >>> lengths = [len(s) for s in sentences]
+        >>> sampler = BucketBatchSampler(lengths, max_tokens=4096)
+        >>> loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=pad_collate)
+    """
+
+    def __init__(self, lengths, batch_size=None, max_tokens=None, bucket_size=None,
+                 shuffle=True, drop_last=False, generator=None):
+        _check_bucket_args(batch_size, max_tokens, drop_last)
+        self.lengths = torch.as_tensor(lengths, dtype=torch.int64).tolist()
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.bucket_size = _default_bucket_size(bucket_size, batch_size)
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+        # Batches of the next iteration, computed early by __len__ so that it
+        # matches the number of batches yielded.
+        self._batches = None
+
+    def _next_batches(self):
+        if self._batches is None:
+            n = len(self.lengths)
+            if self.shuffle:
+                indices = torch.randperm(n, generator=self.generator).tolist()
+            else:
+                indices = list(range(n))
+            batches = _bucket_batches(self.lengths, indices, self.batch_size, self.max_tokens,
+                                      self.bucket_size, self.drop_last)
+            if self.shuffle:
+                order = torch.randperm(len(batches), generator=self.generator).tolist()
+                batches = [batches[i] for i in order]
+            self._batches = batches
+        return self._batches
+
+    def __iter__(self):
+        batches = self._next_batches()
+        self._batches = None
+        return iter(batches)
+
+    def __len__(self):
+        return len(self._next_batches())
+
+
+def _check_bucket_args(batch_size, max_tokens, drop_last):
+    if batch_size is None and max_tokens is None:
+        raise ValueError("at least one of batch_size and max_tokens should be given")
+    if batch_size is not None and (not isinstance(batch_size, _int_classes) or
+                                   isinstance(batch_size, bool) or batch_size <= 0):
+        raise ValueError("batch_size should be a positive integer value, "
+                         "but got batch_size={}".format(batch_size))
+    if max_tokens is not None and (not isinstance(max_tokens, _int_classes) or
+                                   isinstance(max_tokens, bool) or max_tokens <= 0):
+        raise ValueError("max_tokens should be a positive integer value, "
+                         "but got max_tokens={}".format(max_tokens))
+    if not isinstance(drop_last, bool):
+        raise ValueError("drop_last should be a boolean value, but got "
+                         "drop_last={}".format(drop_last))
+
+
+def _default_bucket_size(bucket_size, batch_size):
+    if bucket_size is None:
+        return 100 * batch_size if batch_size is not None else 4096
+    if not isinstance(bucket_size, _int_classes) or isinstance(bucket_size, bool) or \
+            bucket_size <= 0:
+        raise ValueError("bucket_size should be a positive integer value, "
+                         "but got bucket_size={}".format(bucket_size))
+    return bucket_size
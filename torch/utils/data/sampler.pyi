@@ -1,5 +1,5 @@
-from typing import Iterator, Optional, Sequence, List, TypeVar, Generic, Sized
-from ... import Tensor
+from typing import Iterator, Optional, Sequence, List, TypeVar, Generic, Sized, Union
+from ... import Tensor, Generator
 
 T_co = TypeVar('T_co', covariant=True)
 class Sampler(Generic[T_co]):
@@ -36,3 +36,15 @@ class BatchSampler(Sampler[List[int]]):
     drop_last: bool
 
     def __init__(self, sampler: Sampler[int], batch_size: int, drop_last: bool) -> None: ...
+
+class BucketBatchSampler(Sampler[List[int]]):
+    lengths: List[int]
+    batch_size: Optional[int]
+    max_tokens: Optional[int]
+    bucket_size: int
+    shuffle: bool
+    drop_last: bool
+
+    def __init__(self, lengths: Union[Sequence[int], Tensor], batch_size: Optional[int]=..., max_tokens: Optional[int]=...,
+                 bucket_size: Optional[int]=..., shuffle: bool=..., drop_last: bool=...,
+                 generator: Optional[Generator]=...) -> None: ...
@@ -5,15 +5,19 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import os
 import six
+import threading
 import time
 import torch
+from six.moves import queue
 
 from tensorboard.compat import tf
 from tensorboard.compat.proto.event_pb2 import SessionLog
 from tensorboard.compat.proto.event_pb2 import Event
 from tensorboard.compat.proto import event_pb2
+from tensorboard.compat.proto.summary_pb2 import Summary
 from tensorboard.plugins.projector.projector_config_pb2 import ProjectorConfig
 from tensorboard.summary.writer.event_file_writer import EventFileWriter
 
@@ -151,6 +155,107 @@ class FileWriter(object):
         self.event_writer.reopen()
 
 
+class _SummaryWorker(object):
+    """Builds summaries on a background thread and adds them to their
+    `FileWriter`.
+
+    The training thread only enqueues the raw values of a summary along with
+    the function that builds it, so that the conversion to NumPy, histogram
+    binning and protobuf encoding happen off the training thread. The scalars
+    of a given step that are pending at the same time are coalesced into a
+    single event per `FileWriter`.
+    """
+
+    _SCALAR = 0
+    _SUMMARY = 1
+    _FLUSH = 2
+    _CLOSE = 3
+
+    def __init__(self, max_pending):
+        self._queue = queue.Queue(max_pending)
+        self._exception = None
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def add_scalar(self, file_writer, tag, value, global_step, walltime):
+        self._put((self._SCALAR, file_writer, (tag, value), global_step, walltime))
+
+    def add_summary(self, file_writer, build, args, global_step, walltime):
+        self._put((self._SUMMARY, file_writer, (build, args), global_step, walltime))
+
+    def flush(self):
+        """Waits until all the summaries enqueued so far were added."""
+        done = threading.Event()
+        self._put((self._FLUSH, None, done, None, None))
+        done.wait()
+        self._check()
+
+    def close(self):
+        self._put((self._CLOSE, None, None, None, None))
+        self._thread.join()
+        self._check()
+
+    def _put(self, item):
+        self._check()
+        self._queue.put(item)
+
+    def _check(self):
+        if self._exception is not None:
+            exception, self._exception = self._exception, None
+            raise exception
+
+    def _run(self):
+        while True:
+            # Take everything that is pending, so that scalars of the same
+            # step can be written as a single event.
+            items = [self._queue.get()]
+            try:
+                while True:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            scalars = collections.OrderedDict()
+            for item in items:
+                kind, file_writer, payload, global_step, walltime = item
+                if kind != self._SCALAR:
+                    self._write_scalars(scalars)
+                try:
+                    if kind == self._SCALAR:
+                        key = (id(file_writer), global_step)
+                        if key not in scalars:
+                            scalars[key] = (file_writer, [], global_step, walltime)
+                        scalars[key][1].append(scalar(*payload).value[0])
+                    elif kind == self._SUMMARY:
+                        build, args = payload
+                        file_writer.add_summary(build(*args), global_step, walltime)
+                    elif kind == self._FLUSH:
+                        payload.set()
+                    else:
+                        return
+                except Exception as e:
+                    # reported to the training thread on its next call
+                    self._exception = e
+
+            self._write_scalars(scalars)
+
+    def _write_scalars(self, scalars):
+        for file_writer, values, global_step, walltime in scalars.values():
+            try:
+                file_writer.add_summary(Summary(value=values), global_step, walltime)
+            except Exception as e:
+                self._exception = e
+        scalars.clear()
+
+
+def _snapshot(value):
+    """Returns a copy of :attr:`value` if it is a tensor, so that it can't be
+    modified in-place (e.g. by an optimizer) until it is used."""
+    if isinstance(value, torch.Tensor):
+        return value.detach().clone()
+    return value
+
+
 class SummaryWriter(object):
     """Writes entries directly to event files in the log_dir to be
     consumed by TensorBoard.
@@ -163,7 +268,8 @@ class SummaryWriter(object):
     """
 
     def __init__(self, log_dir=None, comment='', purge_step=None, max_queue=10,
-                 flush_secs=120, filename_suffix=''):
+                 flush_secs=120, filename_suffix='', asynchronous=False,
+                 max_pending=1000):
         """Creates a `SummaryWriter` that will write out events and summaries
         to the event file.
 
@@ -188,6 +294,17 @@ class SummaryWriter(object):
             filename_suffix (string): Suffix added to all event filenames in
               the log_dir directory. More details on filename construction in
               tensorboard.summary.writer.event_file_writer.EventFileWriter.
+            asynchronous (bool): If ``True``, scalars and histograms are built
+              on a background thread: ``add_scalar``, ``add_scalars``,
+              ``add_histogram`` and ``add_histogram_raw`` only take a copy of
+              tensor values and enqueue them, while the conversion to NumPy,
+              histogram binning and protobuf encoding happen off the
+              training thread, and the scalars of a step that are pending at
+              the same time are written as a single event. Errors are raised
+              by a later call. Default is ``False``.
+            max_pending (int): With ``asynchronous=True``, maximum number of
+              summaries waiting to be built before the ``add`` calls block.
+              Default is 1000.
 
         Examples::
 
@@ -218,6 +335,9 @@ class SummaryWriter(object):
         self.max_queue = max_queue
         self.flush_secs = flush_secs
         self.filename_suffix = filename_suffix
+        self.asynchronous = asynchronous
+        self.max_pending = max_pending
+        self._worker = None
 
         # Initialize the file writers, but they can be cleared out on close
         # and recreated later as needed.
@@ -264,6 +384,30 @@ class SummaryWriter(object):
                 self.purge_step = None
         return self.file_writer
 
+    def _get_worker(self):
+        """Returns the background summary worker, or None if the writer is not
+        asynchronous. Recreates it if closed."""
+        if self.asynchronous and self._worker is None:
+            self._worker = _SummaryWorker(self.max_pending)
+        return self._worker
+
+    def _add_scalar(self, file_writer, tag, scalar_value, global_step, walltime):
+        worker = self._get_worker()
+        if worker is None:
+            file_writer.add_summary(scalar(tag, scalar_value), global_step, walltime)
+        else:
+            walltime = time.time() if walltime is None else walltime
+            worker.add_scalar(file_writer, tag, _snapshot(scalar_value), global_step, walltime)
+
+    def _add_summary(self, file_writer, build, args, global_step, walltime):
+        worker = self._get_worker()
+        if worker is None:
+            file_writer.add_summary(build(*args), global_step, walltime)
+        else:
+            walltime = time.time() if walltime is None else walltime
+            args = tuple(_snapshot(arg) for arg in args)
+            worker.add_summary(file_writer, build, args, global_step, walltime)
+
     def get_logdir(self):
         """Returns the directory where event files will be written."""
         return self.log_dir
@@ -340,8 +484,7 @@ class SummaryWriter(object):
         torch._C._log_api_usage_once("tensorboard.logging.add_scalar")
         if self._check_caffe2_blob(scalar_value):
             scalar_value = workspace.FetchBlob(scalar_value)
-        self._get_file_writer().add_summary(
-            scalar(tag, scalar_value), global_step, walltime)
+        self._add_scalar(self._get_file_writer(), tag, scalar_value, global_step, walltime)
 
     def add_scalars(self, main_tag, tag_scalar_dict, global_step=None, walltime=None):
         """Adds many scalar data to summary.
@@ -385,8 +528,7 @@ class SummaryWriter(object):
                 self.all_writers[fw_tag] = fw
             if self._check_caffe2_blob(scalar_value):
                 scalar_value = workspace.FetchBlob(scalar_value)
-            fw.add_summary(scalar(main_tag, scalar_value),
-                           global_step, walltime)
+            self._add_scalar(fw, main_tag, scalar_value, global_step, walltime)
 
     def add_histogram(self, tag, values, global_step=None, bins='tensorflow', walltime=None, max_bins=None):
         """Add histogram to summary.
@@ -421,8 +563,8 @@ class SummaryWriter(object):
             values = workspace.FetchBlob(values)
         if isinstance(bins, six.string_types) and bins == 'tensorflow':
             bins = self.default_bins
-        self._get_file_writer().add_summary(
-            histogram(tag, values, bins, max_bins=max_bins), global_step, walltime)
+        self._add_summary(self._get_file_writer(), histogram,
+                          (tag, values, bins, max_bins), global_step, walltime)
 
     def add_histogram_raw(self, tag, min, max, num, sum, sum_squares,
                           bucket_limits, bucket_counts, global_step=None,
@@ -479,15 +621,17 @@ class SummaryWriter(object):
         torch._C._log_api_usage_once("tensorboard.logging.add_histogram_raw")
         if len(bucket_limits) != len(bucket_counts):
             raise ValueError('len(bucket_limits) != len(bucket_counts), see the document.')
-        self._get_file_writer().add_summary(
-            histogram_raw(tag,
-                          min,
-                          max,
-                          num,
-                          sum,
-                          sum_squares,
-                          bucket_limits,
-                          bucket_counts),
+        self._add_summary(
+            self._get_file_writer(),
+            histogram_raw,
+            (tag,
+             min,
+             max,
+             num,
+             sum,
+             sum_squares,
+             bucket_limits,
+             bucket_counts),
             global_step,
             walltime)
 
@@ -1013,16 +1157,23 @@ class SummaryWriter(object):
         """
         if self.all_writers is None:
             return
+        if self._worker is not None:
+            self._worker.flush()
         for writer in self.all_writers.values():
             writer.flush()
 
     def close(self):
         if self.all_writers is None:
             return  # ignore double close
-        for writer in self.all_writers.values():
-            writer.flush()
-            writer.close()
-        self.file_writer = self.all_writers = None
+        try:
+            if self._worker is not None:
+                worker, self._worker = self._worker, None
+                worker.close()
+        finally:
+            for writer in self.all_writers.values():
+                writer.flush()
+                writer.close()
+            self.file_writer = self.all_writers = None
 
     def __enter__(self):
         return self